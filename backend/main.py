@@ -3,10 +3,8 @@ Family Calendar Dashboard - FastAPI Backend
 Modern async backend with proper streaming support
 """
 
-from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
 from contextlib import asynccontextmanager
 import uvicorn
 import json
@@ -17,19 +15,26 @@ from typing import Optional, Dict, Any
 import logging
 from datetime import datetime
 
-from .routers import settings, calendar, homeassistant, health
+from .routers import settings, calendar, events, homeassistant, health, stream, static, weather, backgrounds, bootstrap, metrics
+from .services import http_client
+from .services.disk_cache import persistent_cache
+from .services.log_pipeline import LogContextMiddleware, configure_logging, stop_logging
+from .services.metrics import MetricsMiddleware
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging: records are queued and written by a background thread
+# and flushed on shutdown (LOG_LEVEL, LOG_FORMAT=text|json, LOG_SAMPLE_ROUTES)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Settings file path
 SETTINGS_FILE = Path('settings.json')
 STATIC_DIR = Path('.')
 
+def restore_caches() -> int:
+    """Load the persisted response caches into memory (blocking SQLite reads)"""
+    caches = (calendar.calendar_cache, homeassistant.ha_cache, weather.weather_cache, backgrounds.list_cache)
+    return sum(cache.restore() for cache in caches)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
@@ -42,9 +47,45 @@ async def lifespan(app: FastAPI):
         logger.info(f"Creating default settings file: {SETTINGS_FILE}")
         SETTINGS_FILE.write_text(json.dumps({}, indent=2))
     
+    # Hold dashboard files (and their gzip/brotli variants) in memory
+    logger.info(f"📦 Static assets preloaded: {static.assets.prewarm()}")
+    
+    # Responses persisted by the last run, loaded before the first request (off the event loop)
+    restored = await asyncio.to_thread(restore_caches)
+    logger.info(f"💾 Restored {restored} cached responses from {persistent_cache.path}")
+    
+    # Pooled upstream client shared by all routers
+    await http_client.start()
+    
+    # Keep calendar feeds warm; follow feed changes as settings are saved
+    await calendar.configure_prefetch(await settings.read_settings())
+    settings.add_listener(calendar.configure_prefetch)
+    
+    # Push channel: settings saves and version changes go out over /api/stream
+    settings.add_listener(stream.publish_settings_changed)
+    version_task = asyncio.create_task(health.version_watcher.run())
+    
+    # One shared Home Assistant WebSocket fanned out to every display
+    await homeassistant.configure_hub(await settings.read_settings())
+    settings.add_listener(homeassistant.configure_hub)
+    
+    # Hand edits to settings.json reach the listeners above too
+    settings_task = asyncio.create_task(settings.watch_file())
+    
     yield
     
     logger.info("🛑 Family Calendar Dashboard Backend Shutting down...")
+    version_task.cancel()
+    settings_task.cancel()
+    await calendar.prefetcher.stop()
+    await homeassistant.hub.stop()
+    await http_client.close()
+    # uvicorn runs this on SIGTERM/SIGINT too; atexit hooks alone are skipped on SIGTERM
+    settings.store.flush()
+    calendar.event_store.close()
+    persistent_cache.close()
+    logger.info("👋 Shutdown complete")
+    stop_logging()
 
 # Create FastAPI app
 app = FastAPI(
@@ -63,23 +104,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts, latency and in-flight gauges per route (/api/metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Tags log records with the request they belong to; samples polling endpoints
+app.add_middleware(LogContextMiddleware)
+
 # Include routers
 app.include_router(settings.router, prefix="/api", tags=["settings"])
 app.include_router(calendar.router, prefix="/api", tags=["calendar"])
+app.include_router(events.router, prefix="/api", tags=["calendar"])
 app.include_router(homeassistant.router, prefix="/api", tags=["homeassistant"])
+app.include_router(weather.router, prefix="/api", tags=["weather"])
+app.include_router(backgrounds.router, prefix="/api", tags=["backgrounds"])
+app.include_router(bootstrap.router, prefix="/api", tags=["bootstrap"])
 app.include_router(health.router, prefix="/api", tags=["health"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(stream.router, prefix="/api", tags=["stream"])
 
-# Serve static files (index.html, control.html, etc.)
+# Serve static files (index.html, control.html, etc.) from the in-memory asset table
 # This should be last to catch all non-API routes
-app.mount("/", StaticFiles(directory=str(STATIC_DIR), html=True), name="static")
-
-@app.get("/")
-async def root():
-    """Serve index.html"""
-    index_path = STATIC_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
-    raise HTTPException(status_code=404, detail="index.html not found")
+app.include_router(static.router)
 
 if __name__ == "__main__":
     # Run with uvicorn
@@ -0,0 +1,281 @@
+"""
+Unsplash background image proxy
+The photo list is fetched once per source and orientation per TTL for every
+display. Each photo is downloaded once per size bucket, already resized by
+Unsplash's image CDN to the display's resolution, kept on disk, and served
+with long-lived cache headers; the next photo in the rotation is fetched in
+the background while the current one is on screen.
+"""
+
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import FileResponse
+import asyncio
+import httpx
+import json
+import logging
+import os
+import random
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode
+
+from .settings import read_settings
+from ..services import http_client
+from ..services.cache import ResponseCache, CachedResponse
+from ..services.disk_cache import Persistence, persistent_cache
+from ..services.image_cache import ImageCache, size_bucket, valid_photo_id
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+UNSPLASH_API_URL = 'https://api.unsplash.com'
+UNSPLASH_TIMEOUT = 15.0
+IMAGE_TIMEOUT = 60.0
+# Falls back to unsplash.accessKey in settings.json
+UNSPLASH_ACCESS_KEY = os.environ.get('UNSPLASH_ACCESS_KEY', '')
+BACKGROUND_LIST_TTL = float(os.environ.get('BACKGROUND_LIST_TTL', '3600'))
+BACKGROUND_QUALITY = int(os.environ.get('BACKGROUND_QUALITY', '80'))
+PHOTOS_PER_LIST = 30
+
+# A variant is never changed once stored: its URL names the photo and size
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+list_cache = ResponseCache(
+    ttl=BACKGROUND_LIST_TTL,
+    stale_ttl=BACKGROUND_LIST_TTL * 24,
+    max_entries=16,
+    persistence=Persistence(persistent_cache, 'backgrounds', CachedResponse)
+)
+image_cache = ImageCache()
+
+# Latest known source URL per photo (as many as the cached lists hold, least
+# recently listed dropped first) and rotation order per orientation (for prefetch)
+MAX_SOURCES = list_cache.max_entries * PHOTOS_PER_LIST
+_sources: 'OrderedDict[str, str]' = OrderedDict()
+_rotations: Dict[str, List[str]] = {}
+# Downloads in flight per (photo, size), shared by concurrent requests and prefetch
+_downloads: Dict[Tuple[str, Tuple[int, int]], 'asyncio.Task[str]'] = {}
+_prefetches: Set['asyncio.Task[Any]'] = set()
+
+
+async def unsplash_config() -> Dict[str, str]:
+    unsplash = (await read_settings()).get('unsplash') or {}
+    access_key = UNSPLASH_ACCESS_KEY or unsplash.get('accessKey') or ''
+    if not access_key or access_key == 'YOUR_UNSPLASH_ACCESS_KEY':
+        raise HTTPException(status_code=503, detail="Unsplash access key is not configured")
+    return {
+        "access_key": access_key,
+        "query": unsplash.get('searchQuery') or 'nature landscape',
+        "collection": str(unsplash.get('collectionId') or ''),
+    }
+
+
+def trim_photo(photo: Dict[str, Any]) -> Dict[str, Any]:
+    user = photo.get('user') or {}
+    return {
+        "id": photo.get('id'),
+        "raw": (photo.get('urls') or {}).get('raw'),
+        "color": photo.get('color'),
+        "alt": photo.get('alt_description') or photo.get('description') or 'Background image',
+        "photographer": user.get('name'),
+        "photographerUrl": (user.get('links') or {}).get('html'),
+    }
+
+
+async def fetch_list(config: Dict[str, str], orientation: str) -> CachedResponse:
+    """One page of photos from Unsplash, trimmed and shuffled once for every display"""
+    params: Dict[str, Any] = {"per_page": PHOTOS_PER_LIST, "orientation": orientation}
+    if config['collection']:
+        url = f"{UNSPLASH_API_URL}/collections/{config['collection']}/photos"
+    else:
+        url = f"{UNSPLASH_API_URL}/search/photos"
+        params['query'] = config['query']
+    response = await http_client.get_client().get(
+        url, params=params, timeout=UNSPLASH_TIMEOUT,
+        headers={'Authorization': f"Client-ID {config['access_key']}", 'Accept-Version': 'v1'},
+        extensions={'upstream': 'unsplash'}
+    )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=502 if response.status_code >= 500 else response.status_code,
+            detail=f"Unsplash returned {response.status_code}"
+        )
+    data = response.json()
+    photos = [trim_photo(p) for p in (data if config['collection'] else data.get('results') or [])]
+    photos = [p for p in photos if p['id'] and p['raw'] and valid_photo_id(p['id'])]
+    random.shuffle(photos)
+    logger.info(f"✓ Unsplash list fetched: {len(photos)} {orientation} photos")
+    return CachedResponse(body=json.dumps(photos).encode(), content_type='application/json')
+
+
+async def load_list(orientation: str) -> List[Dict[str, Any]]:
+    config = await unsplash_config()
+    source = f"collection:{config['collection']}" if config['collection'] else f"search:{config['query']}"
+    try:
+        cached, _ = await list_cache.get_or_fetch(
+            f"{source}|{orientation}", lambda: fetch_list(config, orientation)
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException:
+        logger.error("❌ Unsplash timeout")
+        raise HTTPException(status_code=504, detail="Unsplash request timed out")
+    except httpx.RequestError as e:
+        logger.error(f"❌ Unsplash error: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to reach Unsplash: {str(e)}")
+    photos = json.loads(cached.body)
+    for photo in photos:
+        _sources[photo['id']] = photo['raw']
+        _sources.move_to_end(photo['id'])
+    while len(_sources) > MAX_SOURCES:
+        _sources.popitem(last=False)
+    _rotations[orientation] = [photo['id'] for photo in photos]
+    return photos
+
+
+def orientation_of(size: Tuple[int, int]) -> str:
+    return 'portrait' if size[1] > size[0] else 'landscape'
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """'WxH' as served in list URLs; other sizes would only multiply the cache"""
+    try:
+        width, height = (int(v) for v in size.lower().split('x'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid size: {size}")
+    if size_bucket(width, height) != (width, height):
+        raise HTTPException(status_code=400, detail=f"Unsupported size: {size}")
+    return width, height
+
+
+async def download(photo_id: str, size: Tuple[int, int], raw_url: str) -> str:
+    """Resized variant from Unsplash's image CDN, stored on disk; returns its path"""
+    separator = '&' if '?' in raw_url else '?'
+    url = raw_url + separator + urlencode({
+        'w': size[0], 'h': size[1], 'fit': 'crop', 'crop': 'entropy',
+        'q': BACKGROUND_QUALITY, 'fm': 'jpg',
+    })
+    response = await http_client.get_client().get(
+        url, timeout=IMAGE_TIMEOUT, follow_redirects=True, extensions={'upstream': 'unsplash'}
+    )
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"Unsplash image returned {response.status_code}")
+    path = await asyncio.to_thread(image_cache.store, photo_id, size, response.content)
+    logger.info(f"🖼️ Background {photo_id} cached at {size[0]}x{size[1]} ({len(response.content)} bytes)")
+    return path
+
+
+def ensure_variant(photo_id: str, size: Tuple[int, int], raw_url: str) -> 'asyncio.Task[str]':
+    key = (photo_id, size)
+    task = _downloads.get(key)
+    if task is None:
+        task = asyncio.create_task(download(photo_id, size, raw_url))
+        _downloads[key] = task
+        task.add_done_callback(lambda _: _downloads.pop(key, None))
+    return task
+
+
+def prefetch_next(photo_id: str, size: Tuple[int, int]) -> None:
+    """Start downloading the photo after photo_id in the rotation unless it is on disk"""
+    rotation = _rotations.get(orientation_of(size)) or []
+    if photo_id not in rotation:
+        return
+    next_id = rotation[(rotation.index(photo_id) + 1) % len(rotation)]
+    raw_url = _sources.get(next_id)
+    if next_id == photo_id or raw_url is None or os.path.exists(image_cache.path_for(next_id, size)):
+        return
+    task = ensure_variant(next_id, size, raw_url)
+    _prefetches.add(task)
+
+    def done(t: 'asyncio.Task[str]') -> None:
+        _prefetches.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning(f"⚠️ Background prefetch of {next_id} failed: {t.exception()}")
+    task.add_done_callback(done)
+
+
+class CachedImageResponse(FileResponse):
+    """FileResponse for an acquired image_cache file, released once sent (or the send fails)"""
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            image_cache.release(self.path)
+
+
+@router.get("/backgrounds")
+async def get_backgrounds(
+    width: Optional[int] = Query(None, description="Display width in device pixels"),
+    height: Optional[int] = Query(None, description="Display height in device pixels")
+):
+    """
+    The shared photo rotation with image URLs sized for this display.
+    The list is fetched from Unsplash once per BACKGROUND_LIST_TTL for all displays.
+    """
+    size = size_bucket(width, height)
+    orientation = orientation_of(size)
+    photos = await load_list(orientation)
+    if photos:
+        prefetch_next(photos[-1]['id'], size)  # i.e. the first photo
+    return {
+        "width": size[0],
+        "height": size[1],
+        "orientation": orientation,
+        "photos": [
+            {
+                "id": photo['id'],
+                "url": f"/api/backgrounds/{photo['id']}/{size[0]}x{size[1]}",
+                "color": photo['color'],
+                "alt": photo['alt'],
+                "photographer": photo['photographer'],
+                "photographerUrl": photo['photographerUrl'],
+            }
+            for photo in photos
+        ],
+    }
+
+
+@router.get("/backgrounds/cache")
+async def background_cache_stats():
+    """Disk usage and counters for cached background images"""
+    return {
+        **image_cache.stats(),
+        "downloading": len(_downloads),
+        "list": list_cache.stats(),
+    }
+
+
+@router.get("/backgrounds/{photo_id}/{size}")
+async def get_background(photo_id: str, size: str):
+    """One photo resized for a display; immutable, so browsers never ask again"""
+    if not valid_photo_id(photo_id):
+        raise HTTPException(status_code=404, detail="Unknown photo")
+    dimensions = parse_size(size)
+    path = await asyncio.to_thread(image_cache.get, photo_id, dimensions)
+    status = 'HIT'
+    if path is None:
+        if photo_id not in _sources:
+            await load_list(orientation_of(dimensions))  # e.g. first request after a restart
+        raw_url = _sources.get(photo_id)
+        if raw_url is None:
+            raise HTTPException(status_code=404, detail="Unknown photo")
+        try:
+            await asyncio.shield(ensure_variant(photo_id, dimensions, raw_url))
+        except httpx.TimeoutException:
+            logger.error(f"❌ Unsplash image timeout: {photo_id}")
+            raise HTTPException(status_code=504, detail="Unsplash image request timed out")
+        except httpx.RequestError as e:
+            logger.error(f"❌ Unsplash image error: {e}")
+            raise HTTPException(status_code=502, detail=f"Failed to reach Unsplash: {str(e)}")
+        path = await asyncio.to_thread(image_cache.acquire, photo_id, dimensions)
+        if path is None:
+            # Evicted again before it could be served (cache far smaller than a few images)
+            raise HTTPException(status_code=503, detail="Background image cache is full, try again")
+        status = 'MISS'
+    prefetch_next(photo_id, dimensions)
+    return CachedImageResponse(path, media_type='image/jpeg', headers={
+        'Cache-Control': IMMUTABLE,
+        'X-Cache': status
+    })
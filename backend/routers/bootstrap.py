@@ -0,0 +1,187 @@
+"""
+Dashboard bootstrap endpoint
+Everything a display needs for first paint (settings, version, calendar
+events, Home Assistant states, weather, a joke) gathered concurrently from
+the shared caches in one request. With ?stream=1 each section is sent as an
+NDJSON line as soon as it is ready, so a slow upstream never holds up the rest.
+"""
+
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
+import httpx
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from . import weather
+from .calendar import collect_events, configured_feeds
+from .health import version_watcher
+from .settings import read_settings, store
+from ..services import http_client
+from ..services.cache import ResponseCache, CachedResponse
+from ..services.ha_hub import hub
+from ..services.ics import window_bounds
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Budget per section; a section that misses it is reported as an error and
+# the display loads it the usual way
+BOOTSTRAP_SECTION_TIMEOUT = float(os.environ.get('BOOTSTRAP_SECTION_TIMEOUT', '5'))
+
+JOKE_URL = 'https://icanhazdadjoke.com/'
+# Every display shows the same joke for this long (the widget changes it every 5 minutes)
+JOKE_CACHE_TTL = float(os.environ.get('JOKE_CACHE_TTL', '300'))
+joke_cache = ResponseCache(ttl=JOKE_CACHE_TTL, stale_ttl=0, max_entries=1)
+
+# Entities the dashboard shows when settings don't name them (mirrors getDashboardEntities in js/app.js)
+DEFAULT_WEATHER_ENTITIES = ['weather.home', 'weather.kbil']
+DEFAULT_MEDIA_PLAYER = 'media_player.spotify'
+
+
+def dashboard_entities(settings: Dict[str, Any]) -> List[str]:
+    entities = [e.get('entityId') if isinstance(e, dict) else e
+                for e in (settings.get('homeAssistant') or {}).get('entities') or []]
+    weather_entity = (settings.get('weather') or {}).get('weatherEntity')
+    entities.extend([weather_entity] if weather_entity else DEFAULT_WEATHER_ENTITIES)
+    entities.append((settings.get('spotify') or {}).get('mediaPlayerEntity') or DEFAULT_MEDIA_PLAYER)
+    return list(dict.fromkeys(e for e in entities if e))
+
+
+async def settings_section(settings: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "revision": store.revision,
+        "settings": {k: v for k, v in settings.items() if not k.startswith('_')},
+    }
+
+
+async def version_section(settings: Dict[str, Any]) -> Dict[str, Any]:
+    return version_watcher.snapshot()
+
+
+async def calendar_section(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Same window and shape as /api/calendar/all"""
+    calendar_settings = settings.get('googleCalendar') or {}
+    window_start, window_end = window_bounds(None, None, calendar_settings.get('weeksAhead') or 4)
+    events, feed_status = await collect_events(configured_feeds(calendar_settings), window_start, window_end)
+    return {
+        "start": window_start.isoformat(),
+        "end": window_end.isoformat(),
+        "events": events,
+        "feeds": feed_status
+    }
+
+
+async def homeassistant_section(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """The hub's current states for the entities this dashboard shows"""
+    if not hub.enabled:
+        raise HTTPException(status_code=503, detail="Home Assistant hub is not running")
+    states = hub.states
+    return {
+        "connected": hub.connected,
+        "states": {eid: states[eid] for eid in dashboard_entities(settings) if eid in states},
+    }
+
+
+async def weather_section(settings: Dict[str, Any]) -> Any:
+    cached, _ = await weather.load_weather()
+    return json.loads(cached.body)
+
+
+async def fetch_joke() -> CachedResponse:
+    response = await http_client.get_client().get(JOKE_URL, timeout=BOOTSTRAP_SECTION_TIMEOUT, headers={
+        'Accept': 'application/json',
+        'User-Agent': 'Family Calendar Dashboard'
+    })
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"icanhazdadjoke returned {response.status_code}")
+    return CachedResponse(body=json.dumps({"joke": response.json().get('joke')}).encode(), content_type='application/json')
+
+
+async def joke_section(settings: Dict[str, Any]) -> Any:
+    cached, _ = await joke_cache.get_or_fetch('joke', fetch_joke)
+    return json.loads(cached.body)
+
+
+SECTIONS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    "settings": settings_section,
+    "version": version_section,
+    "calendar": calendar_section,
+    "homeassistant": homeassistant_section,
+    "weather": weather_section,
+    "joke": joke_section,
+}
+
+
+async def run_section(name: str, settings: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """({"data": ...} or {"error": ...}, elapsed) for one section within its budget"""
+    started = time.monotonic()
+    result: Dict[str, Any] = {"section": name}
+    try:
+        result["data"] = await asyncio.wait_for(SECTIONS[name](settings), BOOTSTRAP_SECTION_TIMEOUT)
+    except HTTPException as e:
+        result["error"] = e.detail
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        result["error"] = "Timed out"
+    except httpx.RequestError as e:
+        result["error"] = f"Upstream request failed: {str(e)}"
+    except Exception as e:
+        logger.error(f"❌ Bootstrap section {name} failed: {e}", exc_info=True)
+        result["error"] = f"Unexpected error: {str(e)}"
+    result["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    return name, result
+
+
+def select_sections(sections: Optional[str]) -> List[str]:
+    if not sections:
+        return list(SECTIONS)
+    names = [s.strip() for s in sections.split(',') if s.strip()]
+    unknown = [s for s in names if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    return names
+
+
+@router.get("/bootstrap")
+async def bootstrap(
+    sections: Optional[str] = Query(None, description=f"Comma-separated sections, default all: {', '.join(SECTIONS)}"),
+    stream: bool = Query(False, description="Send each section as an NDJSON line as soon as it is ready")
+):
+    """
+    Settings, version, calendar events, Home Assistant states, weather and a joke
+    in one round trip. A failed section carries "error" instead of "data".
+    """
+    names = select_sections(sections)
+    settings = await read_settings()
+    tasks = [asyncio.ensure_future(run_section(name, settings)) for name in names]
+
+    if not stream:
+        started = time.monotonic()
+        results = dict(await asyncio.gather(*tasks))
+        logger.info(f"🚀 Bootstrap served ({round((time.monotonic() - started) * 1000)} ms)")
+        return {
+            **{name: results[name].get('data') for name in names},
+            "errors": {name: r['error'] for name, r in results.items() if 'error' in r},
+        }
+
+    async def lines():
+        try:
+            for finished in asyncio.as_completed(tasks):
+                _, result = await finished
+                yield json.dumps(result, separators=(',', ':')) + '\n'
+        finally:
+            for task in tasks:
+                task.cancel()  # Client went away
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -1,12 +1,31 @@
 """
-Calendar ICS feed proxy endpoint
+Calendar ICS feed proxy and multi-feed aggregation endpoints
 """
 
-from fastapi import APIRouter, Query, HTTPException, Response
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+import asyncio
 import httpx
 import logging
+import os
+import time
+from datetime import date, datetime
 from urllib.parse import unquote
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .settings import read_settings
+from ..services import http_client
+from ..services.broadcast import broadcaster
+from ..services.cache import ResponseCache, CachedResponse
+from ..services.disk_cache import Persistence, persistent_cache
+from ..services.event_index import EventIndex
+from ..services.event_store import EventStore
+from ..services.ics import Event, normalize_feed_url, parse_events, window_bounds
+from ..services.ics_stream import (
+    CHUNK_SIZE, FeedTooLarge, FeedTrimmer, check_length, compact_events, history_horizon
+)
+from ..services.responses import conditional_response
+from ..services.scheduler import FeedScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +33,286 @@ router = APIRouter()
 
 CALENDAR_TIMEOUT = 30.0
 
+# Shared upstream cache: every display and refresh for the same feed
+# is served from one fetch per TTL window
+CALENDAR_CACHE_TTL = float(os.environ.get('CALENDAR_CACHE_TTL', '300'))
+CALENDAR_CACHE_STALE_TTL = float(os.environ.get('CALENDAR_CACHE_STALE_TTL', '3600'))
+CALENDAR_CACHE_MAX_ENTRIES = int(os.environ.get('CALENDAR_CACHE_MAX_ENTRIES', '64'))
+
+# Parsed events per feed, rebuilt only when the feed body's content hash changes.
+# A feed's index lives exactly as long as its body in calendar_cache, so ad hoc
+# feeds= URLs are dropped with the cache entry instead of accumulating.
+event_index = EventIndex()
+
+calendar_cache = ResponseCache(
+    ttl=CALENDAR_CACHE_TTL,
+    stale_ttl=CALENDAR_CACHE_STALE_TTL,
+    max_entries=CALENDAR_CACHE_MAX_ENTRIES,
+    persistence=Persistence(persistent_cache, 'calendar', CachedResponse),
+    on_evict=event_index.remove
+)
+
+# Per-feed budget when aggregating; a slow feed is reported, not waited on.
+# Its upstream fetch keeps running in the cache and warms it for next time.
+CALENDAR_FEED_TIMEOUT = float(os.environ.get('CALENDAR_FEED_TIMEOUT', '10'))
+
+DEFAULT_COLOR = '#3b82f6'
+
+# Compacted events on disk, so restarts don't re-parse unchanged feeds
+event_store = EventStore()
+
+# Background prefetch keeps every configured feed warm in the cache.
+# The default interval is below the cache TTL so viewers never see a miss.
+CALENDAR_PREFETCH = os.environ.get('CALENDAR_PREFETCH', '1').lower() not in ('0', 'false', 'no')
+CALENDAR_PREFETCH_INTERVAL = float(os.environ.get('CALENDAR_PREFETCH_INTERVAL', '240'))
+CALENDAR_PREFETCH_JITTER = float(os.environ.get('CALENDAR_PREFETCH_JITTER', '0.1'))
+CALENDAR_PREFETCH_MAX_BACKOFF = float(os.environ.get('CALENDAR_PREFETCH_MAX_BACKOFF', '3600'))
+
+async def fetch_ics(url: str, previous: Optional[CachedResponse] = None,
+                    sink: Optional['asyncio.Queue[Any]'] = None) -> CachedResponse:
+    """
+    Fetch an ICS feed from upstream (uncached).
+    With a previous response, revalidate conditionally and reuse it on 304.
+    With a sink, the upstream Content-Type and then each trimmed chunk are put
+    on it as they are produced, followed by None when the fetch ends (however it ends).
+    """
+    headers = previous.conditional_headers() if previous else {}
+    trimmer = FeedTrimmer(history_horizon())
+    chunks = []
+    try:
+        async with http_client.get_client().stream(
+            'GET', url, headers=headers, timeout=CALENDAR_TIMEOUT, follow_redirects=True,
+            extensions={'upstream': 'calendar'}
+        ) as response:
+            if response.status_code == 304 and previous is not None:
+                logger.info("✓ Calendar feed not modified upstream")
+                return previous
+            
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"Calendar feed returned {response.status_code}"
+                )
+            
+            content_type = response.headers.get('Content-Type', 'text/calendar')
+            if sink is not None:
+                sink.put_nowait(content_type)
+            # Trimmed as it arrives; oversized feeds are abandoned mid-download
+            try:
+                check_length(response.headers.get('Content-Length'))
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    chunks.append(trimmer.feed(chunk))
+                    if sink is not None and chunks[-1]:
+                        sink.put_nowait(chunks[-1])
+                chunks.append(trimmer.close())
+                if sink is not None and chunks[-1]:
+                    sink.put_nowait(chunks[-1])
+            except FeedTooLarge as e:
+                raise HTTPException(status_code=502, detail=str(e))
+    finally:
+        if sink is not None:
+            sink.put_nowait(None)
+    
+    ics_content = b''.join(chunks)
+    
+    if not ics_content or len(ics_content.strip()) == 0:
+        raise HTTPException(
+            status_code=500,
+            detail="Calendar feed returned empty response"
+        )
+    
+    logger.info(
+        f"✓ Calendar feed fetched ({trimmer.received} bytes, "
+        f"{trimmer.dropped} past events dropped, {len(ics_content)} bytes kept)"
+    )
+    
+    upstream_etag = response.headers.get('ETag')
+    upstream_last_modified = response.headers.get('Last-Modified')
+    if previous is not None:
+        return previous.revalidated(ics_content, content_type, upstream_etag, upstream_last_modified)
+    return CachedResponse(
+        body=ics_content,
+        content_type=content_type,
+        upstream_etag=upstream_etag,
+        upstream_last_modified=upstream_last_modified
+    )
+
+
+def configured_feeds(calendar_settings: Dict[str, Any]) -> List[Dict[str, str]]:
+    """ICS feeds from settings.json, with URLs normalized to ICS form"""
+    feeds = []
+    for feed in calendar_settings.get('icsFeeds') or []:
+        url = (feed.get('url') or '').strip()
+        if not url:
+            continue
+        feeds.append({
+            "name": feed.get('name') or url,
+            "url": normalize_feed_url(url),
+            "color": feed.get('color') or DEFAULT_COLOR
+        })
+    return feeds
+
+
+def select_feeds(calendar_settings: Dict[str, Any], requested: Optional[List[str]]) -> List[Dict[str, str]]:
+    """Resolve feeds= values (configured feed names or URLs); all configured feeds if omitted"""
+    configured = configured_feeds(calendar_settings)
+    if not requested:
+        return configured
+    selected = []
+    for value in requested:
+        url = normalize_feed_url(value)
+        match = next((f for f in configured if f['name'] == value or f['url'] == url), None)
+        selected.append(match or {"name": value, "url": url, "color": DEFAULT_COLOR})
+    return selected
+
+
+def _parse_compacted(body: bytes) -> List[Event]:
+    """Parse a feed body, keeping only current events and the lookback"""
+    text = body.decode('utf-8', errors='replace')
+    return compact_events(parse_events(text.splitlines()), history_horizon())
+
+
+async def _index_feed(url: str, cached: CachedResponse) -> None:
+    """Re-parse and re-index a feed if its content changed"""
+    previous_version = event_index.version(url)
+    if previous_version == cached.etag:
+        return
+    events = await asyncio.to_thread(event_store.load, url, cached.etag)
+    if events is None:
+        events = await asyncio.to_thread(_parse_compacted, cached.body)
+        await asyncio.to_thread(event_store.save, url, cached.etag, events)
+        logger.info(f"✓ Indexed calendar feed ({len(events)} events)")
+    else:
+        logger.info(f"✓ Indexed calendar feed from the event store ({len(events)} events)")
+    event_index.update(url, cached.etag, events)
+    if url not in calendar_cache:
+        # Evicted while it was being parsed
+        event_index.remove(url)
+        return
+    if previous_version is not None:
+        # Content changed since displays last loaded it
+        broadcaster.publish('calendar-updated', {"url": url})
+
+
+async def load_feed(url: str) -> str:
+    """
+    Fetch a feed (via the shared cache) and re-index it if its content changed.
+    Returns the cache status ('hit', 'stale' or 'miss').
+    """
+    previous = calendar_cache.get_entry(url)
+    cached, status = await calendar_cache.get_or_fetch(
+        url, lambda: fetch_ics(url, previous.value if previous else None)
+    )
+    await _index_feed(url, cached)
+    return status
+
+
+async def refresh_feed(url: str) -> None:
+    """Refetch a feed now (conditionally) and re-index it; used by the prefetch scheduler"""
+    previous = calendar_cache.get_entry(url)
+    cached = await calendar_cache.refresh(
+        url, lambda: fetch_ics(url, previous.value if previous else None)
+    )
+    await _index_feed(url, cached)
+
+
+prefetcher = FeedScheduler(
+    refresh_feed,
+    interval=CALENDAR_PREFETCH_INTERVAL,
+    jitter=CALENDAR_PREFETCH_JITTER,
+    max_backoff=CALENDAR_PREFETCH_MAX_BACKOFF
+)
+
+
+async def configure_prefetch(settings: Dict[str, Any]) -> None:
+    """Point the prefetch scheduler at the feeds currently in settings"""
+    if CALENDAR_PREFETCH:
+        prefetcher.configure(f['url'] for f in configured_feeds(settings.get('googleCalendar') or {}))
+
+
+async def _load_feed_status(feed: Dict[str, str]) -> Dict[str, Any]:
+    """Load one feed within its timeout budget and describe the outcome"""
+    status = {"name": feed['name'], "color": feed['color'], "ok": False}
+    started = time.monotonic()
+    try:
+        status["cache"] = await asyncio.wait_for(load_feed(feed['url']), CALENDAR_FEED_TIMEOUT)
+        status["ok"] = True
+    except HTTPException as e:
+        status["error"] = e.detail
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        status["error"] = "Calendar feed request timed out"
+    except httpx.RequestError as e:
+        status["error"] = f"Failed to fetch calendar feed: {str(e)}"
+    except Exception as e:
+        logger.error(f"❌ Unexpected calendar error: {e}", exc_info=True)
+        status["error"] = f"Unexpected error: {str(e)}"
+    status["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    return status
+
+
+async def collect_events(
+    feeds: List[Dict[str, str]],
+    window_start: datetime,
+    window_end: datetime
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Load all feeds concurrently and query the index.
+    Returns (merged color-tagged events, per-feed status).
+    """
+    feed_status = await asyncio.gather(*(_load_feed_status(feed) for feed in feeds))
+    loaded = {feed['url']: feed for feed, status in zip(feeds, feed_status) if status['ok']}
+
+    matches = list(event_index.query(window_start, window_end, loaded.keys()))
+
+    # Sort chronologically and drop VEVENTs a feed lists more than once (same UID and
+    # RECURRENCE-ID). Events from different feeds are always kept: two calendars can
+    # legitimately hold a meeting with the same title and time.
+    matches.sort(key=lambda m: m[1].start)
+    seen = set()
+    events = []
+    counts = {url: 0 for url in loaded}
+    for url, event in matches:
+        key = (url, event.uid, event.recurrence_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        counts[url] += 1
+        feed = loaded[url]
+        events.append(event.to_dict(feed=feed['name'], color=feed['color']))
+    for feed, status in zip(feeds, feed_status):
+        if status['ok']:
+            status['events'] = counts[feed['url']]
+    return events, list(feed_status)
+
+
+async def stream_feed(request: Request, task: 'asyncio.Task[CachedResponse]',
+                      sink: 'asyncio.Queue[Any]', headers: Dict[str, str]) -> Response:
+    """
+    Send a feed to the client while it downloads: trimmed chunks are passed on
+    as they arrive instead of after the whole upstream body. The fetch itself
+    (shared with other requests, cached when done) runs to completion even if
+    the client goes away.
+    """
+    content_type = await sink.get()
+    if content_type is None:
+        # Failed, or reused the previous body after a 304, before any body arrived
+        return conditional_response(request, await asyncio.shield(task), headers)
+
+    async def chunks():
+        while True:
+            chunk = await sink.get()
+            if chunk is None:
+                break
+            yield chunk
+        # A failure after the headers went out aborts the response
+        await asyncio.shield(task)
+
+    return StreamingResponse(chunks(), media_type=content_type, headers=headers)
+
+
 @router.get("/calendar")
 async def proxy_calendar(
+    request: Request,
     url: str = Query(..., description="Calendar ICS feed URL")
 ):
     """
@@ -27,36 +324,21 @@ async def proxy_calendar(
         # Decode URL
         url = unquote(url)
         
-        # Fetch ICS feed
-        async with httpx.AsyncClient(timeout=CALENDAR_TIMEOUT) as client:
-            response = await client.get(url, follow_redirects=True)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Calendar feed returned {response.status_code}"
-                )
-            
-            ics_content = response.text
-            
-            if not ics_content or len(ics_content.strip()) == 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Calendar feed returned empty response"
-                )
-            
-            logger.info(f"✓ Calendar feed fetched ({len(ics_content)} chars)")
-            
-            return Response(
-                content=ics_content,
-                media_type="text/calendar",
-                headers={
-                    'Cache-Control': 'no-cache, no-store, must-revalidate',
-                    'Pragma': 'no-cache',
-                    'Expires': '0'
-                }
-            )
+        previous = calendar_cache.get_entry(url)
+        sink: 'asyncio.Queue[Any]' = asyncio.Queue()
+        status, value, started = calendar_cache.get_or_start(
+            url, lambda: fetch_ics(url, previous.value if previous else None, sink)
+        )
+        headers = {'Cache-Control': 'no-cache', 'X-Cache': status.upper()}
+        if status != 'miss':
+            return conditional_response(request, value, headers)
+        if not started:
+            # Another request's fetch is already running: wait for its result
+            return conditional_response(request, await asyncio.shield(value), headers)
+        return await stream_feed(request, value, sink, headers)
     
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         logger.error(f"❌ Calendar feed timeout: {url}")
         raise HTTPException(
@@ -75,3 +357,45 @@ async def proxy_calendar(
             status_code=500,
             detail=f"Unexpected error: {str(e)}"
         )
+
+
+@router.get("/calendar/all")
+async def aggregate_calendars(
+    start: Optional[date] = Query(None, description="Window start (YYYY-MM-DD), default one week ago"),
+    end: Optional[date] = Query(None, description="Window end, exclusive (YYYY-MM-DD), default weeksAhead from settings")
+):
+    """
+    All feeds from settings.json fetched concurrently, merged into one event list.
+    A failing or slow feed is reported in "feeds" without delaying the others.
+    """
+    settings = await read_settings()
+    calendar_settings = settings.get('googleCalendar') or {}
+    window_start, window_end = window_bounds(start, end, calendar_settings.get('weeksAhead') or 4)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="'end' must be after 'start'")
+
+    events, feed_status = await collect_events(configured_feeds(calendar_settings), window_start, window_end)
+    return {
+        "start": window_start.isoformat(),
+        "end": window_end.isoformat(),
+        "events": events,
+        "feeds": feed_status
+    }
+
+
+@router.get("/calendar/cache")
+async def calendar_cache_stats():
+    """Hit/miss counters for the shared calendar feed cache"""
+    return calendar_cache.stats()
+
+
+@router.get("/calendar/store")
+async def calendar_store_stats():
+    """Compacted feeds kept on disk and how often they spared a re-parse"""
+    return await asyncio.to_thread(event_store.stats)
+
+
+@router.get("/calendar/prefetch")
+async def calendar_prefetch_status():
+    """Background prefetch schedule and last result per feed"""
+    return {"enabled": CALENDAR_PREFETCH, **prefetcher.stats()}
@@ -0,0 +1,64 @@
+"""
+Normalized calendar events endpoint
+Parses ICS feeds on the server and returns only events inside the requested window
+"""
+
+from fastapi import APIRouter, Query, HTTPException
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+from .calendar import collect_events, configured_feeds, event_index, select_feeds
+from .settings import read_settings
+from ..services.ics import DEFAULT_TZ, window_bounds
+
+router = APIRouter()
+
+
+@router.get("/events")
+async def get_events(
+    start: Optional[date] = Query(None, description="Window start (YYYY-MM-DD), default one week ago"),
+    end: Optional[date] = Query(None, description="Window end, exclusive (YYYY-MM-DD), default weeksAhead from settings"),
+    feeds: Optional[List[str]] = Query(None, description="Feed names or ICS URLs, default all configured feeds")
+):
+    """
+    Events from the configured ICS feeds inside [start, end), as normalized JSON
+    """
+    settings = await read_settings()
+    calendar_settings = settings.get('googleCalendar') or {}
+    window_start, window_end = window_bounds(start, end, calendar_settings.get('weeksAhead') or 4)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="'end' must be after 'start'")
+
+    events, feed_status = await collect_events(
+        select_feeds(calendar_settings, feeds), window_start, window_end
+    )
+    return {
+        "start": window_start.isoformat(),
+        "end": window_end.isoformat(),
+        "events": events,
+        "feeds": feed_status
+    }
+
+
+@router.get("/events/today")
+async def get_todays_events():
+    """Today's events across all configured feeds (what the Today widget shows)"""
+    settings = await read_settings()
+    today = datetime.combine(datetime.now(DEFAULT_TZ).date(), time.min, tzinfo=DEFAULT_TZ)
+    events, feed_status = await collect_events(
+        configured_feeds(settings.get('googleCalendar') or {}), today, today + timedelta(days=1)
+    )
+    return {
+        "date": today.date().isoformat(),
+        "events": events,
+        "feeds": feed_status
+    }
+
+
+@router.get("/events/stats")
+async def event_index_stats():
+    """Index and recurrence-expansion counters"""
+    return {
+        "index": event_index.stats(),
+        "expansions": event_index.expansions.stats()
+    }
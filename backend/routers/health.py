@@ -4,13 +4,22 @@ Health check and version endpoints
 
 from fastapi import APIRouter
 from datetime import datetime
-import hashlib
-import glob
-import os
-from pathlib import Path
+import asyncio
+import logging
+
+from ..services import http_client
+from ..services.broadcast import broadcaster
+from ..services.disk_cache import persistent_cache
+from ..services.version import VersionWatcher
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Computed at startup, kept current by one background watcher (see main.py lifespan)
+version_watcher = VersionWatcher(['index.html', 'backend/main.py', 'js/app.js', 'js/config.js'])
+version_watcher.add_listener(lambda version: broadcaster.publish('version-changed', {"version": version}))
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint - responds immediately"""
@@ -22,39 +31,18 @@ async def health_check():
 
 @router.get("/version")
 async def get_version():
-    """Get server version based on file modification times"""
-    try:
-        # Get modification times of key files
-        key_files = [
-            'index.html',
-            'backend/main.py',
-            'js/app.js',
-            'js/config.js'
-        ]
-        
-        # Add JS/CSS files
-        js_files = glob.glob('js/**/*.js', recursive=True)
-        css_files = glob.glob('css/**/*.css', recursive=True)
-        key_files.extend(js_files[:10])
-        key_files.extend(css_files[:10])
-        
-        version_parts = []
-        for file_path in key_files:
-            if os.path.exists(file_path):
-                mtime = os.path.getmtime(file_path)
-                version_parts.append(f"{file_path}:{mtime}")
-        
-        # Create hash
-        version_string = '|'.join(sorted(version_parts))
-        version_hash = hashlib.md5(version_string.encode()).hexdigest()[:12]
-        
-        return {
-            "version": version_hash,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {
-            "version": "unknown",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    """Current dashboard code version (memory read; changes are pushed over /api/stream)"""
+    return version_watcher.snapshot()
+
+@router.get("/upstream/connections")
+async def upstream_connections():
+    """Requests vs. new connections per upstream host (connection reuse)"""
+    return {
+        "hosts": http_client.stats.snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/cache/persistent")
+async def persistent_cache_stats():
+    """On-disk response cache shared by the calendar and Home Assistant proxies"""
+    return await asyncio.to_thread(persistent_cache.stats)
@@ -3,24 +3,84 @@ Home Assistant API proxy endpoint
 """
 
 from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 import httpx
+import json
 import logging
+import os
+import time
 from urllib.parse import unquote, urljoin
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from ..services import http_client
+from ..services.cache import ResponseCache
+from ..services.disk_cache import Persistence, persistent_cache
+from ..services.ha_hub import hub
+from ..services.ha_states import (
+    ProxyMetrics, UpstreamResponse, cache_key, filter_states, metric_headers, split_param
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 HA_TIMEOUT = 30.0
+HA_STREAM_HEARTBEAT = 15.0
+
+# Short-lived cache; identical concurrent requests share one upstream call.
+# Persisted so a restart can answer with the last snapshot while refetching.
+HA_CACHE_RESTORE_TTL = float(os.environ.get('HA_CACHE_RESTORE_TTL', '300'))
+ha_cache = ResponseCache(
+    ttl=float(os.environ.get('HA_CACHE_TTL', '2')),
+    stale_ttl=0,
+    max_entries=int(os.environ.get('HA_CACHE_MAX_ENTRIES', '32')),
+    persistence=Persistence(persistent_cache, 'homeassistant', UpstreamResponse, restore_ttl=HA_CACHE_RESTORE_TTL)
+)
+ha_metrics = ProxyMetrics()
+
+
+async def configure_hub(settings: Dict[str, Any]) -> None:
+    """Settings listener: point the hub at the configured Home Assistant"""
+    ha_settings = settings.get('homeAssistant') or {}
+    hub.configure(ha_settings.get('url'), ha_settings.get('accessToken'))
+
+async def fetch_homeassistant(url: str, token: Optional[str]) -> UpstreamResponse:
+    """Fetch and parse one Home Assistant API response (uncached)"""
+    headers = {
+        'Content-Type': 'application/json'
+    }
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    
+    # Fetch from Home Assistant over the shared keep-alive pool
+    started = time.monotonic()
+    response = await http_client.get_client().get(
+        url, headers=headers, timeout=HA_TIMEOUT, follow_redirects=True,
+        extensions={'upstream': 'homeassistant'}
+    )
+    latency_ms = (time.monotonic() - started) * 1000
+    
+    if response.status_code != 200:
+        error_text = response.text[:200] if response.text else ''
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=f"Home Assistant returned {response.status_code}: {error_text}"
+        )
+    
+    ha_metrics.record_upstream(len(response.content), latency_ms)
+    return UpstreamResponse(data=response.json(), size=len(response.content), latency_ms=latency_ms)
+
 
 @router.get("/homeassistant")
 async def proxy_homeassistant(
     url: str = Query(..., description="Home Assistant API URL"),
-    token: Optional[str] = Query(None, description="Home Assistant access token")
+    token: Optional[str] = Query(None, description="Home Assistant access token"),
+    entities: Optional[str] = Query(None, description="Comma-separated entity ids to return (state lists only)"),
+    fields: Optional[str] = Query(None, description="Comma-separated state fields to keep, e.g. state,attributes")
 ):
     """
     Proxy Home Assistant API requests
+    Cached briefly and coalesced; optionally trimmed to the given entities and fields
     """
     logger.info(f"🏠 Home Assistant proxy request: {url[:100]}...")
     
@@ -28,29 +88,23 @@ async def proxy_homeassistant(
         # Decode URL
         url = unquote(url)
         
-        # Build headers
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        if token:
-            headers['Authorization'] = f'Bearer {token}'
+        started = time.monotonic()
+        upstream, cache_status = await ha_cache.get_or_fetch(
+            cache_key(url, token), lambda: fetch_homeassistant(url, token)
+        )
+        body = json.dumps(filter_states(upstream.data, split_param(entities), split_param(fields))).encode()
+        elapsed_ms = (time.monotonic() - started) * 1000
+        ha_metrics.record_response(upstream, len(body), elapsed_ms)
+        logger.info(f"✓ Home Assistant request successful ({cache_status}, {upstream.size} -> {len(body)} bytes)")
         
-        # Fetch from Home Assistant
-        async with httpx.AsyncClient(timeout=HA_TIMEOUT) as client:
-            response = await client.get(url, headers=headers, follow_redirects=True)
-            
-            if response.status_code != 200:
-                error_text = response.text[:200] if response.text else ''
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Home Assistant returned {response.status_code}: {error_text}"
-                )
-            
-            data = response.json()
-            logger.info(f"✓ Home Assistant request successful")
-            
-            return data
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers=metric_headers(upstream, len(body), elapsed_ms, cache_status)
+        )
     
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         logger.error(f"❌ Home Assistant timeout: {url}")
         raise HTTPException(
@@ -69,3 +123,56 @@ async def proxy_homeassistant(
             status_code=500,
             detail=f"Unexpected error: {str(e)}"
         )
+
+
+@router.get("/homeassistant/metrics")
+async def homeassistant_metrics():
+    """Proxy cache counters and upstream vs. returned bytes/latency"""
+    return {"cache": ha_cache.stats(), "proxy": ha_metrics.stats()}
+
+
+@router.get("/homeassistant/stream")
+async def homeassistant_stream(
+    request: Request,
+    entities: Optional[str] = Query(None, description="Comma-separated entity ids, default all entities")
+):
+    """
+    text/event-stream of Home Assistant states from the shared hub connection:
+    one 'snapshot' event, then coalesced 'state' deltas for the requested entities
+    """
+    if not hub.enabled:
+        raise HTTPException(status_code=503, detail="Home Assistant hub is not running")
+
+    wanted = [e.strip() for e in (entities or '').split(',') if e.strip()]
+    subscription = hub.subscribe(wanted)
+    logger.info(f"🏠 Hub client connected ({len(wanted) or 'all'} entities, {hub.stats()['clients']} clients)")
+
+    async def frames():
+        try:
+            yield "retry: 5000\n\n"
+            snapshot = {"connected": hub.connected, "states": hub.snapshot(subscription)}
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(HA_STREAM_HEARTBEAT)
+                if not batch:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: state\ndata: {json.dumps(batch)}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+            logger.info("🏠 Hub client disconnected")
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@router.get("/homeassistant/hub")
+async def homeassistant_hub_stats():
+    """Upstream connection state and fan-out counters"""
+    return hub.stats()
@@ -0,0 +1,30 @@
+"""
+Prometheus metrics endpoint
+Per-route request counts, latency and in-flight requests, upstream latency,
+outcomes and bytes labelled by service name (homeassistant, calendar, weather,
+unsplash, camera, other), and hit ratios of the shared caches.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from .backgrounds import list_cache
+from .bootstrap import joke_cache
+from .calendar import calendar_cache
+from .homeassistant import ha_cache
+from .weather import weather_cache
+from ..services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+registry.add_cache('calendar', calendar_cache)
+registry.add_cache('homeassistant', ha_cache)
+registry.add_cache('weather', weather_cache)
+registry.add_cache('backgrounds', list_cache)
+registry.add_cache('joke', joke_cache)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Text exposition format for Prometheus scrapes"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -2,64 +2,138 @@
 Settings API endpoints
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from datetime import datetime
-import json
-import asyncio
 from pathlib import Path
+import asyncio
 import logging
 
+from ..services.responses import conditional_response
+from ..services.json_patch import PatchError
+from ..services.settings_store import SettingsStore
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 SETTINGS_FILE = Path('settings.json')
-# Use asyncio lock for file operations
-_settings_lock = asyncio.Lock()
+# Parsed document kept in memory; saves are written behind, atomically.
+# Hand edits are noticed by watch_file() in a thread, so reads never touch the file.
+store = SettingsStore(str(SETTINGS_FILE), check_on_read=False)
+
+# Called with the new settings after every successful save
+_listeners: List[Callable[[Dict[str, Any]], Awaitable[None]]] = []
+
+
+def add_listener(listener: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+    """Register an async callback for settings changes"""
+    _listeners.append(listener)
+
+
+async def _notify_listeners(settings: Dict[str, Any]) -> None:
+    for listener in _listeners:
+        try:
+            await listener(settings)
+        except Exception as e:
+            logger.error(f"❌ Settings listener failed: {e}", exc_info=True)
+
+
+# Event loop the listeners run on; set by watch_file() when the app starts
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _file_edited(settings: Dict[str, Any]) -> None:
+    """Store listener (any thread): run the async listeners for a hand edit of settings.json"""
+    if _loop is not None:
+        _loop.call_soon_threadsafe(lambda: asyncio.ensure_future(_notify_listeners(settings)))
+
+
+store.add_listener(_file_edited)
+
+
+async def watch_file() -> None:
+    """Lifespan task: notice hand edits to settings.json even while no display is polling"""
+    global _loop
+    _loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await asyncio.to_thread(store.check)
+        except Exception as e:
+            logger.error(f"❌ Settings file check failed: {e}")
+        await asyncio.sleep(store.check_interval)
+
+
+async def read_settings() -> Dict[str, Any]:
+    """Current settings for other routers ({} if missing or invalid)"""
+    return store.get()
+
 
 @router.get("/settings")
-async def get_settings():
-    """Get current settings"""
-    logger.info("📋 GET /api/settings request")
+async def get_settings(
+    request: Request,
+    since: Optional[int] = Query(None, description="Revision the client has; returns only keys changed after it")
+):
+    """
+    Get current settings from memory (ETag / Last-Modified aware).
+    With ?since=<rev>: 304 if unchanged, {"revision", "changes"} with changed keys
+    (null = removed), or {"revision", "settings"} if that revision is too old.
+    """
+    logger.info(f"📋 GET /api/settings request{f' since {since}' if since is not None else ''}")
+    revision_header = {'X-Settings-Revision': str(store.revision)}
+    if since is None:
+        return conditional_response(request, store.response(), {'Cache-Control': 'no-cache', **revision_header})
+    
+    changes = store.changes_since(since)
+    if changes == {}:
+        return Response(status_code=304, headers=revision_header)
+    if changes is None:
+        settings = {k: v for k, v in (await read_settings()).items() if not k.startswith('_')}
+        return {"revision": store.revision, "settings": settings}
+    return {"revision": store.revision, "changes": changes}
+
+@router.patch("/settings")
+async def patch_settings(request: Request):
+    """
+    Partial update: JSON Merge Patch (RFC 7386, application/merge-patch+json or
+    application/json) or JSON Patch (RFC 6902, application/json-patch+json)
+    """
+    content_type = request.headers.get('content-type', '')
+    logger.info(f"🩹 PATCH /api/settings request ({content_type or 'no content type'})")
     try:
-        async with _settings_lock:
-            if SETTINGS_FILE.exists():
-                content = SETTINGS_FILE.read_text()
-                settings = json.loads(content)
-                logger.info(f"✓ Settings loaded ({len(settings)} keys)")
-            else:
-                settings = {}
-                logger.info("⚠ Settings file not found, returning empty settings")
-        
-        # Remove metadata fields
-        settings.pop('_lastUpdated', None)
-        return settings
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Invalid JSON in settings file: {e}")
-        raise HTTPException(status_code=500, detail="Settings file contains invalid JSON")
-    except Exception as e:
-        logger.error(f"❌ Error loading settings: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to load settings: {str(e)}")
+        patch = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
+    try:
+        revision = store.patch(patch, content_type, {'_lastUpdated': datetime.now().isoformat()})
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    logger.info(f"✓ Settings patched (revision {revision})")
+    
+    await _notify_listeners(await read_settings())
+    return {"success": True, "revision": revision}
 
 @router.post("/settings")
 async def save_settings(settings: Dict[str, Any]):
     """Save settings - accepts settings object directly"""
     logger.info("💾 POST /api/settings request")
     try:
-        async with _settings_lock:
-            # Add metadata
-            settings['_lastUpdated'] = datetime.now().isoformat()
-            
-            # Write to file atomically
-            temp_file = SETTINGS_FILE.with_suffix('.tmp')
-            temp_file.write_text(json.dumps(settings, indent=2))
-            temp_file.replace(SETTINGS_FILE)
-            
-            logger.info(f"✓ Settings saved ({len(settings)} keys)")
+        # Add metadata
+        settings['_lastUpdated'] = datetime.now().isoformat()
         
-        return {"success": True, "message": "Settings saved successfully"}
+        # Visible immediately; written to disk after SETTINGS_WRITE_DELAY
+        revision = store.set(settings)
+        logger.info(f"✓ Settings saved ({len(settings)} keys, revision {revision})")
+        
+        await _notify_listeners(await read_settings())
+        return {"success": True, "message": "Settings saved successfully", "revision": revision}
     except Exception as e:
         logger.error(f"❌ Error saving settings: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save settings: {str(e)}")
+
+
+@router.get("/settings/store")
+async def settings_store_stats():
+    """Saves vs. disk writes and reloads of settings.json"""
+    return store.stats()
@@ -0,0 +1,51 @@
+"""
+Static dashboard files
+Served from the in-memory asset table: precompressed variants, content-hash
+ETags and immutable caching for hashed URLs (js/app.<hash>.js)
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from ..services.static_assets import AssetTable
+
+router = APIRouter()
+
+STATIC_DIR = '.'
+assets = AssetTable(STATIC_DIR)
+
+
+@router.get("/api/static/stats", tags=["health"])
+async def static_stats():
+    """Assets held in memory and their compressed sizes"""
+    return assets.stats()
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+def serve_static(path: str, request: Request):
+    """
+    Serve index.html, control.html, css/ and js/ (must be registered last).
+    Plain def: a changed file is re-read and recompressed inline, so this runs
+    in the threadpool rather than on the event loop.
+    """
+    if path.startswith('api/'):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    resolved = assets.resolve(path)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    file_path, immutable = resolved
+
+    asset = assets.get(file_path)
+    if asset is None:
+        # Too large to keep in memory
+        return FileResponse(assets.file_path(file_path))
+
+    status, headers, body = asset.response(
+        request.headers.get('accept-encoding'),
+        request.headers.get('if-none-match'),
+        immutable
+    )
+    if request.method == 'HEAD':
+        body = b''
+    return Response(content=body, status_code=status, headers=headers)
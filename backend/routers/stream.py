@@ -0,0 +1,64 @@
+"""
+Server-Sent Events push channel
+Replaces dashboard polling of /api/settings, /api/version and calendar feeds
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from ..services.broadcast import broadcaster
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Comment frames keep proxies (nginx) from closing idle connections
+STREAM_HEARTBEAT = float(os.environ.get('STREAM_HEARTBEAT', '15'))
+STREAM_RETRY_MS = 5000
+
+
+async def publish_settings_changed(settings: Dict[str, Any]) -> None:
+    """Settings listener: tell every display that settings changed"""
+    broadcaster.publish('settings-changed', {
+        "lastUpdated": settings.get('_lastUpdated'),
+        "revision": settings.get('_revision')
+    })
+
+
+@router.get("/stream")
+async def event_stream(request: Request):
+    """
+    text/event-stream of settings-changed, version-changed and calendar-updated events
+    """
+    subscription = broadcaster.subscribe()
+    logger.info(f"📡 Stream client connected ({broadcaster.stats()['clients']} total)")
+
+    async def frames():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            yield f"event: hello\ndata: {{\"timestamp\": \"{datetime.now().isoformat()}\"}}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=STREAM_HEARTBEAT)
+                yield event.encode() if event is not None else ": heartbeat\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+            logger.info("📡 Stream client disconnected")
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable nginx response buffering
+        }
+    )
+
+
+@router.get("/stream/stats")
+async def stream_stats():
+    """Connected clients and dropped events"""
+    return broadcaster.stats()
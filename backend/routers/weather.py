@@ -0,0 +1,159 @@
+"""
+OpenWeatherMap proxy
+Current conditions and the 5-day forecast are fetched once per location per
+TTL for every display, with the API key kept on the server, and trimmed to the
+fields the weather and forecast widgets render.
+"""
+
+from fastapi import APIRouter, Query, HTTPException, Request
+import asyncio
+import httpx
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from .settings import read_settings
+from ..services import http_client
+from ..services.cache import ResponseCache, CachedResponse
+from ..services.disk_cache import Persistence, persistent_cache
+from ..services.responses import conditional_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+OWM_BASE_URL = 'https://api.openweathermap.org/data/2.5'
+WEATHER_TIMEOUT = 15.0
+# Falls back to weather.openWeatherMap.apiKey in settings.json
+OPENWEATHERMAP_API_KEY = os.environ.get('OPENWEATHERMAP_API_KEY', '')
+
+# OpenWeatherMap refreshes current conditions about every 10 minutes
+# (the forecast every 3 hours), so more frequent calls only spend quota
+WEATHER_CACHE_TTL = float(os.environ.get('WEATHER_CACHE_TTL', '600'))
+WEATHER_CACHE_STALE_TTL = float(os.environ.get('WEATHER_CACHE_STALE_TTL', '1800'))
+
+weather_cache = ResponseCache(
+    ttl=WEATHER_CACHE_TTL,
+    stale_ttl=WEATHER_CACHE_STALE_TTL,
+    max_entries=16,
+    persistence=Persistence(persistent_cache, 'weather', CachedResponse)
+)
+
+# Coordinates are rounded so displays a few hundred meters apart share an entry
+COORDINATE_PRECISION = 2
+
+
+def trim_current(data: Dict[str, Any]) -> Dict[str, Any]:
+    """/weather response reduced to what the widgets render"""
+    main = data.get('main') or {}
+    return {
+        "dt": data.get('dt'),
+        "main": {k: main.get(k) for k in ('temp', 'feels_like', 'humidity')},
+        "wind": {"speed": (data.get('wind') or {}).get('speed')},
+        "weather": [{k: w.get(k) for k in ('main', 'description', 'icon')} for w in (data.get('weather') or [])[:1]],
+        "sys": {k: (data.get('sys') or {}).get(k) for k in ('sunrise', 'sunset')},
+    }
+
+
+def trim_forecast(data: Dict[str, Any]) -> Dict[str, Any]:
+    """/forecast response reduced to the 3-hour temperatures and conditions"""
+    return {
+        "list": [
+            {
+                "dt": item.get('dt'),
+                "main": {k: (item.get('main') or {}).get(k) for k in ('temp', 'temp_min', 'temp_max')},
+                "weather": [{"main": w.get('main')} for w in (item.get('weather') or [])[:1]],
+            }
+            for item in data.get('list') or []
+        ]
+    }
+
+
+async def fetch_owm(endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    response = await http_client.get_client().get(
+        f"{OWM_BASE_URL}/{endpoint}", params=params, timeout=WEATHER_TIMEOUT,
+        extensions={'upstream': 'weather'}
+    )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=502 if response.status_code >= 500 else response.status_code,
+            detail=f"OpenWeatherMap returned {response.status_code}"
+        )
+    return response.json()
+
+
+async def fetch_weather(lat: float, lon: float, units: str, api_key: str) -> CachedResponse:
+    """Current conditions and forecast for one location (uncached, both calls in parallel)"""
+    params = {"lat": lat, "lon": lon, "units": units, "appid": api_key}
+    current, forecast = await asyncio.gather(fetch_owm('weather', params), fetch_owm('forecast', params))
+    body = json.dumps({
+        "location": {"lat": lat, "lon": lon, "units": units},
+        "current": trim_current(current),
+        "forecast": trim_forecast(forecast),
+    }).encode()
+    logger.info(f"✓ Weather fetched for {lat},{lon} ({len(body)} bytes)")
+    return CachedResponse(body=body, content_type='application/json')
+
+
+async def load_weather(
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    units: Optional[str] = None
+) -> Tuple[CachedResponse, str]:
+    """
+    Cached weather for a location (settings fill in what is not given).
+    Returns (response, cache status); shared by /weather and /bootstrap.
+    """
+    owm = ((await read_settings()).get('weather') or {}).get('openWeatherMap') or {}
+    api_key = OPENWEATHERMAP_API_KEY or owm.get('apiKey') or ''
+    if not api_key or api_key == 'YOUR_OPENWEATHERMAP_API_KEY':
+        raise HTTPException(status_code=503, detail="OpenWeatherMap API key is not configured")
+
+    try:
+        lat = float(lat if lat is not None else owm['lat'])
+        lon = float(lon if lon is not None else owm['lon'])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Missing or invalid lat/lon")
+    units = units or owm.get('units') or 'imperial'
+    if units not in ('imperial', 'metric', 'standard'):
+        raise HTTPException(status_code=400, detail=f"Invalid units: {units}")
+
+    lat = round(lat, COORDINATE_PRECISION)
+    lon = round(lon, COORDINATE_PRECISION)
+    try:
+        return await weather_cache.get_or_fetch(
+            f"{lat},{lon}|{units}", lambda: fetch_weather(lat, lon, units, api_key)
+        )
+    except HTTPException:
+        raise
+    except httpx.TimeoutException:
+        logger.error("❌ OpenWeatherMap timeout")
+        raise HTTPException(status_code=504, detail="OpenWeatherMap request timed out")
+    except httpx.RequestError as e:
+        logger.error(f"❌ OpenWeatherMap error: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to reach OpenWeatherMap: {str(e)}")
+
+
+@router.get("/weather")
+async def get_weather(
+    request: Request,
+    lat: Optional[float] = Query(None, description="Latitude (default: settings)"),
+    lon: Optional[float] = Query(None, description="Longitude (default: settings)"),
+    units: Optional[str] = Query(None, description="imperial, metric or standard (default: settings)")
+):
+    """
+    Current weather and 5-day forecast from OpenWeatherMap.
+    Shared by every display: one upstream fetch per location per WEATHER_CACHE_TTL.
+    """
+    cached, status = await load_weather(lat, lon, units)
+    return conditional_response(request, cached, {
+        'Cache-Control': 'no-cache',
+        'X-Cache': status.upper()
+    })
+
+
+@router.get("/weather/cache")
+async def weather_cache_stats():
+    """Hit/miss counters for the shared weather cache"""
+    return weather_cache.stats()
@@ -0,0 +1 @@
+"""Shared services used by the FastAPI backend and the legacy server.py"""
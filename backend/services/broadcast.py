@@ -0,0 +1,88 @@
+"""
+In-process pub/sub for pushing server events to connected dashboards (SSE)
+Each subscriber has a bounded queue; a slow client loses its oldest events
+instead of growing memory without limit.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ServerEvent:
+    __slots__ = ('id', 'name', 'data')
+
+    def __init__(self, id: int, name: str, data: Any):
+        self.id = id
+        self.name = name
+        self.data = data
+
+    def encode(self) -> str:
+        """Format as a text/event-stream frame"""
+        return f"id: {self.id}\nevent: {self.name}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+    """One connected client"""
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[ServerEvent]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event: ServerEvent) -> None:
+        """Enqueue without blocking, dropping the oldest event if full"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ServerEvent]:
+        """Next event, or None after timeout (time to send a heartbeat)"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Broadcaster:
+    """Fan-out of named events to every subscriber"""
+
+    def __init__(self, max_queue: int = 32):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, name: str, data: Any = None) -> None:
+        """Send an event to every subscriber; never blocks the caller"""
+        event = ServerEvent(next(self._ids), name, data if data is not None else {})
+        self.published += 1
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+        logger.info(f"📣 {name} -> {len(self._subscribers)} client(s)")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
+
+
+# Process-wide instance used by the routers
+broadcaster = Broadcaster()
@@ -0,0 +1,367 @@
+"""
+In-memory response cache for upstream feeds
+TTL-bounded, LRU-evicted, stale-while-revalidate, with single-flight fetches.
+Standard library only so the legacy server.py can share it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .http_cache import make_etag
+
+if TYPE_CHECKING:
+    from .disk_cache import Persistence
+
+
+@dataclass
+class CachedResponse:
+    """
+    Upstream response body as stored in the cache.
+
+    etag/last_modified are the validators we send to our clients;
+    upstream_etag/upstream_last_modified are what upstream sent us and are
+    replayed as If-None-Match/If-Modified-Since when revalidating.
+    """
+    body: bytes
+    content_type: str
+    upstream_etag: Optional[str] = None
+    upstream_last_modified: Optional[str] = None
+    last_modified: float = field(default_factory=time.time)
+    etag: str = ''
+
+    def __post_init__(self):
+        if not self.etag:
+            self.etag = make_etag(self.body)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers for revalidating this response with upstream"""
+        headers = {}
+        if self.upstream_etag:
+            headers['If-None-Match'] = self.upstream_etag
+        if self.upstream_last_modified:
+            headers['If-Modified-Since'] = self.upstream_last_modified
+        return headers
+
+    def revalidated(self, new_body: bytes, content_type: str,
+                    upstream_etag: Optional[str], upstream_last_modified: Optional[str]) -> 'CachedResponse':
+        """Build the successor of this response, keeping Last-Modified if the body is unchanged"""
+        etag = make_etag(new_body)
+        return CachedResponse(
+            body=new_body,
+            content_type=content_type,
+            upstream_etag=upstream_etag or self.upstream_etag,
+            upstream_last_modified=upstream_last_modified or self.upstream_last_modified,
+            last_modified=self.last_modified if etag == self.etag else time.time(),
+            etag=etag,
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialized form for the persistent cache: a JSON header line, then the body"""
+        header = {
+            "content_type": self.content_type,
+            "upstream_etag": self.upstream_etag,
+            "upstream_last_modified": self.upstream_last_modified,
+            "last_modified": self.last_modified,
+            "etag": self.etag,
+        }
+        return json.dumps(header).encode() + b'\n' + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CachedResponse':
+        header, _, body = data.partition(b'\n')
+        return cls(body=body, **json.loads(header))
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and its freshness window"""
+    value: Any
+    stored_at: float
+    ttl: float
+    stale_ttl: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.stored_at < self.ttl
+
+    def is_usable(self, now: float) -> bool:
+        """Fresh, or stale but still inside the stale-while-revalidate window"""
+        return now - self.stored_at < self.ttl + self.stale_ttl
+
+
+class _SyncCall:
+    """An upstream fetch in progress, shared by threads asking for the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Per-key cache shared by all clients.
+
+    Fresh entries are served directly. Stale entries inside the
+    stale-while-revalidate window are served immediately while a single
+    background refresh runs. Misses block on one upstream fetch per key,
+    no matter how many requests ask for it concurrently.
+
+    With persistence, stored values are also written to disk and restore()
+    loads them back at startup, so a restarted server starts warm. Lookups
+    never touch the disk.
+
+    on_evict is called with the key of every entry that leaves the cache
+    (LRU eviction, invalidate, clear), so state derived from a cached value
+    can be dropped with it.
+    """
+
+    def __init__(self, ttl: float = 300.0, stale_ttl: float = 3600.0, max_entries: int = 64,
+                 persistence: Optional['Persistence'] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.persistence = persistence
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._calls: Dict[str, _SyncCall] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    # -- storage -----------------------------------------------------------
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key (any age) and mark it recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def __contains__(self, key: str) -> bool:
+        """True if key has an entry (any age); does not count as a use"""
+        with self._lock:
+            return key in self._entries
+
+    def restore(self) -> int:
+        """
+        Load persisted entries (up to max_entries, keeping their age) into memory.
+        Blocking: call at startup, or via asyncio.to_thread. Restored entries are
+        usable while refreshing for up to the persistence's restore_ttl.
+        """
+        if self.persistence is None:
+            return 0
+        now = time.monotonic()
+        entries = self.persistence.load_all(self.max_entries)
+        for key, value, age, ttl in entries:
+            self._store(key, CacheEntry(
+                value=value,
+                stored_at=now - age,
+                ttl=ttl,
+                stale_ttl=max(self.stale_ttl, self.persistence.restore_ttl - ttl),
+            ))
+        return len(entries)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries over the limit"""
+        entry = CacheEntry(
+            value=value,
+            stored_at=time.monotonic(),
+            ttl=self.ttl if ttl is None else ttl,
+            stale_ttl=self.stale_ttl,
+        )
+        self._store(key, entry)
+        if self.persistence is not None:
+            self.persistence.save(key, value, entry.ttl)
+
+    def _store(self, key: str, entry: CacheEntry) -> None:
+        evicted = []
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.evictions += 1
+        self._evicted(evicted)
+
+    def _evicted(self, keys: List[str]) -> None:
+        """Run on_evict outside the lock"""
+        if self.on_evict is not None:
+            for key in keys:
+                self.on_evict(key)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+        if self.persistence is not None:
+            self.persistence.delete(key)
+        if removed:
+            self._evicted([key])
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+        self._evicted(keys)
+
+    def _lookup(self, key: str):
+        """Classify a lookup as ('hit' | 'stale' | 'miss', entry) and count it"""
+        entry = self.get_entry(key)
+        now = time.monotonic()
+        with self._lock:
+            if entry is not None and entry.is_fresh(now):
+                self.hits += 1
+                return 'hit', entry
+            if entry is not None and entry.is_usable(now):
+                self.stale_hits += 1
+                return 'stale', entry
+            self.misses += 1
+            return 'miss', None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+                "in_flight": len(self._tasks) + len(self._calls),
+                "restored": self.persistence.restored if self.persistence is not None else 0,
+            }
+
+    # -- asyncio (FastAPI) -------------------------------------------------
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """
+        Return (value, status) where status is 'hit', 'stale' or 'miss'.
+        fetch is awaited at most once per key at a time.
+        """
+        status, entry = self._lookup(key)
+        if status == 'hit':
+            return entry.value, status
+        if status == 'stale':
+            self._start_task(key, fetch, refresh=True)
+            return entry.value, status
+        # Shield so a disconnecting client does not cancel the shared fetch
+        value = await asyncio.shield(self._start_task(key, fetch))
+        return value, status
+
+    def get_or_start(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Tuple[str, Any, bool]:
+        """
+        get_or_fetch without waiting on a miss, for callers that stream the fetch
+        as it runs: (status, value, False) for a hit or stale hit, or
+        ('miss', task, started) where task is the shared fetch and started is
+        True if it runs this call's fetch.
+        """
+        status, entry = self._lookup(key)
+        if status == 'hit':
+            return status, entry.value, False
+        if status == 'stale':
+            self._start_task(key, fetch, refresh=True)
+            return status, entry.value, False
+        started = key not in self._tasks
+        return status, self._start_task(key, fetch), started
+
+    async def refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """Fetch key now regardless of freshness (joins a fetch already in flight)"""
+        return await asyncio.shield(self._start_task(key, fetch, refresh=True))
+
+    def _start_task(self, key: str, fetch: Callable[[], Awaitable[Any]], refresh: bool = False) -> asyncio.Task:
+        task = self._tasks.get(key)
+        if task is not None:
+            return task
+
+        async def run():
+            try:
+                value = await fetch()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+            self.set(key, value)
+            return value
+
+        if refresh:
+            with self._lock:
+                self.refreshes += 1
+        task = asyncio.ensure_future(run())
+        self._tasks[key] = task
+
+        def done(t: asyncio.Task):
+            if self._tasks.get(key) is t:
+                del self._tasks[key]
+            # Mark the exception retrieved; background refresh failures are counted above
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(done)
+        return task
+
+    # -- threads (server.py) -----------------------------------------------
+
+    def get_or_fetch_sync(self, key: str, fetch: Callable[[], Any]):
+        """Blocking counterpart of get_or_fetch for threaded servers"""
+        status, entry = self._lookup(key)
+        if status == 'hit':
+            return entry.value, status
+        if status == 'stale':
+            call, owner = self._join_call(key)
+            if owner:
+                with self._lock:
+                    self.refreshes += 1
+                threading.Thread(
+                    target=self._run_call, args=(key, fetch, call), daemon=True
+                ).start()
+            return entry.value, status
+
+        call, owner = self._join_call(key)
+        if owner:
+            self._run_call(key, fetch, call)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value, status
+
+    def _join_call(self, key: str):
+        """Return (call, owner); owner is True if the caller must run the fetch"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _SyncCall()
+            self._calls[key] = call
+            return call, True
+
+    def _run_call(self, key: str, fetch: Callable[[], Any], call: _SyncCall) -> None:
+        try:
+            call.value = fetch()
+            self.set(key, call.value)
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
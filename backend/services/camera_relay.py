@@ -0,0 +1,277 @@
+"""
+MJPEG camera relay: one upstream connection per camera, any number of viewers
+The upstream multipart stream is split into frames kept in a small ring
+buffer; each viewer is sent frames in order while it keeps up, and skips to
+the newest frame once it falls behind the ring, so a slow display never makes
+the relay buffer without limit. The upstream is closed when the last viewer
+leaves. Threads only (used by the legacy server.py); standard library only.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .metrics import UPSTREAM_BYTES
+
+logger = logging.getLogger(__name__)
+
+CAMERA_RELAY = os.environ.get('CAMERA_RELAY', '1').lower() not in ('0', 'false', 'no')
+CAMERA_RELAY_FRAMES = int(os.environ.get('CAMERA_RELAY_FRAMES', '8'))
+# Largest frame accepted before the stream is considered broken
+CAMERA_RELAY_MAX_FRAME_BYTES = int(os.environ.get('CAMERA_RELAY_MAX_FRAME_BYTES', str(8 * 1024 * 1024)))
+
+READ_SIZE = 16384
+BOUNDARY = 'frame'
+_BOUNDARY_PARAM = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+class NotMultipart(Exception):
+    """The upstream is not a multipart stream; carries the open response for a direct proxy"""
+
+    def __init__(self, response: Any):
+        super().__init__("Upstream is not a multipart stream")
+        self.response = response
+
+
+class FrameTooLarge(ValueError):
+    """No boundary within CAMERA_RELAY_MAX_FRAME_BYTES"""
+
+
+class MultipartParser:
+    """Incremental multipart/x-mixed-replace splitter: feed(bytes) -> [(content_type, body)]"""
+
+    def __init__(self, boundary: str, max_frame: int = CAMERA_RELAY_MAX_FRAME_BYTES):
+        # Search for the bare boundary: matches both '--b' (per RFC 2046) and
+        # cameras that declare '--b' as the boundary and then write it as is
+        self.delimiter = boundary.encode('latin-1')
+        self.max_frame = max_frame
+        self._buffer = bytearray()
+        self._started = False
+
+    def feed(self, data: bytes) -> List[Tuple[str, bytes]]:
+        self._buffer += data
+        frames = []
+        while True:
+            index = self._buffer.find(self.delimiter)
+            if index < 0:
+                if len(self._buffer) > self.max_frame:
+                    raise FrameTooLarge(f"No multipart boundary within {self.max_frame} bytes")
+                return frames
+            part = bytes(self._buffer[:index])
+            del self._buffer[:index + len(self.delimiter)]
+            if self._started:
+                frame = self._parse_part(part)
+                if frame is not None:
+                    frames.append(frame)
+            self._started = True  # Anything before the first boundary is preamble
+
+    @staticmethod
+    def _parse_part(part: bytes) -> Optional[Tuple[str, bytes]]:
+        if part.startswith(b'\r\n'):
+            part = part[2:]  # End of the boundary line
+        if part.startswith(b'\r\n'):
+            head, body = b'', part[2:]  # No part headers
+        else:
+            head, sep, body = part.partition(b'\r\n\r\n')
+            if not sep:
+                return None
+        content_type = 'image/jpeg'
+        length = None
+        for line in head.split(b'\r\n'):
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-type':
+                content_type = value.strip()
+            elif name == 'content-length' and value.strip().isdigit():
+                length = int(value.strip())
+        if length is not None and length <= len(body):
+            body = body[:length]
+        else:
+            # The delimiter line is '\r\n--boundary'; whatever of it precedes the match belongs to it
+            for suffix in (b'\r\n--', b'--', b'\r\n'):
+                if body.endswith(suffix):
+                    body = body[:-len(suffix)]
+                    break
+        return (content_type, body) if body else None
+
+
+def boundary_of(content_type: str) -> Optional[str]:
+    if 'multipart' not in content_type.lower():
+        return None
+    match = _BOUNDARY_PARAM.search(content_type)
+    return match.group(1).strip() if match else None
+
+
+def encode_frame(content_type: str, body: bytes) -> bytes:
+    """One part of the stream sent to viewers"""
+    head = f"--{BOUNDARY}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+    return head.encode('latin-1') + body + b'\r\n'
+
+
+class CameraRelay:
+    """One upstream stream and the ring of its most recent frames"""
+
+    def __init__(self, key: str, open_stream: Callable[[], Any], frames: int = CAMERA_RELAY_FRAMES):
+        self.key = key
+        self.open_stream = open_stream
+        self._ring: Deque[Tuple[int, bytes]] = deque(maxlen=max(1, frames))
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._started = threading.Event()
+        self.viewers = 0
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self.content_type = 'multipart/x-mixed-replace; boundary=' + BOUNDARY
+        self.frames_in = 0
+        self.bytes_in = 0
+        self.dropped = 0
+        self.started_at = time.time()
+
+    def start(self) -> None:
+        """Connect upstream in the calling (first viewer's) thread so its errors reach that viewer"""
+        try:
+            response = self.open_stream()
+            boundary = boundary_of(response.headers.get('Content-Type', ''))
+            if boundary is None:
+                raise NotMultipart(response)
+        except BaseException as e:
+            self.error = e
+            self.closed = True
+            self._started.set()
+            raise
+        self._started.set()
+        threading.Thread(
+            target=self._read, args=(response, MultipartParser(boundary)),
+            name='camera-relay', daemon=True
+        ).start()
+
+    def wait_started(self, timeout: Optional[float] = None) -> None:
+        self._started.wait(timeout)
+        if isinstance(self.error, NotMultipart):
+            raise NotMultipart(None)  # The response belongs to the first viewer
+        if self.error is not None:
+            raise self.error
+
+    def _read(self, response: Any, parser: MultipartParser) -> None:
+        # read1 returns what has arrived instead of waiting for READ_SIZE bytes
+        read = getattr(response, 'read1', response.read)
+        try:
+            with response:
+                while not self.closed:
+                    chunk = read(READ_SIZE)
+                    if not chunk:
+                        break
+                    self.bytes_in += len(chunk)
+                    UPSTREAM_BYTES.inc('camera', amount=len(chunk))
+                    for content_type, body in parser.feed(chunk):
+                        self._publish(encode_frame(content_type, body))
+        except Exception as e:
+            if not self.closed:
+                logger.warning(f"⚠️ Camera relay upstream failed: {e}")
+                self.error = e
+        finally:
+            with self._cond:
+                self.closed = True
+                self._cond.notify_all()
+            logger.info(f"📹 Camera relay closed ({self.frames_in} frames, {self.dropped} dropped for slow viewers)")
+
+    def _publish(self, frame: bytes) -> None:
+        with self._cond:
+            self._seq += 1
+            self._ring.append((self._seq, frame))
+            self.frames_in += 1
+            self._cond.notify_all()
+
+    def next_frame(self, after: int, timeout: float = 30.0) -> Optional[Tuple[int, bytes]]:
+        """
+        The frame following seq after (the newest if after has fallen out of
+        the ring, or for a new viewer with after=0); None once the stream has ended.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.closed or self._seq > after, timeout):
+                return None  # No frame for timeout seconds: treat the camera as stalled
+            if self._seq <= after:
+                return None
+            oldest = self._ring[0][0]
+            if after == 0 or after + 1 < oldest:
+                if after:
+                    self.dropped += self._seq - after - 1
+                return self._ring[-1]
+            return self._ring[after + 1 - oldest]
+
+    def stop(self) -> None:
+        """Stop reading; the upstream closes after its next chunk"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "viewers": self.viewers,
+            "frames": self.frames_in,
+            "bytes": self.bytes_in,
+            "dropped": self.dropped,
+            "buffered": len(self._ring),
+            "uptime": round(time.time() - self.started_at),
+        }
+
+
+class RelayRegistry:
+    """Relays by camera key; the first viewer starts one, the last one stops it"""
+
+    def __init__(self):
+        self._relays: Dict[str, CameraRelay] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def subscribe(self, key: str, open_stream: Callable[[], Any]) -> CameraRelay:
+        """
+        Join (or start) the relay for key. Raises the upstream's error, or
+        NotMultipart for a stream that cannot be relayed (with the open
+        response for the viewer that opened it, None for the others).
+        """
+        with self._lock:
+            relay = self._relays.get(key)
+            owner = relay is None or relay.closed
+            if owner:
+                relay = CameraRelay(key, open_stream)
+                self._relays[key] = relay
+                self.started += 1
+            else:
+                self.joined += 1
+            relay.viewers += 1
+        try:
+            if owner:
+                relay.start()
+            else:
+                relay.wait_started()
+        except BaseException:
+            self.unsubscribe(relay)
+            raise
+        return relay
+
+    def unsubscribe(self, relay: CameraRelay) -> None:
+        with self._lock:
+            relay.viewers -= 1
+            if relay.viewers > 0:
+                return
+            if self._relays.get(relay.key) is relay:
+                del self._relays[relay.key]
+        relay.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            relays = list(self._relays.values())
+        return {
+            "enabled": CAMERA_RELAY,
+            "cameras": len(relays),
+            "viewers": sum(r.viewers for r in relays),
+            "upstreams_started": self.started,
+            "viewers_joined": self.joined,
+            "relays": [r.stats() for r in relays],
+        }
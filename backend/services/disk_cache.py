@@ -0,0 +1,325 @@
+"""
+Persistent on-disk response cache (SQLite), shared across restarts
+Calendar feeds and Home Assistant snapshots are written behind the in-memory
+ResponseCache with their validators and TTLs, and loaded back into memory at
+startup (before requests are served, so no request waits on SQLite), so
+displays reconnecting after an auto-update are served at once while upstream
+is revalidated in the background. Total size is capped with least-recently-used eviction.
+Standard library only so the legacy server.py can share it.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')
+# Empty to disable persistence
+RESPONSE_CACHE_FILE = os.environ.get('RESPONSE_CACHE_FILE', os.path.join(CACHE_DIR, 'responses.sqlite3'))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# A key is written at most this often (HA snapshots change every few seconds);
+# saves in between replace the pending value, which is written when the interval ends
+RESPONSE_CACHE_WRITE_INTERVAL = float(os.environ.get('RESPONSE_CACHE_WRITE_INTERVAL', '30'))
+# How long after it was stored a restored entry may still be served while refreshing
+RESPONSE_CACHE_RESTORE_TTL = float(os.environ.get('RESPONSE_CACHE_RESTORE_TTL', '86400'))
+
+
+# Bytes, or a callable producing them when the entry is actually written
+Payload = Union[bytes, Callable[[], bytes]]
+
+
+def _materialize(value: Payload) -> bytes:
+    return value() if callable(value) else value
+
+
+class DiskCache:
+    """
+    Key -> (blob, stored_at, ttl) in one SQLite file; writes and deletes happen
+    on a background thread. _lock only guards the queue, so put() and delete()
+    (called on the event loop) never wait for SQLite; _db_lock serializes use
+    of the connection and is always taken before _lock.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_FILE, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._failed = not path
+        self._pending: Dict[str, Tuple[Payload, float, float]] = {}
+        self._deletes: Set[str] = set()
+        # Monotonic time each pending key may be written, and when each key was last written
+        self._due: Dict[str, float] = {}
+        self._written_at: Dict[str, float] = {}
+        self._longest_interval = 0.0
+        self._wake = threading.Condition(self._lock)
+        self._writer: Optional[threading.Thread] = None
+        self.loads = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return not self._failed
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opened on first use (caller holds _db_lock); failures disable the cache"""
+        if self._db is None and not self._failed:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS entries ('
+                    'key TEXT PRIMARY KEY, stored_at REAL NOT NULL, ttl REAL NOT NULL, '
+                    'size INTEGER NOT NULL, used_at REAL NOT NULL, value BLOB NOT NULL)'
+                )
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ Persistent response cache disabled ({self.path}): {e}")
+                self._failed = True
+        return self._db
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float, float]]:
+        """(value, stored_at wall-clock time, ttl) or None. Blocking: use asyncio.to_thread from async code"""
+        with self._db_lock:
+            with self._lock:
+                pending = self._pending.get(key)
+                if key in self._deletes:
+                    return None
+            if pending is not None:
+                return _materialize(pending[0]), pending[1], pending[2]
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute('SELECT value, stored_at, ttl FROM entries WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    db.execute('UPDATE entries SET used_at = ? WHERE key = ?', (time.time(), key))
+                    db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Persistent response cache read failed: {e}")
+                return None
+            if row is None:
+                return None
+            self.loads += 1
+            return bytes(row[0]), row[1], row[2]
+
+    def scan(self, prefix: str, limit: int) -> List[Tuple[str, bytes, float, float]]:
+        """Up to limit (key, value, stored_at, ttl) under prefix, least recently used first"""
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return []
+            try:
+                rows = db.execute(
+                    'SELECT key, value, stored_at, ttl FROM entries WHERE substr(key, 1, ?) = ? '
+                    'ORDER BY used_at DESC LIMIT ?', (len(prefix), prefix, limit)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Persistent response cache read failed: {e}")
+                return []
+            self.loads += len(rows)
+            return [(key, bytes(value), stored_at, ttl) for key, value, stored_at, ttl in reversed(rows)]
+
+    def put(self, key: str, value: Payload, stored_at: float, ttl: float, min_interval: float = 0.0) -> None:
+        """
+        Queue a write; the latest value per key wins. A key written less than
+        min_interval seconds ago is written (with whatever value is latest by
+        then) once the interval has passed.
+        """
+        with self._lock:
+            if self._failed:
+                return
+            self._deletes.discard(key)
+            if key not in self._pending:
+                last = self._written_at.get(key)
+                self._due[key] = time.monotonic() if last is None else last + min_interval
+                self._longest_interval = max(self._longest_interval, min_interval)
+            self._pending[key] = (value, stored_at, ttl)
+            self._start_writer()
+
+    def delete(self, key: str) -> None:
+        """Queue removal of key (written before any later put of the same key)"""
+        with self._lock:
+            if self._failed:
+                return
+            self._pending.pop(key, None)
+            self._due.pop(key, None)
+            self._written_at.pop(key, None)
+            self._deletes.add(key)
+            self._start_writer()
+
+    def _start_writer(self) -> None:
+        """Caller holds _lock"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name='disk-cache-writer', daemon=True)
+            self._writer.start()
+        self._wake.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._deletes:
+                    self._wake.wait()
+                if not self._deletes:
+                    wait = min(self._due.values()) - time.monotonic()
+                    if wait > 0:
+                        self._wake.wait(wait)  # Or until a new key is queued
+                        continue
+            self._write_pending()
+
+    def flush(self) -> None:
+        """Write all queued entries now, due or not (on shutdown)"""
+        self._write_pending(force=True)
+
+    def _write_pending(self, force: bool = False) -> None:
+        # Batches are taken and written under _db_lock, so they reach the file in order
+        with self._db_lock:
+            with self._lock:
+                pending, deletes = self._take_due(force)
+            if not pending and not deletes:
+                return
+            db = self._connect()
+            if db is not None:
+                self._write(db, pending, deletes)
+
+    def _take_due(self, force: bool) -> Tuple[Dict[str, Tuple[Payload, float, float]], Set[str]]:
+        """Swap out the deletes and the entries due for writing (caller holds _lock)"""
+        now = time.monotonic()
+        due = [key for key in self._pending if force or self._due[key] <= now]
+        pending = {key: self._pending.pop(key) for key in due}
+        for key in due:
+            del self._due[key]
+            self._written_at[key] = now
+        # Keys quiet for longer than any interval no longer need their last write time
+        horizon = now - self._longest_interval
+        self._written_at = {k: t for k, t in self._written_at.items() if t >= horizon or k in self._pending}
+        deletes, self._deletes = self._deletes, set()
+        return pending, deletes
+
+    def _write(self, db: sqlite3.Connection, pending: Dict[str, Tuple[Payload, float, float]],
+               deletes: Set[str]) -> None:
+        """Serialize and write one batch (caller holds _db_lock, not _lock)"""
+        wall_now = time.time()
+        try:
+            if deletes:
+                db.executemany('DELETE FROM entries WHERE key = ?', [(key,) for key in deletes])
+            rows = []
+            for key, (value, stored_at, ttl) in pending.items():
+                try:
+                    blob = _materialize(value)
+                except (ValueError, TypeError) as e:
+                    logger.error(f"❌ Persistent response cache could not serialize {key}: {e}")
+                    continue
+                rows.append((key, stored_at, ttl, len(blob), wall_now, blob))
+            db.executemany(
+                'INSERT OR REPLACE INTO entries (key, stored_at, ttl, size, used_at, value) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self.writes += len(pending)
+            self._evict(db)
+            db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"❌ Persistent response cache write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop least recently used entries until the total fits max_bytes"""
+        excess = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in db.execute('SELECT key, size FROM entries ORDER BY used_at'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany('DELETE FROM entries WHERE key = ?', victims)
+        self.evictions += len(victims)
+
+    def close(self) -> None:
+        self.flush()
+        with self._db_lock:
+            with self._lock:
+                self._failed = True  # Late writes are dropped rather than reopening
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Blocking (reads SQLite): use asyncio.to_thread from async code"""
+        stats: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "path": self.path,
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+        with self._lock:
+            pending = len(self._pending) + len(self._deletes)
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                try:
+                    entries, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+                    stats.update({"entries": entries, "bytes": size, "pending": pending})
+                except sqlite3.Error:
+                    pass
+        return stats
+
+
+class Persistence:
+    """
+    How one ResponseCache keeps its values in a DiskCache.
+    value_type provides to_bytes() / from_bytes(); keys are namespaced per cache.
+    """
+
+    def __init__(self, disk: DiskCache, namespace: str, value_type: Any,
+                 write_interval: float = RESPONSE_CACHE_WRITE_INTERVAL,
+                 restore_ttl: float = RESPONSE_CACHE_RESTORE_TTL):
+        self.disk = disk
+        self.namespace = namespace
+        self.value_type = value_type
+        self.write_interval = write_interval
+        self.restore_ttl = restore_ttl
+        self.restored = 0
+
+    def load_all(self, limit: int) -> List[Tuple[str, Any, float, float]]:
+        """(key, value, age, ttl) for up to limit usable entries, least recently used first"""
+        prefix = f"{self.namespace}:"
+        entries = []
+        for key, blob, stored_at, ttl in self.disk.scan(prefix, limit):
+            record = self._decode(blob, stored_at, ttl)
+            if record is not None:
+                entries.append((key[len(prefix):],) + record)
+        return entries
+
+    def _decode(self, blob: bytes, stored_at: float, ttl: float) -> Optional[Tuple[Any, float, float]]:
+        age = max(0.0, time.time() - stored_at)
+        if age >= self.restore_ttl:
+            return None
+        try:
+            value = self.value_type.from_bytes(blob)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error(f"❌ Unreadable persisted {self.namespace} entry: {e}")
+            return None
+        self.restored += 1
+        return value, age, ttl
+
+    def save(self, key: str, value: Any, ttl: float) -> None:
+        """Queue value for writing (serialized only when written, at most once per write_interval)"""
+        self.disk.put(f"{self.namespace}:{key}", value.to_bytes, time.time(), ttl, self.write_interval)
+
+    def delete(self, key: str) -> None:
+        self.disk.delete(f"{self.namespace}:{key}")
+
+
+# One file shared by every persisted cache in the process
+persistent_cache = DiskCache()
@@ -0,0 +1,144 @@
+"""
+Interval index over normalized calendar events
+Sorted start arrays per feed answer range queries in O(log n + k);
+recurring masters are sorted both by first start and by series end, so
+finished and not-yet-started series are skipped without being looked at.
+Each feed is rebuilt independently, only when its content changes.
+Standard library only.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .ics import Event
+from .recurrence import ExpansionCache, iter_occurrences, recurrence_end
+
+# Events longer than this are kept out of the sorted array and scanned
+# separately, so the look-behind window for the bisect stays short
+LONG_EVENT = timedelta(days=7)
+
+
+class FeedIndex:
+    """Immutable index of one feed version"""
+
+    __slots__ = ('version', 'starts', 'events', 'long_events', 'masters', 'master_starts',
+                 'masters_by_end', 'master_ends', 'size')
+
+    def __init__(self, version: Hashable, events: Iterable[Event]):
+        self.version = version
+        single: List[Event] = []
+        self.long_events: List[Tuple[float, float, Event]] = []
+        self.masters: List[Tuple[float, float, Event, FrozenSet[datetime]]] = []
+
+        events = list(events)
+        self.size = len(events)
+        overridden: Dict[str, set] = {}
+        for event in events:
+            if event.recurrence_id is not None:
+                overridden.setdefault(event.uid, set()).add(event.recurrence_id)
+
+        for event in events:
+            if event.is_recurring and event.recurrence_id is None:
+                self.masters.append((
+                    event.start.timestamp(),
+                    recurrence_end(event),
+                    event,
+                    frozenset(overridden.get(event.uid, ())),
+                ))
+            elif event.end - event.start > LONG_EVENT:
+                self.long_events.append((event.start.timestamp(), event.end.timestamp(), event))
+            else:
+                single.append(event)
+
+        single.sort(key=lambda e: e.start)
+        self.events = single
+        self.starts = [e.start.timestamp() for e in single]
+
+        self.masters.sort(key=lambda m: m[0])
+        self.master_starts = [m[0] for m in self.masters]
+        self.masters_by_end = sorted(self.masters, key=lambda m: m[1])
+        self.master_ends = [m[1] for m in self.masters_by_end]
+
+    def query(self, window_start: datetime, window_end: datetime,
+              expansions: Optional[ExpansionCache] = None) -> Iterator[Event]:
+        ws = window_start.timestamp()
+        we = window_end.timestamp()
+
+        # Short events: start in [ws - LONG_EVENT, we)
+        lo = bisect_left(self.starts, ws - LONG_EVENT.total_seconds())
+        hi = bisect_left(self.starts, we)
+        for i in range(lo, hi):
+            event = self.events[i]
+            if event.overlaps(window_start, window_end):
+                yield event
+
+        for start, end, event in self.long_events:
+            if start < we and end > ws:
+                yield event
+
+        # Series overlapping the window started before we and end after ws:
+        # walk whichever of the two sorted ranges is shorter
+        started = bisect_left(self.master_starts, we)
+        not_ended = bisect_right(self.master_ends, ws)
+        if started <= len(self.masters_by_end) - not_ended:
+            candidates = self.masters[:started]
+        else:
+            candidates = self.masters_by_end[not_ended:]
+        for start, end, event, exclude in candidates:
+            if start >= we or end <= ws:
+                continue
+            if expansions is not None:
+                yield from expansions.expand(self.version, event, window_start, window_end, exclude)
+            else:
+                yield from iter_occurrences(event, window_start, window_end, exclude)
+
+
+class EventIndex:
+    """Per-feed interval indexes, queried together"""
+
+    def __init__(self, expansions: Optional[ExpansionCache] = None):
+        self.expansions = expansions if expansions is not None else ExpansionCache()
+        self._feeds: Dict[str, FeedIndex] = {}
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def version(self, key: str) -> Optional[Hashable]:
+        feed = self._feeds.get(key)
+        return feed.version if feed is not None else None
+
+    def update(self, key: str, version: Hashable, events: Iterable[Event]) -> bool:
+        """Rebuild one feed's index if its version changed; returns True if rebuilt"""
+        if self.version(key) == version:
+            return False
+        feed = FeedIndex(version, events)
+        with self._lock:
+            self._feeds[key] = feed
+            self.rebuilds += 1
+        return True
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._feeds.pop(key, None)
+
+    def query(self, window_start: datetime, window_end: datetime,
+              keys: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Event]]:
+        """Yield (feed key, occurrence) for everything overlapping [window_start, window_end)"""
+        with self._lock:
+            feeds = dict(self._feeds)
+        for key in (keys if keys is not None else feeds.keys()):
+            feed = feeds.get(key)
+            if feed is None:
+                continue
+            for event in feed.query(window_start, window_end, self.expansions):
+                yield key, event
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "feeds": len(self._feeds),
+                "events": sum(f.size for f in self._feeds.values()),
+                "recurring": sum(len(f.masters) for f in self._feeds.values()),
+                "rebuilds": self.rebuilds,
+            }
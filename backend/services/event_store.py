@@ -0,0 +1,204 @@
+"""
+On-disk store of compacted, parsed calendar feeds
+One SQLite row per feed holds its normalized events (history already dropped)
+as compressed JSON, keyed by feed URL and the content hash of the feed body.
+After a restart, a feed whose body hasn't changed is loaded from here instead
+of being parsed again. At most CALENDAR_EVENT_STORE_MAX_FEEDS rows are kept;
+the least recently saved or loaded go first, so ad hoc feed URLs don't
+accumulate. Standard library only.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from .disk_cache import CACHE_DIR
+from .ics import Event
+
+logger = logging.getLogger(__name__)
+
+# Empty to disable the store
+CALENDAR_EVENT_STORE = os.environ.get('CALENDAR_EVENT_STORE', os.path.join(CACHE_DIR, 'calendar-events.sqlite3'))
+# Twice the in-memory calendar cache by default, so every restored feed still has its row
+CALENDAR_EVENT_STORE_MAX_FEEDS = int(os.environ.get('CALENDAR_EVENT_STORE_MAX_FEEDS', '128'))
+
+# Bump when the row format changes; older rows are then ignored and replaced
+FORMAT = 1
+
+
+def _zone_name(tz: Optional[tzinfo]) -> str:
+    key = getattr(tz, 'key', None)  # ZoneInfo: keep the zone so DST rules survive
+    if key:
+        return key
+    offset = tz.utcoffset(None) if tz is not None else None
+    return str(int(offset.total_seconds())) if offset else 'UTC'
+
+
+def _zone(name: str) -> tzinfo:
+    if name == 'UTC':
+        return timezone.utc
+    if name.lstrip('-').isdigit():
+        return timezone(timedelta(seconds=int(name)))
+    return ZoneInfo(name)
+
+
+def dump_datetime(dt: datetime) -> str:
+    """Wall-clock time plus zone, e.g. '2026-03-08T09:00:00 America/Denver'"""
+    return f"{dt.replace(tzinfo=None).isoformat()} {_zone_name(dt.tzinfo)}"
+
+
+def load_datetime(value: str) -> datetime:
+    wall, _, zone = value.partition(' ')
+    return datetime.fromisoformat(wall).replace(tzinfo=_zone(zone))
+
+
+def dump_event(event: Event) -> List[Any]:
+    return [
+        event.uid, event.title, dump_datetime(event.start), dump_datetime(event.end), event.all_day,
+        event.location, event.description, event.rrule,
+        [dump_datetime(d) for d in event.rdates],
+        [dump_datetime(d) for d in event.exdates],
+        dump_datetime(event.recurrence_id) if event.recurrence_id is not None else None,
+    ]
+
+
+def load_event(row: List[Any]) -> Event:
+    (uid, title, start, end, all_day, location, description, rrule,
+     rdates, exdates, recurrence_id) = row
+    return Event(
+        uid=uid,
+        title=title,
+        start=load_datetime(start),
+        end=load_datetime(end),
+        all_day=all_day,
+        location=location,
+        description=description,
+        rrule=rrule,
+        rdates=tuple(load_datetime(d) for d in rdates),
+        exdates=frozenset(load_datetime(d) for d in exdates),
+        recurrence_id=load_datetime(recurrence_id) if recurrence_id else None,
+    )
+
+
+class EventStore:
+    """Compacted events per (feed, content hash); calls block, so run them in a thread"""
+
+    def __init__(self, path: str = CALENDAR_EVENT_STORE, max_feeds: int = CALENDAR_EVENT_STORE_MAX_FEEDS):
+        self.path = path
+        self.max_feeds = max_feeds
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._failed = not path
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.evictions = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Opened on first use; a store that cannot be opened is disabled, not fatal"""
+        if self._db is None and not self._failed:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute('PRAGMA journal_mode=WAL')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS feeds ('
+                    'feed TEXT PRIMARY KEY, version TEXT NOT NULL, format INTEGER NOT NULL, '
+                    'saved_at REAL NOT NULL, count INTEGER NOT NULL, events BLOB NOT NULL)'
+                )
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ Calendar event store disabled ({self.path}): {e}")
+                self._failed = True
+        return self._db
+
+    def load(self, feed: str, version: str) -> Optional[List[Event]]:
+        """Stored events for this exact feed version, or None"""
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    'SELECT events FROM feeds WHERE feed = ? AND version = ? AND format = ?',
+                    (feed, version, FORMAT)
+                ).fetchone()
+                if row is not None:
+                    # Still in use: keep it ahead of feeds that were only requested once
+                    db.execute('UPDATE feeds SET saved_at = ? WHERE feed = ?', (time.time(), feed))
+                    db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"❌ Calendar event store read failed: {e}")
+                return None
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            events = [load_event(r) for r in json.loads(zlib.decompress(row[0]))]
+        except (ValueError, TypeError, zlib.error, KeyError) as e:
+            logger.error(f"❌ Unreadable stored calendar feed, re-parsing: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return events
+
+    def save(self, feed: str, version: str, events: List[Event]) -> None:
+        """Replace the stored version of a feed, dropping the oldest feeds over max_feeds"""
+        blob = zlib.compress(json.dumps([dump_event(e) for e in events], separators=(',', ':')).encode())
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    'INSERT OR REPLACE INTO feeds (feed, version, format, saved_at, count, events) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (feed, version, FORMAT, time.time(), len(events), blob)
+                )
+                self._evict(db)
+                db.commit()
+                self.saves += 1
+            except sqlite3.Error as e:
+                logger.error(f"❌ Calendar event store write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        if self.max_feeds <= 0:
+            return
+        cursor = db.execute(
+            'DELETE FROM feeds WHERE feed NOT IN (SELECT feed FROM feeds ORDER BY saved_at DESC LIMIT ?)',
+            (self.max_feeds,)
+        )
+        self.evictions += max(0, cursor.rowcount)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "enabled": not self._failed,
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "saves": self.saves,
+            "evictions": self.evictions,
+            "max_feeds": self.max_feeds,
+        }
+        with self._lock:
+            db = self._connect()
+            if db is not None:
+                feeds, events, size = db.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(count), 0), COALESCE(SUM(LENGTH(events)), 0) FROM feeds'
+                ).fetchone()
+                stats.update({"feeds": feeds, "events": events, "bytes": size})
+        return stats
@@ -0,0 +1,196 @@
+"""
+Home Assistant fan-out hub
+Holds one upstream WebSocket to Home Assistant, keeps the entity state map in
+memory and forwards each dashboard only the entities it displays.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+try:
+    import websockets
+except ImportError:  # Installed with uvicorn[standard]
+    websockets = None
+
+RECONNECT_MIN = 2.0
+RECONNECT_MAX = 60.0
+
+
+def compact_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop fields dashboards never use (context, last_reported)"""
+    return {k: v for k, v in state.items() if k not in ('context', 'last_reported')}
+
+
+class HubSubscription:
+    """
+    One dashboard's view of the hub.
+    Pending updates are coalesced per entity, so a slow client gets the latest
+    state of each entity instead of an ever-growing backlog.
+    """
+
+    def __init__(self, entities: Optional[Set[str]]):
+        self.entities = entities  # None = every entity
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._ready = asyncio.Event()
+
+    def wants(self, entity_id: str) -> bool:
+        return self.entities is None or entity_id in self.entities
+
+    def push(self, entity_id: str, state: Optional[Dict[str, Any]]) -> None:
+        self._pending[entity_id] = state
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Wait for updates; returns {} on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self._ready.clear()
+        batch, self._pending = self._pending, {}
+        return batch
+
+
+class HomeAssistantHub:
+    """Single upstream Home Assistant connection shared by every dashboard"""
+
+    def __init__(self):
+        self.url: Optional[str] = None
+        self.token: Optional[str] = None
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.connected = False
+        self._subscribers: Set[HubSubscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.events_received = 0
+        self.updates_sent = 0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def configure(self, url: Optional[str], token: Optional[str]) -> None:
+        """(Re)connect when the Home Assistant URL or token changes"""
+        url = (url or '').rstrip('/') or None
+        if url == self.url and token == self.token and self._task is not None:
+            return
+        self.url, self.token = url, token
+        self._cancel()
+        self.states = {}
+        self.connected = False
+        if not url or not token:
+            return
+        if websockets is None:
+            logger.warning("⚠ 'websockets' package not installed; Home Assistant hub disabled")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    def _cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    # -- subscribers -------------------------------------------------------
+
+    def subscribe(self, entities: Optional[Iterable[str]] = None) -> HubSubscription:
+        subscription = HubSubscription(set(entities) if entities else None)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: HubSubscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def snapshot(self, subscription: HubSubscription) -> Dict[str, Dict[str, Any]]:
+        return {eid: state for eid, state in self.states.items() if subscription.wants(eid)}
+
+    def _fan_out(self, entity_id: str, state: Optional[Dict[str, Any]]) -> None:
+        for subscription in self._subscribers:
+            if subscription.wants(entity_id):
+                subscription.push(entity_id, state)
+                self.updates_sent += 1
+
+    # -- upstream ----------------------------------------------------------
+
+    async def _run(self) -> None:
+        delay = RECONNECT_MIN
+        ws_url = self.url.replace('http', 'ws', 1) + '/api/websocket'
+        while True:
+            try:
+                await self._session(ws_url)
+                delay = RECONNECT_MIN
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠ Home Assistant hub disconnected: {e}")
+            self.connected = False
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(RECONNECT_MAX, delay * 2)
+
+    async def _session(self, ws_url: str) -> None:
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            message = json.loads(await ws.recv())
+            if message.get('type') == 'auth_required':
+                await ws.send(json.dumps({"type": "auth", "access_token": self.token}))
+                message = json.loads(await ws.recv())
+            if message.get('type') != 'auth_ok':
+                raise ConnectionError(f"authentication failed: {message.get('message', message.get('type'))}")
+
+            await ws.send(json.dumps({"id": 1, "type": "subscribe_events", "event_type": "state_changed"}))
+            await ws.send(json.dumps({"id": 2, "type": "get_states"}))
+            self.connected = True
+            logger.info("🏠 Home Assistant hub connected")
+
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get('type') == 'result' and message.get('id') == 2 and message.get('success'):
+                    self._load_states(message.get('result') or [])
+                elif message.get('type') == 'event':
+                    data = (message.get('event') or {}).get('data') or {}
+                    self._apply_change(data.get('entity_id'), data.get('new_state'))
+
+    def _load_states(self, states: Iterable[Dict[str, Any]]) -> None:
+        fresh = {s['entity_id']: compact_state(s) for s in states if 'entity_id' in s}
+        removed = set(self.states) - set(fresh)
+        self.states = fresh
+        for entity_id, state in fresh.items():
+            self._fan_out(entity_id, state)
+        for entity_id in removed:
+            self._fan_out(entity_id, None)
+
+    def _apply_change(self, entity_id: Optional[str], new_state: Optional[Dict[str, Any]]) -> None:
+        if not entity_id:
+            return
+        self.events_received += 1
+        if new_state is None:
+            self.states.pop(entity_id, None)
+            self._fan_out(entity_id, None)
+            return
+        state = compact_state(new_state)
+        self.states[entity_id] = state
+        self._fan_out(entity_id, state)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "entities": len(self.states),
+            "clients": len(self._subscribers),
+            "events_received": self.events_received,
+            "updates_sent": self.updates_sent,
+        }
+
+
+# Process-wide hub used by the Home Assistant router
+hub = HomeAssistantHub()
@@ -0,0 +1,136 @@
+"""
+Home Assistant REST proxy helpers
+Entity/field filtering of state dumps and upstream-vs-client byte/latency metrics.
+Standard library only so the legacy server.py can share it.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Fields a state object keeps when the client does not ask for specific ones;
+# 'context' (and HA's newer 'last_reported') are never used by the widgets
+DEFAULT_FIELDS = ('entity_id', 'state', 'attributes', 'last_changed', 'last_updated')
+
+
+@dataclass
+class UpstreamResponse:
+    """Parsed Home Assistant response as stored in the proxy cache (raw bytes if not JSON)"""
+    data: Any
+    size: int
+    latency_ms: float
+    content_type: str = 'application/json'
+    fetched_at: float = field(default_factory=time.time)
+
+    def to_bytes(self) -> bytes:
+        """Serialized form for the persistent cache: a JSON header line, then the body"""
+        raw = isinstance(self.data, bytes)
+        header = {
+            "size": self.size,
+            "latency_ms": self.latency_ms,
+            "content_type": self.content_type,
+            "fetched_at": self.fetched_at,
+            "raw": raw,
+        }
+        body = self.data if raw else json.dumps(self.data).encode()
+        return json.dumps(header).encode() + b'\n' + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'UpstreamResponse':
+        header, _, body = data.partition(b'\n')
+        header = json.loads(header)
+        raw = header.pop('raw')
+        return cls(data=body if raw else json.loads(body), **header)
+
+
+def cache_key(api_url: str, token: Optional[str]) -> str:
+    """Cache per URL and credential, without keeping the token itself as a key"""
+    digest = hashlib.sha256((token or '').encode()).hexdigest()[:16]
+    return f"{api_url}|{digest}"
+
+
+def split_param(value: Optional[str]) -> Optional[List[str]]:
+    """'a, b,c' -> ['a', 'b', 'c']; None/empty -> None"""
+    items = [item.strip() for item in (value or '').split(',') if item.strip()]
+    return items or None
+
+
+def filter_states(data: Any, entities: Optional[Iterable[str]] = None,
+                  fields: Optional[Iterable[str]] = None) -> Any:
+    """
+    Reduce a /api/states response to the requested entities and fields.
+    Anything that is not a state (or list of states) is returned untouched.
+    """
+    if entities is None and fields is None:
+        return data
+    keep = set(fields) | {'entity_id'} if fields else set(DEFAULT_FIELDS)
+
+    def trim(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in state.items() if k in keep}
+
+    if isinstance(data, list):
+        wanted = set(entities) if entities else None
+        return [
+            trim(s) for s in data
+            if isinstance(s, dict) and (wanted is None or s.get('entity_id') in wanted)
+        ]
+    if isinstance(data, dict) and 'entity_id' in data:
+        return trim(data)
+    return data
+
+
+class ProxyMetrics:
+    """Upstream fetches vs. what clients were sent (bytes and latency)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.upstream_requests = 0
+        self.upstream_bytes = 0
+        self.upstream_ms = 0.0
+        self.served_bytes = 0
+        self.served_upstream_bytes = 0
+        self.served_ms = 0.0
+
+    def record_upstream(self, size: int, latency_ms: float) -> None:
+        with self._lock:
+            self.upstream_requests += 1
+            self.upstream_bytes += size
+            self.upstream_ms += latency_ms
+
+    def record_response(self, upstream: UpstreamResponse, size: int, elapsed_ms: float) -> None:
+        """One client response of size bytes built from upstream in elapsed_ms"""
+        with self._lock:
+            self.requests += 1
+            self.served_bytes += size
+            self.served_upstream_bytes += upstream.size
+            self.served_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "upstream_requests": self.upstream_requests,
+                "coalesced_or_cached": max(0, self.requests - self.upstream_requests),
+                "upstream_bytes": self.upstream_bytes,
+                "served_bytes": self.served_bytes,
+                "bytes_saved": max(0, self.served_upstream_bytes - self.served_bytes),
+                "size_ratio": round(self.served_bytes / self.served_upstream_bytes, 3)
+                              if self.served_upstream_bytes else None,
+                "avg_upstream_ms": round(self.upstream_ms / self.upstream_requests, 1)
+                                   if self.upstream_requests else None,
+                "avg_response_ms": round(self.served_ms / self.requests, 1) if self.requests else None,
+            }
+
+
+def metric_headers(upstream: UpstreamResponse, size: int, elapsed_ms: float, cache_status: str) -> Dict[str, str]:
+    """Per-response comparison of upstream vs. returned payload"""
+    return {
+        'X-Cache': cache_status.upper(),
+        'X-Upstream-Bytes': str(upstream.size),
+        'X-Response-Bytes': str(size),
+        'Server-Timing': f'upstream;dur={upstream.latency_ms:.1f}, total;dur={elapsed_ms:.1f}',
+    }
@@ -0,0 +1,64 @@
+"""
+HTTP validator helpers (ETag / Last-Modified) for conditional GETs
+Standard library only so the legacy server.py can share it.
+"""
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def http_date(timestamp: float) -> str:
+    """Format a Unix timestamp as an HTTP date (RFC 7231)"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP date into a Unix timestamp, or None if invalid"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 7232)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[float] = None
+) -> bool:
+    """
+    Decide whether a 304 can be sent.
+    If-None-Match takes precedence; If-Modified-Since is only consulted without it.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if last_modified is not None:
+        since = parse_http_date(if_modified_since)
+        # HTTP dates have one-second resolution
+        if since is not None and int(last_modified) <= int(since):
+            return True
+    return False
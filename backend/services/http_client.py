@@ -0,0 +1,167 @@
+"""
+Shared pooled httpx.AsyncClient for all upstream calls (Google, Home Assistant, ...)
+Opened and closed by the FastAPI lifespan; keeps connections alive between requests.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get('HTTP_MAX_CONNECTIONS', '50'))
+HTTP_MAX_KEEPALIVE = int(os.environ.get('HTTP_MAX_KEEPALIVE', '20'))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '60'))
+HTTP_DEFAULT_TIMEOUT = float(os.environ.get('HTTP_DEFAULT_TIMEOUT', '30'))
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])"""
+    if os.environ.get('HTTP2', '1').lower() in ('0', 'false', 'no'):
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ConnectionStats:
+    """Per-host request and connection counters, fed by httpcore trace events"""
+
+    def __init__(self):
+        self._hosts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _bump(self, host: str, key: str) -> None:
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"requests": 0, "connections": 0, "tls_handshakes": 0})
+            counters[key] += 1
+
+    def tracer(self, host: str):
+        """Build an httpcore trace callback that attributes events to host"""
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == 'connection.connect_tcp.complete':
+                self._bump(host, 'connections')
+            elif event_name == 'connection.start_tls.complete':
+                self._bump(host, 'tls_handshakes')
+            elif event_name.endswith('send_request_headers.started'):
+                self._bump(host, 'requests')
+        return trace
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for host, counters in self._hosts.items():
+                reused = max(0, counters['requests'] - counters['connections'])
+                result[host] = {
+                    **counters,
+                    "reused": reused,
+                    "reuse_ratio": round(reused / counters['requests'], 3) if counters['requests'] else 0.0,
+                }
+            return result
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body that adds its size to the upstream byte counter once it is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, upstream: str):
+        self._stream = stream
+        self._upstream = upstream
+        self._received = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._received += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        metrics.record_upstream_bytes(self._upstream, self._received)
+        self._received = 0
+        await self._stream.aclose()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Records upstream latency (to response headers), outcomes and bytes, labelled
+    with the name callers pass as extensions={'upstream': ...} (see metrics.UPSTREAMS)
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = metrics.upstream_label(request.extensions.get('upstream'))
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            metrics.record_upstream(upstream, 'timeout', time.perf_counter() - started)
+            raise
+        except httpx.HTTPError:
+            metrics.record_upstream(upstream, 'error', time.perf_counter() - started)
+            raise
+        metrics.record_upstream(upstream, metrics.status_outcome(response.status_code), time.perf_counter() - started)
+        response.stream = _CountingStream(response.stream, upstream)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+stats = ConnectionStats()
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def _attach_trace(request: httpx.Request) -> None:
+    request.extensions['trace'] = stats.tracer(request.url.host)
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = _http2_available()
+    logger.info(
+        f"🌐 Upstream HTTP pool: max {HTTP_MAX_CONNECTIONS} connections, "
+        f"{HTTP_MAX_KEEPALIVE} keep-alive, HTTP/2 {'on' if http2 else 'off'}"
+    )
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return httpx.AsyncClient(
+        timeout=HTTP_DEFAULT_TIMEOUT,
+        transport=MeteredTransport(transport),
+        event_hooks={'request': [_attach_trace]},
+    )
+
+
+async def start() -> None:
+    """Open the shared client (called from the app lifespan)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def close() -> None:
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; created lazily if used outside the lifespan (e.g. scripts)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
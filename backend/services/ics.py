@@ -0,0 +1,314 @@
+"""
+ICS (RFC 5545) feed parsing into a compact normalized event model
+Standard library only so the legacy server.py can share it.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def _default_timezone() -> tzinfo:
+    """Timezone for floating times and all-day events (CALENDAR_TIMEZONE or system local)"""
+    names = [os.environ.get('CALENDAR_TIMEZONE'), os.environ.get('TZ')]
+    # /etc/localtime -> /usr/share/zoneinfo/America/Denver gives a DST-aware zone
+    localtime = os.path.realpath('/etc/localtime')
+    if 'zoneinfo/' in localtime:
+        names.append(localtime.split('zoneinfo/', 1)[1])
+    for name in names:
+        if not name:
+            continue
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return datetime.now().astimezone().tzinfo
+
+
+DEFAULT_TZ = _default_timezone()
+
+_DURATION_RE = re.compile(
+    r'^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$'
+)
+
+
+@dataclass
+class Event:
+    """
+    A single calendar event (one VEVENT), times normalized to aware datetimes.
+    Recurring masters keep their raw RRULE plus RDATE/EXDATE instants;
+    overrides of one occurrence carry the RECURRENCE-ID they replace.
+    """
+    __slots__ = ('uid', 'title', 'start', 'end', 'all_day', 'location', 'description',
+                 'rrule', 'rdates', 'exdates', 'recurrence_id')
+    uid: str
+    title: str
+    start: datetime
+    end: datetime
+    all_day: bool
+    location: Optional[str]
+    description: Optional[str]
+    rrule: Optional[str]
+    rdates: Tuple[datetime, ...]
+    exdates: FrozenSet[datetime]
+    recurrence_id: Optional[datetime]
+
+    @property
+    def is_recurring(self) -> bool:
+        return self.rrule is not None or bool(self.rdates)
+
+    def overlaps(self, window_start: datetime, window_end: datetime) -> bool:
+        """True if the event intersects [window_start, window_end)"""
+        if self.end <= self.start:
+            return window_start <= self.start < window_end
+        return self.start < window_end and self.end > window_start
+
+    def to_dict(self, **extra: Any) -> Dict[str, Any]:
+        """Compact JSON form; all-day events use floating local ISO times"""
+        if self.all_day:
+            start = self.start.replace(tzinfo=None).isoformat()
+            end = self.end.replace(tzinfo=None).isoformat()
+        else:
+            start = self.start.isoformat()
+            end = self.end.isoformat()
+        data = {
+            "id": self.uid,
+            "title": self.title,
+            "start": start,
+            "end": end,
+            "isAllDay": self.all_day,
+        }
+        if self.location:
+            data["location"] = self.location
+        data.update(extra)
+        return data
+
+
+def normalize_feed_url(url: str) -> str:
+    """Convert Google Calendar embed/web links to their ICS feed URL (mirrors the dashboard JS)"""
+    url = url.strip()
+    if '/ical/' in url and '.ics' in url:
+        return url
+    if 'calendar.google.com' in url:
+        match = re.search(r'[?&]src=([^&]+)', url) or re.search(r'cid=([^&]+)', url)
+        if match:
+            calendar_id = unquote(match.group(1))
+            return f"https://calendar.google.com/calendar/ical/{quote(calendar_id, safe='')}/public/basic.ics"
+    return url
+
+
+def unfold_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Join RFC 5545 folded lines (continuations start with a space or tab)"""
+    current = None
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def parse_property(line: str) -> Optional[Tuple[str, Dict[str, str], str]]:
+    """Split 'NAME;PARAM=x:value' into (NAME, {PARAM: x}, value)"""
+    # The name/params part ends at the first colon outside a quoted parameter value
+    in_quotes = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif ch == ':' and not in_quotes:
+            break
+    else:
+        return None
+    head, value = line[:i], line[i + 1:]
+    name, *raw_params = head.split(';')
+    params = {}
+    for param in raw_params:
+        key, sep, param_value = param.partition('=')
+        if sep:
+            params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value: str) -> str:
+    """Undo ICS TEXT escaping"""
+    return re.sub(
+        r'\\([\\;,nN])',
+        lambda m: '\n' if m.group(1) in 'nN' else m.group(1),
+        value
+    )
+
+
+def _zone(params: Dict[str, str], default_tz: tzinfo) -> tzinfo:
+    tzid = params.get('TZID')
+    if tzid:
+        try:
+            return ZoneInfo(tzid)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return default_tz
+
+
+def parse_datetime(value: str, params: Dict[str, str], default_tz: tzinfo = DEFAULT_TZ) -> Tuple[datetime, bool]:
+    """
+    Parse a DATE or DATE-TIME value into (aware datetime, is_date).
+    DATE values become local midnight in default_tz.
+    """
+    value = value.strip()
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        day = datetime.strptime(value[:8], '%Y%m%d')
+        return day.replace(tzinfo=default_tz), True
+    if value.endswith('Z'):
+        return datetime.strptime(value[:15], '%Y%m%dT%H%M%S').replace(tzinfo=timezone.utc), False
+    return datetime.strptime(value[:15], '%Y%m%dT%H%M%S').replace(tzinfo=_zone(params, default_tz)), False
+
+
+def parse_duration(value: str) -> Optional[timedelta]:
+    """Parse an ICS DURATION (e.g. PT1H30M, P1D)"""
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        return None
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != 'sign'}
+    delta = timedelta(**parts)
+    return -delta if match.group('sign') == '-' else delta
+
+
+def iter_components(lines: Iterable[str], component: str = 'VEVENT') -> Iterator[Dict[str, List[Tuple[Dict[str, str], str]]]]:
+    """
+    Yield each top-level component of the given type as {NAME: [(params, value), ...]}.
+    Properties of nested components (e.g. VALARM) are ignored.
+    Works on any line iterable, so feeds can be parsed incrementally.
+    """
+    depth = 0
+    props: Optional[Dict[str, List[Tuple[Dict[str, str], str]]]] = None
+    for line in unfold_lines(lines):
+        if not line:
+            continue
+        upper = line.upper()
+        if upper.startswith('BEGIN:'):
+            if props is not None:
+                depth += 1
+            elif upper[6:].strip() == component:
+                props = {}
+            continue
+        if upper.startswith('END:'):
+            if props is None:
+                continue
+            if depth:
+                depth -= 1
+            else:
+                yield props
+                props = None
+            continue
+        if props is None or depth:
+            continue
+        parsed = parse_property(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+        props.setdefault(name, []).append((params, value))
+
+
+def _first(props, name) -> Optional[Tuple[Dict[str, str], str]]:
+    values = props.get(name)
+    return values[0] if values else None
+
+
+def _date_list(props, name, default_tz: tzinfo) -> List[datetime]:
+    """All instants of a multi-valued date property (EXDATE/RDATE); PERIOD values are skipped"""
+    instants = []
+    for params, value in props.get(name, []):
+        if params.get('VALUE') == 'PERIOD':
+            continue
+        for item in value.split(','):
+            if not item.strip() or '/' in item:
+                continue
+            try:
+                instants.append(parse_datetime(item, params, default_tz)[0])
+            except ValueError:
+                continue
+    return instants
+
+
+def build_event(props: Dict[str, List[Tuple[Dict[str, str], str]]], default_tz: tzinfo = DEFAULT_TZ) -> Optional[Event]:
+    """Normalize one raw VEVENT; returns None if it has no usable start"""
+    dtstart = _first(props, 'DTSTART')
+    if dtstart is None:
+        return None
+    try:
+        start, all_day = parse_datetime(dtstart[1], dtstart[0], default_tz)
+    except ValueError:
+        return None
+
+    end = None
+    dtend = _first(props, 'DTEND')
+    if dtend is not None:
+        try:
+            end, _ = parse_datetime(dtend[1], dtend[0], default_tz)
+        except ValueError:
+            end = None
+    if end is None:
+        duration = _first(props, 'DURATION')
+        delta = parse_duration(duration[1]) if duration else None
+        if delta is not None:
+            end = start + delta
+        else:
+            end = start + timedelta(days=1) if all_day else start
+
+    summary = _first(props, 'SUMMARY')
+    location = _first(props, 'LOCATION')
+    description = _first(props, 'DESCRIPTION')
+    uid = _first(props, 'UID')
+    rrule = _first(props, 'RRULE')
+    recurrence_id = _first(props, 'RECURRENCE-ID')
+    try:
+        recurrence_id = parse_datetime(recurrence_id[1], recurrence_id[0], default_tz)[0] if recurrence_id else None
+    except ValueError:
+        recurrence_id = None
+    return Event(
+        uid=uid[1] if uid else f"{dtstart[1]}-{summary[1] if summary else ''}",
+        title=unescape_text(summary[1]) if summary else 'Untitled',
+        start=start,
+        end=end,
+        all_day=all_day,
+        location=unescape_text(location[1]) if location else None,
+        description=unescape_text(description[1]) if description else None,
+        rrule=rrule[1].strip() if rrule else None,
+        rdates=tuple(sorted(_date_list(props, 'RDATE', default_tz))),
+        exdates=frozenset(_date_list(props, 'EXDATE', default_tz)),
+        recurrence_id=recurrence_id,
+    )
+
+
+def parse_events(lines: Iterable[str], default_tz: tzinfo = DEFAULT_TZ) -> List[Event]:
+    """Parse every VEVENT in an ICS document (text.splitlines() or a line iterator)"""
+    events = []
+    for props in iter_components(lines):
+        event = build_event(props, default_tz)
+        if event is not None:
+            events.append(event)
+    return events
+
+
+def window_bounds(start: Optional[date], end: Optional[date], weeks_ahead: int = 4,
+                  default_tz: tzinfo = DEFAULT_TZ) -> Tuple[datetime, datetime]:
+    """
+    Resolve an events query window to aware datetimes.
+    Defaults match the dashboard: one week back to weeks_ahead weeks ahead.
+    """
+    today = datetime.now(default_tz).date()
+    start = start or today - timedelta(days=7)
+    end = end or today + timedelta(weeks=weeks_ahead)
+    return (
+        datetime.combine(start, time.min, tzinfo=default_tz),
+        datetime.combine(end, time.min, tzinfo=default_tz),
+    )
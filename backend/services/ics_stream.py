@@ -0,0 +1,141 @@
+"""
+Incremental ICS feed trimming and history compaction
+Upstream bytes are fed in chunks as they arrive; each VEVENT is buffered only
+until its END line and dropped if it ended before the history horizon, so a
+feed with years of history is never held (or decoded) in memory whole.
+Feeds larger than CALENDAR_MAX_FEED_BYTES are aborted mid-download.
+Standard library only so the legacy server.py can share it.
+"""
+
+import codecs
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from .ics import DEFAULT_TZ, Event, build_event, iter_components
+from .recurrence import recurrence_end
+
+CALENDAR_MAX_FEED_BYTES = int(os.environ.get('CALENDAR_MAX_FEED_BYTES', str(20 * 1024 * 1024)))
+# Events that ended more than this many days ago are dropped while streaming
+# (the dashboard shows one week back); 0 keeps the whole history
+CALENDAR_HISTORY_DAYS = float(os.environ.get('CALENDAR_HISTORY_DAYS', '60'))
+
+CHUNK_SIZE = 64 * 1024
+
+
+def is_current(event: Event, not_before: Optional[datetime]) -> bool:
+    """False for events (and finished recurring series) that ended before not_before"""
+    if not_before is None:
+        return True
+    if event.is_recurring and event.recurrence_id is None:
+        return recurrence_end(event) > not_before.timestamp()
+    return event.end > not_before
+
+
+def compact_events(events: Iterable[Event], not_before: Optional[datetime]) -> List[Event]:
+    """Drop history older than not_before from parsed events"""
+    return [event for event in events if is_current(event, not_before)]
+
+
+class FeedTooLarge(ValueError):
+    """The upstream feed exceeds the configured size limit"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Calendar feed exceeds {limit} bytes")
+        self.limit = limit
+
+
+def history_horizon(days: float = CALENDAR_HISTORY_DAYS) -> Optional[datetime]:
+    """Oldest end time worth keeping (None to keep everything)"""
+    if days <= 0:
+        return None
+    return datetime.now(DEFAULT_TZ) - timedelta(days=days)
+
+
+def check_length(content_length: Optional[str], max_bytes: int = CALENDAR_MAX_FEED_BYTES) -> None:
+    """Reject up front when the upstream announces a body over the limit"""
+    try:
+        length = int(content_length) if content_length else 0
+    except ValueError:
+        return
+    if max_bytes and length > max_bytes:
+        raise FeedTooLarge(max_bytes)
+
+
+class FeedTrimmer:
+    """
+    feed(chunk) -> bytes to keep, then close() for the remainder.
+    Everything outside VEVENTs (calendar properties, VTIMEZONEs) passes through
+    unchanged; recurring masters are kept unless their rule has ended, and
+    unparseable events are kept as they are.
+    """
+
+    def __init__(self, not_before: Optional[datetime] = None,
+                 max_bytes: int = CALENDAR_MAX_FEED_BYTES, default_tz=DEFAULT_TZ):
+        self.not_before = not_before
+        self.max_bytes = max_bytes
+        self.default_tz = default_tz
+        self.received = 0
+        self.kept = 0
+        self.dropped = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self._partial = ''
+        self._event: Optional[List[str]] = None  # Raw lines of the VEVENT being read
+        self._depth = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        self.received += len(chunk)
+        if self.max_bytes and self.received > self.max_bytes:
+            raise FeedTooLarge(self.max_bytes)
+        lines = (self._partial + self._decoder.decode(chunk)).split('\n')
+        self._partial = lines.pop()  # Incomplete until the next newline
+        return self._process(lines)
+
+    def close(self) -> bytes:
+        rest = self._partial + self._decoder.decode(b'', final=True)
+        self._partial = ''
+        kept = self._process([rest] if rest else [])
+        if self._event is not None:
+            # Truncated feed: pass the unfinished event through for the parser to skip
+            kept += self._join(self._event)
+            self._event = None
+        return kept
+
+    def _process(self, lines: List[str]) -> bytes:
+        out: List[str] = []
+        for line in lines:
+            # Folded continuations start with whitespace, so never match here
+            upper = line.rstrip().upper()
+            if self._event is None:
+                if upper == 'BEGIN:VEVENT':
+                    self._event = [line]
+                    self._depth = 0
+                else:
+                    out.append(line)
+                continue
+            self._event.append(line)
+            if upper.startswith('BEGIN:'):
+                self._depth += 1  # VALARM etc.
+            elif upper.startswith('END:'):
+                if self._depth:
+                    self._depth -= 1
+                else:
+                    if self._keep(self._event):
+                        out.extend(self._event)
+                        self.kept += 1
+                    else:
+                        self.dropped += 1
+                    self._event = None
+        return self._join(out)
+
+    def _keep(self, lines: List[str]) -> bool:
+        if self.not_before is None:
+            return True
+        props = next(iter_components(lines), None)
+        event = build_event(props, self.default_tz) if props is not None else None
+        return event is None or is_current(event, self.not_before)
+
+    @staticmethod
+    def _join(lines: List[str]) -> bytes:
+        # Lines keep their '\r', so CRLF feeds stay CRLF
+        return ''.join(line + '\n' for line in lines).encode('utf-8') if lines else b''
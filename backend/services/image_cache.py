@@ -0,0 +1,148 @@
+"""
+On-disk cache of resized background images
+Each photo is stored once per size bucket (longest side 1280/1920/2560/3840,
+keeping the display's aspect ratio), so every display of a given resolution
+shares one download. Total size is capped by evicting the least recently
+served files; a file is never evicted while a response is sending it.
+Standard library only.
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from .disk_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_CACHE_DIR = os.environ.get('BACKGROUND_CACHE_DIR', os.path.join(CACHE_DIR, 'backgrounds'))
+BACKGROUND_CACHE_MAX_BYTES = int(os.environ.get('BACKGROUND_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+SIZE_BUCKETS = (1280, 1920, 2560, 3840)
+DEFAULT_SIZE = (1920, 1080)
+_PHOTO_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def valid_photo_id(photo_id: str) -> bool:
+    return bool(_PHOTO_ID.match(photo_id))
+
+
+def size_bucket(width: Optional[int], height: Optional[int]) -> Tuple[int, int]:
+    """Scale (width, height) so the longest side is the next bucket up (capped at the largest)"""
+    if not width or not height or width <= 0 or height <= 0:
+        width, height = DEFAULT_SIZE
+    longest = max(width, height)
+    bucket = next((b for b in SIZE_BUCKETS if b >= longest), SIZE_BUCKETS[-1])
+    scale = bucket / longest
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class ImageCache:
+    """Resized images as files named <photo id>-<width>x<height>.jpg"""
+
+    def __init__(self, directory: str = BACKGROUND_CACHE_DIR, max_bytes: int = BACKGROUND_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Paths being sent to clients (with how many responses); eviction skips them
+        self._serving: Dict[str, int] = {}
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def path_for(self, photo_id: str, size: Tuple[int, int]) -> str:
+        return os.path.join(self.directory, f"{photo_id}-{size[0]}x{size[1]}.jpg")
+
+    def get(self, photo_id: str, size: Tuple[int, int]) -> Optional[str]:
+        """acquire() for a request, counted as a cache hit"""
+        path = self.acquire(photo_id, size)
+        if path is not None:
+            self.hits += 1
+        return path
+
+    def acquire(self, photo_id: str, size: Tuple[int, int]) -> Optional[str]:
+        """
+        Path of the cached variant (marked recently used), or None. The file is
+        kept from eviction until release(path) is called once it has been sent.
+        """
+        path = self.path_for(photo_id, size)
+        with self._lock:
+            try:
+                os.utime(path)
+            except OSError:
+                return None
+            self._serving[path] = self._serving.get(path, 0) + 1
+        return path
+
+    def release(self, path: str) -> None:
+        with self._lock:
+            count = self._serving.pop(path, 0) - 1
+            if count > 0:
+                self._serving[path] = count
+
+    def store(self, photo_id: str, size: Tuple[int, int], data: bytes) -> str:
+        """Write a variant atomically and evict old files over the size cap"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(photo_id, size)
+        fd, temp_path = tempfile.mkstemp(prefix='.image-', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        self.stores += 1
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently served files over the cap, except keep and files being sent"""
+        with self._lock:
+            files = []
+            total = 0
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.jpg'):
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+                        total += st.st_size
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                if path == keep or path in self._serving:
+                    continue
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, object]:
+        count = total = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.jpg'):
+                        count += 1
+                        total += entry.stat().st_size
+        except OSError:
+            pass
+        return {
+            "directory": self.directory,
+            "images": count,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "serving": len(self._serving),
+        }
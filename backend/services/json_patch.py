@@ -0,0 +1,149 @@
+"""
+JSON Merge Patch (RFC 7386) and JSON Patch (RFC 6902) for the settings document
+Standard library only so the legacy server.py can share it.
+"""
+
+import copy
+from typing import Any, Dict, Iterable, List, Set
+
+MERGE_PATCH_TYPE = 'application/merge-patch+json'
+JSON_PATCH_TYPE = 'application/json-patch+json'
+
+
+class PatchError(ValueError):
+    """The patch is malformed or cannot be applied"""
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """RFC 7386: objects merge recursively, null deletes, anything else replaces"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if not isinstance(pointer, str):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [part.replace('~1', '/').replace('~0', '~') for part in pointer[1:].split('/')]
+
+
+def _array_index(container: list, token: str, allow_end: bool) -> int:
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(doc: Any, parts: List[str]):
+    node = doc
+    for token in parts[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise PatchError(f"Path not found: /{'/'.join(parts)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_array_index(node, token, allow_end=False)]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(parts)}")
+    return node
+
+
+def _get(doc: Any, parts: List[str]) -> Any:
+    if not parts:
+        return doc
+    parent = _resolve_parent(doc, parts)
+    token = parts[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(parts)}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_array_index(parent, token, allow_end=False)]
+    raise PatchError(f"Path not found: /{'/'.join(parts)}")
+
+
+def _add(doc: Any, parts: List[str], value: Any) -> Any:
+    if not parts:
+        return value
+    parent = _resolve_parent(doc, parts)
+    token = parts[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, token, allow_end=True), value)
+    else:
+        raise PatchError(f"Cannot add to /{'/'.join(parts)}")
+    return doc
+
+
+def _remove(doc: Any, parts: List[str]) -> Any:
+    if not parts:
+        raise PatchError("Cannot remove the whole document")
+    parent = _resolve_parent(doc, parts)
+    token = parts[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(parts)}")
+        del parent[token]
+    elif isinstance(parent, list):
+        del parent[_array_index(parent, token, allow_end=False)]
+    else:
+        raise PatchError(f"Path not found: /{'/'.join(parts)}")
+    return doc
+
+
+def apply_json_patch(doc: Any, operations: Iterable[Dict[str, Any]]) -> Any:
+    """RFC 6902 add/remove/replace/move/copy/test; all-or-nothing"""
+    if not isinstance(operations, list):
+        raise PatchError("JSON Patch must be an array of operations")
+    doc = copy.deepcopy(doc)
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise PatchError(f"Invalid operation: {operation!r}")
+        op = operation['op']
+        path = _parse_pointer(operation['path'])
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise PatchError(f"'{op}' needs a value")
+        if op in ('move', 'copy') and 'from' not in operation:
+            raise PatchError(f"'{op}' needs a 'from' pointer")
+        if op == 'add':
+            doc = _add(doc, path, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            doc = _remove(doc, path)
+        elif op == 'replace':
+            _get(doc, path)  # Target must exist
+            doc = _add(_remove(doc, path), path, copy.deepcopy(operation['value'])) if path \
+                else copy.deepcopy(operation['value'])
+        elif op in ('move', 'copy'):
+            source = _parse_pointer(operation['from'])
+            if op == 'move' and path[:len(source)] == source and path != source:
+                raise PatchError("Cannot move a value into itself")
+            value = copy.deepcopy(_get(doc, source))
+            if op == 'move':
+                doc = _remove(doc, source)
+            doc = _add(doc, path, value)
+        elif op == 'test':
+            if _get(doc, path) != operation['value']:
+                raise PatchError(f"Test failed at {operation['path']}")
+        else:
+            raise PatchError(f"Unknown operation: {op!r}")
+    return doc
+
+
+def changed_keys(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    """Top-level keys whose values differ (added, removed or changed)"""
+    return {key for key in old.keys() | new.keys() if old.get(key, ...) != new.get(key, ...)}
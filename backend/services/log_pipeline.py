@@ -0,0 +1,209 @@
+"""
+Logging pipeline shared by the FastAPI app and server.py
+Request threads only put records on a queue; one background thread formats
+them and writes them to stdout, so a slow or full journald pipe never holds up
+a request. LOG_FORMAT=json writes one JSON object per line. Polling endpoints
+are sampled per request: a GET that is not sampled drops its DEBUG and INFO
+records (access line included), while warnings and errors are always kept.
+Standard library only.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import registry
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+# path=rate pairs for GET requests: 0.1 logs one request in ten, 0 none (below WARNING)
+LOG_SAMPLE_ROUTES = os.environ.get(
+    'LOG_SAMPLE_ROUTES', '/api/health=0.01,/api/version=0.01,/api/settings=0.1'
+)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Extra attributes copied into JSON lines when a record carries them
+JSON_FIELDS = ('method', 'path', 'status', 'bytes', 'duration_ms', 'client')
+
+_request: ContextVar[Optional[Tuple[str, str]]] = ContextVar('log_request', default=None)
+_sampled: ContextVar[bool] = ContextVar('log_sampled', default=True)
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """'/api/health=0.01,/api/settings=0.1' -> {path: rate}"""
+    rates = {}
+    for item in spec.split(','):
+        path, sep, rate = item.strip().partition('=')
+        if path and sep:
+            rates[path] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RouteSampler:
+    """Keeps every Nth GET per path (N = 1/rate), starting with the first"""
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def sample(self, path: str, method: str) -> bool:
+        rate = self.rates.get(path)
+        if method != 'GET' or rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        every = max(1, round(1 / rate))
+        with self._lock:
+            count = self._counts.get(path, 0)
+            self._counts[path] = count + 1
+        return count % every == 0
+
+
+sampler = RouteSampler(parse_rates(LOG_SAMPLE_ROUTES))
+
+
+def begin_request(path: str, method: str) -> Tuple[Token, Token]:
+    """Tag records logged while serving this request and decide whether it is sampled"""
+    return _request.set((method, path)), _sampled.set(sampler.sample(path, method))
+
+
+def end_request(tokens: Tuple[Token, Token]) -> None:
+    _request.reset(tokens[0])
+    _sampled.reset(tokens[1])
+
+
+class RequestFilter(logging.Filter):
+    """Runs in the calling thread: drops unsampled records and adds method/path"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request = _request.get()
+        if request is not None and not hasattr(record, 'path'):
+            record.method, record.path = request
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in JSON_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records unformatted (the listener thread formats them) and drops
+    them instead of blocking or raising when the queue is full.
+    """
+
+    def __init__(self, log_queue: 'queue.Queue[Any]'):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[DroppingQueueHandler] = None
+_stream: Optional[logging.Handler] = None
+
+
+def configure_logging(level: str = LOG_LEVEL, format: str = LOG_FORMAT) -> DroppingQueueHandler:
+    """
+    Route the root logger (and uvicorn's loggers) through the queue; idempotent,
+    and starts a new writer thread if called again after stop_logging()
+    """
+    global _listener, _handler, _stream
+    if _handler is not None:
+        return _handler
+    _stream = stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if format == 'json' else logging.Formatter(TEXT_FORMAT))
+    _handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    _handler.addFilter(RequestFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    # uvicorn installs its own stdout handlers before the app is imported
+    for name in ('uvicorn', 'uvicorn.error', 'uvicorn.access'):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(_handler.queue, stream)
+    _listener.start()
+    atexit.unregister(stop_logging)  # Once, however often logging is restarted
+    atexit.register(stop_logging)
+    return _handler
+
+
+def stop_logging() -> None:
+    """
+    Write out whatever is still queued and stop the writer thread (on shutdown).
+    Records logged afterwards are written directly instead of being queued for nobody.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        root = logging.getLogger()
+        root.removeHandler(_handler)
+        root.addHandler(_stream)
+        _handler = None
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def log_metrics():
+    return [('dashboard_log_records_dropped_total', 'counter', 'Log records dropped because the queue was full',
+             [('dashboard_log_records_dropped_total', {}, dropped_records())])]
+
+
+registry.add_collector(log_metrics)
+
+
+class LogContextMiddleware:
+    """Pure ASGI middleware: records logged while serving a request carry its method and path"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        tokens = begin_request(scope['path'], scope['method'])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_request(tokens)
@@ -0,0 +1,330 @@
+"""
+Prometheus-style metrics shared by the FastAPI app and server.py
+Counters, gauges and histograms with labels, rendered in the text exposition
+format for /api/metrics. Each metric family has its own lock, held only for
+one dictionary update, and cache figures are read from the caches when
+scraped, so recording adds next to nothing to a request. Standard library only.
+"""
+
+import bisect
+import socket
+import threading
+import time
+import urllib.error
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Seconds; streams (cameras, SSE) last longer than the top bucket and land in +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Family:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, self._labels(labels), value) for labels, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                # One count per bucket plus +Inf, then the running sum
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples = []
+        for labels, counts in items:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", base, counts[-1]))
+            samples.append((f"{self.name}_count", base, cumulative))
+        return samples
+
+
+class Registry:
+    """Metric families plus collectors that read their values at scrape time"""
+
+    def __init__(self):
+        self._families: List[_Family] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        self._caches: Dict[str, Any] = {}
+
+    def _add(self, family: _Family) -> Any:
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        """collector() yields (name, type, help, samples) when scraped"""
+        self._collectors.append(collector)
+
+    def add_cache(self, name: str, cache: Any) -> None:
+        """A ResponseCache whose stats() are exported under cache=name"""
+        self._caches[name] = cache
+
+    def _cache_families(self) -> Iterator[Tuple[str, str, str, List[Sample]]]:
+        requests: List[Sample] = []
+        ratios: List[Sample] = []
+        entries: List[Sample] = []
+        for name, cache in self._caches.items():
+            stats = cache.stats()
+            for result, key in (('hit', 'hits'), ('stale', 'stale_hits'), ('miss', 'misses')):
+                requests.append(('dashboard_cache_requests_total', {"cache": name, "result": result}, stats[key]))
+            ratios.append(('dashboard_cache_hit_ratio', {"cache": name}, stats['hit_ratio']))
+            entries.append(('dashboard_cache_entries', {"cache": name}, stats['entries']))
+        yield 'dashboard_cache_requests_total', 'counter', 'Cache lookups by result', requests
+        yield 'dashboard_cache_hit_ratio', 'gauge', 'Share of lookups served from cache (fresh or stale)', ratios
+        yield 'dashboard_cache_entries', 'gauge', 'Entries held in memory', entries
+
+    def render(self) -> str:
+        """Text exposition format (version 0.0.4)"""
+        families = [(f.name, f.kind, f.help, f.samples()) for f in self._families]
+        families.extend(self._cache_families())
+        for collector in self._collectors:
+            families.extend(collector())
+        lines = []
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                if labels:
+                    label_text = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'dashboard_http_requests_total', 'Requests served', ('route', 'method', 'status'))
+REQUEST_SECONDS = registry.histogram(
+    'dashboard_http_request_duration_seconds', 'Time to serve a request (streams: until closed)', ('route',))
+IN_FLIGHT = registry.gauge(
+    'dashboard_http_requests_in_flight', 'Requests being served', ('route',))
+RESPONSE_BYTES = registry.counter(
+    'dashboard_http_response_bytes_total', 'Bytes sent to clients', ('route',))
+UPSTREAM_REQUESTS = registry.counter(
+    'dashboard_upstream_requests_total', 'Upstream calls by outcome (status class, timeout or error)',
+    ('upstream', 'outcome'))
+UPSTREAM_SECONDS = registry.histogram(
+    'dashboard_upstream_request_duration_seconds', 'Upstream call latency (streams: until headers)', ('upstream',))
+UPSTREAM_BYTES = registry.counter(
+    'dashboard_upstream_bytes_total', 'Bytes received from upstreams', ('upstream',))
+
+# Values of the upstream label. Feed, Home Assistant and camera hosts come from
+# user input, so they are never used as labels: anything else counts as 'other'.
+UPSTREAMS = frozenset(['homeassistant', 'calendar', 'weather', 'unsplash', 'camera'])
+
+
+# -- recording ---------------------------------------------------------------
+
+def request_started(route: str) -> float:
+    IN_FLIGHT.inc(route)
+    return time.perf_counter()
+
+
+def request_finished(route: str, method: str, status: int, started: float, sent: int) -> None:
+    IN_FLIGHT.dec(route)
+    REQUESTS.inc(route, method, str(status))
+    REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+    if sent:
+        RESPONSE_BYTES.inc(route, amount=sent)
+
+
+def status_outcome(status: int) -> str:
+    return f"{status // 100}xx"
+
+
+def upstream_label(upstream: Optional[str]) -> str:
+    return upstream if upstream in UPSTREAMS else 'other'
+
+
+def record_upstream(upstream: Optional[str], outcome: str, seconds: float, received: int = 0) -> None:
+    upstream = upstream_label(upstream)
+    UPSTREAM_REQUESTS.inc(upstream, outcome)
+    UPSTREAM_SECONDS.observe(seconds, upstream)
+    if received:
+        UPSTREAM_BYTES.inc(upstream, amount=received)
+
+
+def record_upstream_bytes(upstream: Optional[str], received: int) -> None:
+    """Bytes read from a stream after record_upstream() timed its headers"""
+    if received:
+        UPSTREAM_BYTES.inc(upstream_label(upstream), amount=received)
+
+
+def error_outcome(error: BaseException) -> str:
+    """Outcome label for a failed urllib call"""
+    if isinstance(error, urllib.error.HTTPError):
+        return status_outcome(error.code)
+    reason = getattr(error, 'reason', error)
+    if isinstance(reason, (socket.timeout, TimeoutError)) or 'timed out' in str(reason).lower():
+        return 'timeout'
+    return 'error'
+
+
+class UpstreamCall:
+    """Filled in by the caller inside upstream_call(): response status and bytes read"""
+
+    def __init__(self):
+        self.status = 200
+        self.received = 0
+
+
+@contextmanager
+def upstream_call(upstream: str) -> Iterator[UpstreamCall]:
+    """Time a blocking (urllib) upstream call and record its outcome"""
+    call = UpstreamCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        record_upstream(upstream, error_outcome(e), time.perf_counter() - started, call.received)
+        raise
+    record_upstream(upstream, status_outcome(call.status), time.perf_counter() - started, call.received)
+
+
+class CountingWriter:
+    """File-like wrapper counting bytes written (server.py response bodies)"""
+
+    def __init__(self, raw: Any):
+        self._raw = raw
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self.written += len(data)
+        return self._raw.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+
+# -- ASGI (FastAPI) ----------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording REQUESTS, REQUEST_SECONDS, IN_FLIGHT and
+    RESPONSE_BYTES. Routes are labelled by their path template (e.g.
+    /api/backgrounds/{photo_id}/{size}); everything outside /api is 'static'.
+    """
+
+    MAX_CACHED_PATHS = 1024
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._labels: Dict[str, str] = {}
+
+    def route_label(self, scope: Dict[str, Any]) -> str:
+        path = scope['path']
+        if not path.startswith('/api/'):
+            return 'static'
+        label = self._labels.get(path)
+        if label is None:
+            label = '/api/other'
+            for route in getattr(scope.get('app'), 'routes', ()):
+                regex = getattr(route, 'path_regex', None)
+                if regex is not None and regex.match(path):
+                    label = route.path
+                    break
+            if len(self._labels) >= self.MAX_CACHED_PATHS:
+                self._labels.clear()
+            self._labels[path] = label
+        return label
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        route = self.route_label(scope)
+        started = request_started(route)
+        status = 500
+        sent = 0
+
+        async def metered_send(message: Dict[str, Any]) -> None:
+            nonlocal status, sent
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                sent += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, metered_send)
+        finally:
+            request_finished(route, scope['method'], status, started, sent)
@@ -0,0 +1,352 @@
+"""
+RRULE / RDATE / EXDATE / RECURRENCE-ID expansion (RFC 5545)
+Occurrences are generated lazily and only for the requested window;
+unbounded rules are never materialized. Standard library only.
+"""
+
+import calendar
+import heapq
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .ics import DEFAULT_TZ, Event, parse_datetime
+
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+
+# Stop if a rule produces nothing for this many consecutive periods
+# (e.g. FREQ=MONTHLY;BYMONTHDAY=31;BYMONTH=2 never matches)
+MAX_EMPTY_PERIODS = 1000
+
+
+class RecurrenceRule:
+    """A parsed RRULE; period arithmetic works on naive wall-clock datetimes"""
+
+    __slots__ = ('freq', 'interval', 'count', 'until', 'byday', 'bymonthday', 'bymonth', 'bysetpos', 'wkst')
+
+    def __init__(self, freq, interval=1, count=None, until=None, byday=(), bymonthday=(),
+                 bymonth=(), bysetpos=(), wkst=0):
+        self.freq = freq
+        self.interval = max(1, interval)
+        self.count = count
+        self.until = until
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.bymonth = bymonth
+        self.bysetpos = bysetpos
+        self.wkst = wkst
+
+    @classmethod
+    def parse(cls, value: str, tz=DEFAULT_TZ) -> Optional['RecurrenceRule']:
+        """Parse an RRULE value; None for frequencies/parts this engine does not support"""
+        parts = {}
+        for item in value.split(';'):
+            key, sep, part = item.partition('=')
+            if sep:
+                parts[key.strip().upper()] = part.strip()
+        freq = parts.get('FREQ', '').upper()
+        if freq not in FREQUENCIES or 'BYWEEKNO' in parts or 'BYYEARDAY' in parts:
+            return None
+        try:
+            until = None
+            if 'UNTIL' in parts:
+                until = parse_datetime(parts['UNTIL'], {}, tz)[0]
+                if len(parts['UNTIL']) == 8:
+                    # A DATE UNTIL includes the whole day
+                    until += timedelta(days=1) - timedelta(microseconds=1)
+            return cls(
+                freq=freq,
+                interval=int(parts.get('INTERVAL', 1)),
+                count=int(parts['COUNT']) if 'COUNT' in parts else None,
+                until=until,
+                byday=tuple(_parse_byday(d) for d in parts['BYDAY'].split(',')) if 'BYDAY' in parts else (),
+                bymonthday=_int_list(parts.get('BYMONTHDAY')),
+                bymonth=_int_list(parts.get('BYMONTH')),
+                bysetpos=_int_list(parts.get('BYSETPOS')),
+                wkst=WEEKDAYS.get(parts.get('WKST', 'MO').upper(), 0),
+            )
+        except (KeyError, ValueError):
+            return None
+
+    # -- periods -----------------------------------------------------------
+
+    def first_period(self, dtstart: datetime, target: datetime) -> int:
+        """Index of the period containing target (never before dtstart's period)"""
+        if target <= dtstart:
+            return 0
+        if self.freq == 'DAILY':
+            elapsed = (target.date() - dtstart.date()).days
+        elif self.freq == 'WEEKLY':
+            elapsed = (self._week_start(target.date()) - self._week_start(dtstart.date())).days // 7
+        elif self.freq == 'MONTHLY':
+            elapsed = (target.year - dtstart.year) * 12 + target.month - dtstart.month
+        else:
+            elapsed = target.year - dtstart.year
+        return max(0, elapsed // self.interval)
+
+    def period_candidates(self, dtstart: datetime, index: int) -> List[datetime]:
+        """Sorted candidate occurrences of the index-th period (before COUNT/UNTIL/dtstart checks)"""
+        step = index * self.interval
+        start_date = dtstart.date()
+        if self.freq == 'DAILY':
+            day = start_date + timedelta(days=step)
+            days = [day] if self._day_matches(day) else []
+        elif self.freq == 'WEEKLY':
+            week = self._week_start(start_date) + timedelta(weeks=step)
+            weekdays = sorted({wd for _, wd in self.byday}) if self.byday else [start_date.weekday()]
+            days = [week + timedelta(days=(wd - self.wkst) % 7) for wd in weekdays]
+            days = sorted(d for d in days if not self.bymonth or d.month in self.bymonth)
+        elif self.freq == 'MONTHLY':
+            year, month = divmod(start_date.month - 1 + step, 12)
+            year += start_date.year
+            month += 1
+            if self.bymonth and month not in self.bymonth:
+                days = []
+            else:
+                days = [date(year, month, d) for d in self._month_days(year, month, start_date.day)]
+        else:
+            year = start_date.year + step
+            if self.byday and not self.bymonth and not self.bymonthday:
+                days = self._year_weekdays(year)
+            else:
+                days = []
+                for month in (self.bymonth or (start_date.month,)):
+                    days.extend(date(year, month, d) for d in self._month_days(year, month, start_date.day))
+        candidates = [datetime.combine(d, dtstart.time()) for d in days]
+        if self.bysetpos and candidates:
+            picked = set()
+            for pos in self.bysetpos:
+                if 1 <= abs(pos) <= len(candidates):
+                    picked.add(candidates[pos - 1 if pos > 0 else pos])
+            candidates = sorted(picked)
+        return candidates
+
+    def _week_start(self, day: date) -> date:
+        return day - timedelta(days=(day.weekday() - self.wkst) % 7)
+
+    def _day_matches(self, day: date) -> bool:
+        if self.bymonth and day.month not in self.bymonth:
+            return False
+        if self.bymonthday:
+            ndays = calendar.monthrange(day.year, day.month)[1]
+            if not any(day.day == (d if d > 0 else ndays + d + 1) for d in self.bymonthday):
+                return False
+        if self.byday and day.weekday() not in {wd for _, wd in self.byday}:
+            return False
+        return True
+
+    def _month_days(self, year: int, month: int, default_day: int) -> List[int]:
+        """Days of a month selected by BYMONTHDAY/BYDAY (or dtstart's day of month)"""
+        ndays = calendar.monthrange(year, month)[1]
+        days = None
+        if self.bymonthday:
+            days = set()
+            for d in self.bymonthday:
+                resolved = d if d > 0 else ndays + d + 1
+                if 1 <= resolved <= ndays:
+                    days.add(resolved)
+        if self.byday:
+            weekday_days = set()
+            first_weekday = calendar.monthrange(year, month)[0]
+            for ordinal, wd in self.byday:
+                matches = list(range((wd - first_weekday) % 7 + 1, ndays + 1, 7))
+                if ordinal is None:
+                    weekday_days.update(matches)
+                elif 1 <= abs(ordinal) <= len(matches):
+                    weekday_days.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+            days = weekday_days if days is None else days & weekday_days
+        if days is None:
+            days = {default_day} if default_day <= ndays else set()
+        return sorted(days)
+
+    def _year_weekdays(self, year: int) -> List[date]:
+        """BYDAY within a whole year (e.g. FREQ=YEARLY;BYDAY=20MO)"""
+        days = set()
+        jan1 = date(year, 1, 1)
+        ndays = 366 if calendar.isleap(year) else 365
+        for ordinal, wd in self.byday:
+            first = jan1 + timedelta(days=(wd - jan1.weekday()) % 7)
+            matches = [first + timedelta(weeks=w) for w in range((ndays - (first - jan1).days + 6) // 7)]
+            if ordinal is None:
+                days.update(matches)
+            elif 1 <= abs(ordinal) <= len(matches):
+                days.add(matches[ordinal - 1 if ordinal > 0 else ordinal])
+        return sorted(days)
+
+
+def _parse_byday(value: str) -> Tuple[Optional[int], int]:
+    """'2TU' -> (2, 1); '-1FR' -> (-1, 4); 'MO' -> (None, 0)"""
+    value = value.strip().upper()
+    ordinal = value[:-2]
+    return (int(ordinal) if ordinal else None), WEEKDAYS[value[-2:]]
+
+
+def _int_list(value: Optional[str]) -> Tuple[int, ...]:
+    return tuple(int(v) for v in value.split(',')) if value else ()
+
+
+def iter_rule(rule: RecurrenceRule, dtstart: datetime, after: Optional[datetime] = None) -> Iterator[datetime]:
+    """
+    Lazily yield rule occurrences as aware datetimes, starting with dtstart.
+    When the rule has no COUNT, periods ending before `after` are skipped
+    arithmetically instead of being iterated.
+    """
+    tz = dtstart.tzinfo
+    naive_start = dtstart.replace(tzinfo=None)
+    index = 0
+    if after is not None and rule.count is None:
+        index = rule.first_period(naive_start, after.astimezone(tz).replace(tzinfo=None))
+
+    emitted = 0
+    if index == 0:
+        # DTSTART is always the first instance, even if the rule would not select it
+        yield dtstart
+        emitted = 1
+
+    empty = 0
+    while True:
+        candidates = rule.period_candidates(naive_start, index)
+        index += 1
+        empty = 0 if candidates else empty + 1
+        if empty > MAX_EMPTY_PERIODS:
+            return
+        for candidate in candidates:
+            if candidate <= naive_start:
+                continue
+            occurrence = candidate.replace(tzinfo=tz)
+            if rule.until is not None and occurrence > rule.until:
+                return
+            if rule.count is not None and emitted >= rule.count:
+                return
+            emitted += 1
+            yield occurrence
+
+
+def iter_occurrences(
+    event: Event,
+    window_start: datetime,
+    window_end: datetime,
+    exclude: FrozenSet[datetime] = frozenset()
+) -> Iterator[Event]:
+    """
+    Lazily yield the occurrences of an event that overlap [window_start, window_end).
+    Non-recurring events yield themselves (if they overlap).
+    """
+    if not event.is_recurring:
+        if event.overlaps(window_start, window_end):
+            yield event
+        return
+
+    tz = event.start.tzinfo
+    wall_duration = event.end.replace(tzinfo=None) - event.start.replace(tzinfo=None)
+    rule = RecurrenceRule.parse(event.rrule, tz) if event.rrule else None
+
+    sources: List[Iterable[datetime]] = [event.rdates]
+    if rule is not None:
+        # Occurrences starting up to one duration before the window can still overlap it
+        sources.append(iter_rule(rule, event.start, window_start - abs(wall_duration)))
+    else:
+        # RDATE-only events, or rules this engine cannot expand: DTSTART still occurs
+        sources.append((event.start,))
+
+    previous = None
+    for start in heapq.merge(*sources):
+        if start >= window_end:
+            return
+        if start == previous:
+            continue
+        previous = start
+        if start in event.exdates or start in exclude:
+            continue
+        local_start = start.astimezone(tz)
+        end = (local_start.replace(tzinfo=None) + wall_duration).replace(tzinfo=tz)
+        occurrence = replace(
+            event,
+            uid=f"{event.uid}_{start.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+            start=local_start,
+            end=end,
+            rrule=None,
+            rdates=(),
+            exdates=frozenset(),
+        )
+        if occurrence.overlaps(window_start, window_end):
+            yield occurrence
+
+
+def recurrence_end(event: Event) -> float:
+    """Upper bound on when a recurring event's last occurrence ends (inf if unbounded)"""
+    last = event.rdates[-1] if event.rdates else event.start
+    if event.rrule:
+        rule = RecurrenceRule.parse(event.rrule, event.start.tzinfo)
+        if rule is None or rule.until is None:
+            # Unbounded, or a rule this engine cannot expand (BYWEEKNO, HOURLY...): assume it runs on
+            return float('inf')
+        last = max(last, rule.until)
+    return (last + (event.end - event.start)).timestamp()
+
+
+class ExpansionCache:
+    """
+    Memoized expansions keyed by (feed version, event UID, window), LRU-bounded.
+    Repeated refreshes of the same window cost a dict lookup per recurring event.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Event, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def expand(self, version: Hashable, event: Event, window_start: datetime, window_end: datetime,
+               exclude: FrozenSet[datetime] = frozenset()) -> Tuple[Event, ...]:
+        key = (version, event.uid, event.start, window_start, window_end, exclude)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        occurrences = tuple(iter_occurrences(event, window_start, window_end, exclude))
+        with self._lock:
+            self._entries[key] = occurrences
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return occurrences
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def expand_events(
+    events: Iterable[Event],
+    window_start: datetime,
+    window_end: datetime,
+    memo: Optional[ExpansionCache] = None,
+    version: Hashable = None
+) -> Iterator[Event]:
+    """
+    Yield every occurrence overlapping the window across a feed's events.
+    RECURRENCE-ID overrides replace the master occurrence they point at.
+    """
+    events = list(events)
+    overridden: Dict[str, set] = {}
+    for event in events:
+        if event.recurrence_id is not None:
+            overridden.setdefault(event.uid, set()).add(event.recurrence_id)
+
+    for event in events:
+        if event.recurrence_id is not None or not event.is_recurring:
+            if event.overlaps(window_start, window_end):
+                yield event
+            continue
+        exclude = frozenset(overridden.get(event.uid, ()))
+        if memo is not None:
+            yield from memo.expand(version, event, window_start, window_end, exclude)
+        else:
+            yield from iter_occurrences(event, window_start, window_end, exclude)
@@ -0,0 +1,31 @@
+"""
+FastAPI response helpers (conditional GET)
+"""
+
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from .cache import CachedResponse
+from .http_cache import http_date, is_not_modified
+
+
+def conditional_response(
+    request: Request,
+    cached: CachedResponse,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Send the cached body, or a 304 if the client already has this version"""
+    headers = {
+        **(headers or {}),
+        'ETag': cached.etag,
+        'Last-Modified': http_date(cached.last_modified)
+    }
+    if is_not_modified(
+        request.headers.get('If-None-Match'),
+        request.headers.get('If-Modified-Since'),
+        cached.etag,
+        cached.last_modified
+    ):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=cached.content_type, headers=headers)
@@ -0,0 +1,91 @@
+"""
+Background refresh scheduler for upstream feeds
+One asyncio task per feed, so a feed is never refreshed twice at once.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class FeedScheduler:
+    """
+    Periodically call refresh(key) for every configured key.
+
+    Intervals are jittered so feeds do not all fire together; failures back off
+    exponentially (retry_base, 2x, 4x, ... capped at max_backoff).
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[Any]],
+        interval: float = 240.0,
+        jitter: float = 0.1,
+        retry_base: float = 30.0,
+        max_backoff: float = 3600.0
+    ):
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_base = retry_base
+        self.max_backoff = max_backoff
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self, keys: Iterable[str]) -> None:
+        """Start tasks for new keys and cancel tasks for keys no longer configured"""
+        wanted = set(keys)
+        for key in list(self._tasks):
+            if key not in wanted:
+                self._tasks.pop(key).cancel()
+                self._status.pop(key, None)
+        for key in wanted:
+            if key not in self._tasks:
+                self._status[key] = {"runs": 0, "failures": 0, "last_success": None, "last_error": None}
+                self._tasks[key] = asyncio.create_task(self._run(key))
+        logger.info(f"🔄 Prefetch scheduler tracking {len(self._tasks)} feed(s)")
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _jittered(self, delay: float) -> float:
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    async def _run(self, key: str) -> None:
+        status = self._status[key]
+        # Stagger the first refresh so startup does not hit every upstream at once
+        delay = random.uniform(0, self.jitter * self.interval)
+        failures = 0
+        while True:
+            status["next_run"] = time.time() + delay
+            await asyncio.sleep(delay)
+            status["runs"] += 1
+            try:
+                await self.refresh(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                status["failures"] += 1
+                status["last_error"] = f"{type(e).__name__}: {e}"
+                delay = self._jittered(min(self.max_backoff, self.retry_base * 2 ** (failures - 1)))
+                logger.warning(f"⚠ Prefetch failed ({failures}x), retrying in {delay:.0f}s: {status['last_error']}")
+                continue
+            failures = 0
+            status["last_success"] = time.time()
+            delay = self._jittered(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "feeds": len(self._tasks),
+            "status": {key: dict(status) for key, status in self._status.items()},
+        }
@@ -0,0 +1,294 @@
+"""
+In-memory settings document with write-behind persistence
+GETs are served from the parsed document and its pre-serialized bytes; saves
+update memory at once and are written to disk at most once per debounce
+window, atomically (temp file + fsync + rename), without holding the lock
+readers take. Edits made to the file by hand are picked up via its mtime and
+reported to listeners. Every change bumps a revision number so
+clients can ask for just the keys changed since the revision they have.
+Standard library only so the legacy server.py can share it.
+"""
+
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from .cache import CachedResponse
+from .json_patch import JSON_PATCH_TYPE, PatchError, apply_json_patch, changed_keys, merge_patch
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_WRITE_DELAY = float(os.environ.get('SETTINGS_WRITE_DELAY', '0.5'))
+SETTINGS_CHECK_INTERVAL = float(os.environ.get('SETTINGS_CHECK_INTERVAL', '2'))
+# Revisions remembered for ?since= (older clients get the full document)
+SETTINGS_HISTORY = int(os.environ.get('SETTINGS_HISTORY', '64'))
+
+# Bookkeeping keys stored in the file but not sent to dashboards
+PRIVATE_KEYS = ('_lastUpdated', '_revision')
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Replace path with data so readers see either the old or the new file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.settings-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(dir_fd)  # Persist the rename itself
+    finally:
+        os.close(dir_fd)
+
+
+class SettingsStore:
+    """The settings.json document, held in memory"""
+
+    def __init__(self, path: str, write_delay: float = SETTINGS_WRITE_DELAY,
+                 check_interval: float = SETTINGS_CHECK_INTERVAL, check_on_read: bool = True):
+        """
+        check_on_read=False leaves noticing hand edits to a watcher calling
+        check(), so reads never touch the file (for use on an event loop)
+        """
+        self.path = path
+        self.write_delay = write_delay
+        self.check_interval = check_interval
+        self.check_on_read = check_on_read
+        self._lock = threading.RLock()
+        # Serializes flushes so an older snapshot never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._response = CachedResponse(body=b'{}', content_type='application/json', last_modified=0.0)
+        self._file_mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self.revision = 0
+        self._history: Deque[Tuple[int, FrozenSet[str]]] = deque(maxlen=SETTINGS_HISTORY)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.loads = 0
+        self.writes = 0
+        self.saves = 0
+        self._apply(*self._read_file(), initial=True)
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        callback(settings) runs after the file was edited by hand and reloaded,
+        in the thread that noticed (saves through set/patch are not reported here)
+        """
+        self._listeners.append(callback)
+
+    # -- reads -------------------------------------------------------------
+
+    def get(self) -> Dict[str, Any]:
+        """A copy of the full document (including _lastUpdated)"""
+        self._check_on_read()
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def response(self) -> CachedResponse:
+        """Serialized public document with its validators"""
+        self._check_on_read()
+        return self._response
+
+    def changes_since(self, since: int) -> Optional[Dict[str, Any]]:
+        """
+        Public keys changed after revision since, mapped to their new values
+        (None if removed). None if that revision is unknown (too old, or from
+        before a restart that lost history) and the full document is needed.
+        """
+        self._check_on_read()
+        with self._lock:
+            if since == self.revision:
+                return {}
+            if since > self.revision or not self._history or self._history[0][0] > since + 1:
+                return None
+            keys = set()
+            for revision, changed in self._history:
+                if revision > since:
+                    keys |= changed
+            return {key: copy.deepcopy(self._data.get(key)) for key in keys if key not in PRIVATE_KEYS}
+
+    # -- writes ------------------------------------------------------------
+
+    def set(self, settings: Dict[str, Any]) -> int:
+        """Replace the document now (the file is written shortly after); returns the new revision"""
+        with self._lock:
+            settings = copy.deepcopy(settings)
+            self._record(changed_keys(self._data, settings), settings)
+            self._data = settings
+            self._rebuild(time.time())
+            self._dirty = True
+            self.saves += 1
+            # One write per window no matter how many saves arrive in it
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return self.revision
+
+    def patch(self, patch: Any, content_type: Optional[str] = None,
+              metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Apply a merge patch (RFC 7386, default) or, for application/json-patch+json,
+        a JSON Patch (RFC 6902) atomically; returns the new revision.
+        Raises PatchError if the patch is invalid.
+        """
+        with self._lock:
+            if content_type and content_type.split(';')[0].strip() == JSON_PATCH_TYPE:
+                settings = apply_json_patch(self._data, patch)
+            else:
+                if not isinstance(patch, dict):
+                    raise PatchError("Merge patch must be a JSON object")
+                settings = merge_patch(self._data, patch)
+            if not isinstance(settings, dict):
+                raise PatchError("Settings must remain a JSON object")
+            settings.update(metadata or {})
+            return self.set(settings)
+
+    def _record(self, keys, settings: Dict[str, Any]) -> None:
+        """Bump the revision for a change of keys (stored in the document as _revision)"""
+        self.revision += 1
+        self._history.append((self.revision, frozenset(keys)))
+        settings['_revision'] = self.revision
+
+    def flush(self) -> None:
+        """Write pending changes to disk now"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                # Documents are replaced, never mutated, so the reference is a stable snapshot
+                document, revision = self._data, self.revision
+            data = json.dumps(document, indent=2).encode()
+            try:
+                atomic_write(self.path, data)
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                logger.error(f"❌ Failed to write {self.path}: {e}")
+                return  # Still dirty; retried on the next save or flush
+            with self._lock:
+                self._file_mtime = mtime
+                # A save during the write keeps the store dirty (its timer writes it next)
+                self._dirty = self.revision != revision
+                self.writes += 1
+        logger.info(f"💾 Settings written to {self.path} ({len(data)} bytes)")
+
+    # -- file --------------------------------------------------------------
+
+    def _rebuild(self, last_modified: float) -> None:
+        public = {k: v for k, v in self._data.items() if k not in PRIVATE_KEYS}
+        self._response = CachedResponse(
+            body=json.dumps(public).encode(),
+            content_type='application/json',
+            last_modified=last_modified
+        )
+
+    def _read_file(self) -> Tuple[Optional[float], Optional[Dict[str, Any]]]:
+        """(mtime, document) from disk, without the lock; (None, None) if missing, document None if invalid"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return None, None
+        try:
+            with open(self.path, 'rb') as f:
+                data = json.loads(f.read() or b'{}')
+        except (OSError, ValueError) as e:
+            # Half-written or hand-edited with a typo: keep serving the last good version
+            logger.error(f"❌ Invalid settings file {self.path}: {e}")
+            return mtime, None
+        if not isinstance(data, dict):
+            logger.error(f"❌ Settings file {self.path} does not contain a JSON object")
+            return mtime, None
+        return mtime, data
+
+    def _apply(self, mtime: Optional[float], data: Optional[Dict[str, Any]], initial: bool = False) -> bool:
+        """Adopt a document read from the file; returns True if it replaced the current one"""
+        with self._lock:
+            if mtime is None:
+                self._file_mtime = None
+                return False  # No file yet: keep the current document
+            if data is None:
+                self._file_mtime = mtime
+                return False
+            if initial:
+                self.revision = int(data.get('_revision') or 0)
+            else:
+                # Edited by hand: a new revision, even if _revision was left as it was
+                self._record(changed_keys(self._data, data), data)
+                self.revision = max(self.revision, int(data.get('_revision') or 0))
+                data['_revision'] = self.revision
+            self._data = data
+            self._file_mtime = mtime
+            self._rebuild(mtime)
+            self.loads += 1
+            return True
+
+    def check(self) -> bool:
+        """Reload now if the file was changed by someone else; True if it was (for watchers)"""
+        return self._check_external(force=True)
+
+    def _check_on_read(self) -> None:
+        if self.check_on_read:
+            self._check_external()
+
+    def _check_external(self, force: bool = False) -> bool:
+        """Reload if the file was changed by someone else (at most every check_interval)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        with self._lock:
+            if mtime == self._file_mtime or self._dirty:
+                return False  # Unchanged, or our own pending write wins
+        logger.info(f"📝 {self.path} changed on disk, reloading")
+        mtime, data = self._read_file()
+        with self._lock:
+            if self._dirty or mtime == self._file_mtime:
+                return False  # Saved (or written by us) while the file was being read
+            if not self._apply(mtime, data):
+                return False
+            settings = copy.deepcopy(self._data)
+        for callback in self._listeners:
+            try:
+                callback(settings)
+            except Exception as e:
+                logger.error(f"❌ Settings listener failed: {e}")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "revision": self.revision,
+                "keys": len(self._data),
+                "bytes": len(self._response.body),
+                "saves": self.saves,
+                "writes": self.writes,
+                "loads": self.loads,
+                "pending": self._dirty,
+            }
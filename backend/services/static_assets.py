@@ -0,0 +1,274 @@
+"""
+In-memory static asset table for the dashboard files
+Bodies, gzip/brotli variants and content-hash ETags are computed once per file
+version. HTML pages are rewritten to reference hashed asset URLs
+(js/app.<hash>.js) that can be cached as immutable; files are re-stat'ed at
+most every STATIC_CHECK_INTERVAL seconds and rebuilt when they change.
+Standard library only (brotli is optional) so the legacy server.py can share it.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .disk_cache import CACHE_DIR, RESPONSE_CACHE_FILE
+from .http_cache import etag_matches, http_date
+from .image_cache import BACKGROUND_CACHE_DIR
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+STATIC_MAX_ASSET_BYTES = int(os.environ.get('STATIC_MAX_ASSET_BYTES', str(2 * 1024 * 1024)))
+STATIC_CHECK_INTERVAL = float(os.environ.get('STATIC_CHECK_INTERVAL', '2'))
+
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml',
+                      'application/manifest+json')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PREWARM_DIRS = ('css', 'js')
+# Never served even when they live under root: caches hold Home Assistant states and feeds
+PRIVATE_DIRS = (CACHE_DIR, BACKGROUND_CACHE_DIR, os.path.dirname(RESPONSE_CACHE_FILE))
+PRIVATE_SUFFIXES = ('.sqlite3', '.sqlite3-wal', '.sqlite3-shm', '.sqlite3-journal')
+
+HASH_LENGTH = 10
+_HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.\w+)$' % HASH_LENGTH)
+# src="js/app.js" / href="css/style.css" in HTML pages (relative URLs only)
+_REFERENCE = re.compile(r'''((?:src|href)=["'])(?![a-z]+:|/)([^"'#?]+\.(?:js|css))(["'])''')
+
+
+def content_type_for(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type.endswith(('javascript', 'json')):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def hashed_name(rel: str, digest: str) -> str:
+    """js/app.js -> js/app.<hash>.js"""
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+class StaticAsset:
+    """One file version with its precomputed encodings"""
+
+    __slots__ = ('rel', 'content_type', 'mtime', 'size', 'checked_at', 'digest', 'variants', 'deps')
+
+    def __init__(self, rel: str, body: bytes, content_type: str, mtime: float, size: int,
+                 deps: Tuple[Tuple[str, str], ...] = ()):
+        self.rel = rel
+        self.content_type = content_type
+        self.mtime = mtime
+        self.size = size
+        self.checked_at = time.monotonic()
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.deps = deps  # (rel, digest) of assets referenced by a rewritten HTML page
+        self.variants: Dict[str, bytes] = {'identity': body}
+        if len(body) >= COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            self.variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=11)
+
+    @property
+    def url(self) -> str:
+        """Hashed, immutable URL of this version"""
+        return hashed_name(self.rel, self.digest)
+
+    def etag(self, encoding: str) -> str:
+        tag = self.digest[:32]
+        return f'"{tag}"' if encoding == 'identity' else f'"{tag}-{encoding}"'
+
+    def select(self, accept_encoding: Optional[str]) -> str:
+        """Best encoding the client accepts (br, then gzip, then identity)"""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and encoding in accepted:
+                return encoding
+        return 'identity'
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str],
+                 immutable: bool) -> Tuple[int, Dict[str, str], bytes]:
+        """(status, headers, body) for a GET of this asset"""
+        encoding = self.select(accept_encoding)
+        etag = self.etag(encoding)
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(self.mtime),
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL if immutable else 'no-cache',
+        }
+        if len(self.variants) > 1:
+            headers['Vary'] = 'Accept-Encoding'
+        if etag_matches(if_none_match, etag):
+            return 304, headers, b''
+        body = self.variants[encoding]
+        headers['Content-Type'] = self.content_type
+        headers['Content-Length'] = str(len(body))
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return 200, headers, body
+
+
+def _accepted_encodings(header: Optional[str]) -> set:
+    """Encodings in an Accept-Encoding header, minus those refused with q=0"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            q = float(params.strip()[2:]) if params.strip().startswith('q=') else 1.0
+        except ValueError:
+            q = 1.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+class AssetTable:
+    """Static files under root, loaded lazily (or prewarmed) and kept current"""
+
+    def __init__(self, root: str = '.'):
+        self.root = os.path.realpath(root)
+        self._private = tuple(os.path.realpath(d) for d in PRIVATE_DIRS if d)
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def prewarm(self) -> int:
+        """Load HTML pages and css/js so first requests are served from memory"""
+        paths: List[str] = [name for name in os.listdir(self.root) if name.endswith('.html')]
+        for directory in PREWARM_DIRS:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, directory)):
+                for name in filenames:
+                    paths.append(os.path.relpath(os.path.join(dirpath, name), self.root))
+        for rel in paths:
+            self.get(rel.replace(os.sep, '/'))
+        return len(self._assets)
+
+    def resolve(self, url_path: str) -> Optional[Tuple[str, bool]]:
+        """
+        Map a request path to (relative file path, immutable).
+        Hashed names resolve to the underlying file; they are immutable only
+        if the hash is the file's current one. None if outside root or missing.
+        """
+        rel = unquote(url_path.split('?', 1)[0]).lstrip('/')
+        full = self._full(rel)
+        if full is None:
+            return None
+        if not rel or os.path.isdir(full):
+            rel = 'index.html'
+            full = self._full(rel)
+        if os.path.isfile(full):
+            return rel, False
+
+        match = _HASHED_NAME.match(rel)
+        if match is None:
+            return None
+        original = match.group('stem') + match.group('ext')
+        full = self._full(original)
+        if full is None or not os.path.isfile(full):
+            return None
+        asset = self.get(original)
+        return original, asset is not None and asset.digest.startswith(match.group('hash'))
+
+    def file_path(self, rel: str) -> Optional[str]:
+        """Absolute path of rel inside root"""
+        return self._full(rel)
+
+    def _full(self, rel: str) -> Optional[str]:
+        full = os.path.realpath(os.path.join(self.root, rel))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None  # Directory traversal
+        if self._is_private(full):
+            return None
+        return full
+
+    def _is_private(self, full: str) -> bool:
+        """Dotfiles and dot-directories (.git, .env), cache directories and SQLite files"""
+        if full == self.root:
+            return False
+        if any(part.startswith('.') for part in os.path.relpath(full, self.root).split(os.sep)):
+            return True
+        if full.endswith(PRIVATE_SUFFIXES):
+            return True
+        return any(full == d or full.startswith(d + os.sep) for d in self._private)
+
+    def get(self, rel: str) -> Optional[StaticAsset]:
+        """Current version of rel; None if missing or too large to hold in memory"""
+        asset = self._assets.get(rel)
+        now = time.monotonic()
+        if asset is not None and now - asset.checked_at < STATIC_CHECK_INTERVAL:
+            return asset
+
+        full = self._full(rel)
+        try:
+            st = os.stat(full) if full else None
+        except OSError:
+            st = None
+        if st is None or st.st_size > STATIC_MAX_ASSET_BYTES:
+            with self._lock:
+                self._assets.pop(rel, None)
+            return None
+
+        if asset is not None and asset.mtime == st.st_mtime and asset.size == st.st_size \
+                and self._deps_current(asset):
+            asset.checked_at = now
+            return asset
+        return self._build(rel, full, st)
+
+    def _deps_current(self, asset: StaticAsset) -> bool:
+        for rel, digest in asset.deps:
+            dep = self.get(rel)
+            if dep is None or dep.digest != digest:
+                return False
+        return True
+
+    def _build(self, rel: str, full: str, st: os.stat_result) -> StaticAsset:
+        with open(full, 'rb') as f:
+            body = f.read()
+        content_type = content_type_for(rel)
+        deps: Tuple[Tuple[str, str], ...] = ()
+        if rel.endswith('.html'):
+            body, deps = self._rewrite_html(rel, body)
+        asset = StaticAsset(rel, body, content_type, st.st_mtime, st.st_size, deps)
+        with self._lock:
+            self._assets[rel] = asset
+            self.builds += 1
+        return asset
+
+    def _rewrite_html(self, rel: str, body: bytes) -> Tuple[bytes, Tuple[Tuple[str, str], ...]]:
+        """Point script/stylesheet references at hashed URLs"""
+        base = os.path.dirname(rel)
+        deps: List[Tuple[str, str]] = []
+
+        def replace(match: 're.Match') -> str:
+            ref = match.group(2)
+            target = os.path.normpath(os.path.join(base, ref)).replace(os.sep, '/')
+            asset = self.get(target)
+            if asset is None:
+                return match.group(0)
+            deps.append((target, asset.digest))
+            return match.group(1) + hashed_name(ref, asset.digest) + match.group(3)
+
+        text = _REFERENCE.sub(replace, body.decode('utf-8', errors='surrogateescape'))
+        return text.encode('utf-8', errors='surrogateescape'), tuple(deps)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            assets = list(self._assets.values())
+        return {
+            "assets": len(assets),
+            "bytes": sum(len(a.variants['identity']) for a in assets),
+            "gzip_bytes": sum(len(a.variants['gzip']) for a in assets if 'gzip' in a.variants),
+            "brotli": brotli is not None,
+            "builds": self.builds,
+        }
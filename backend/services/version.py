@@ -0,0 +1,112 @@
+"""
+Dashboard code version
+Computed once at startup and kept current by a single background watcher
+(thread for server.py, asyncio task for FastAPI), so /api/version is a memory
+read. Listeners are called when the version changes.
+Standard library only so the legacy server.py can share it.
+"""
+
+import asyncio
+import glob
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHECK_INTERVAL = float(os.environ.get('VERSION_CHECK_INTERVAL', '10'))
+WATCH_PATTERNS = ('js/**/*.js', 'css/**/*.css', '*.html')
+
+
+class VersionWatcher:
+    """Content version of the dashboard files, refreshed in the background"""
+
+    def __init__(self, key_files: Sequence[str], patterns: Sequence[str] = WATCH_PATTERNS,
+                 interval: float = VERSION_CHECK_INTERVAL):
+        self.key_files = list(key_files)
+        self.patterns = list(patterns)
+        self.interval = interval
+        self.version: Optional[str] = None
+        self.changed_at = time.time()
+        self.checks = 0
+        self._listeners: List[Callable[[str], None]] = []
+        self._stop = threading.Event()
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """callback(version) runs in the watcher thread/task after each change"""
+        self._listeners.append(callback)
+
+    def compute(self) -> str:
+        """Hash of the modification times of every watched file"""
+        files = set(self.key_files)
+        for pattern in self.patterns:
+            files.update(glob.glob(pattern, recursive=True))
+        parts = []
+        for file_path in sorted(files):
+            try:
+                parts.append(f"{file_path}:{os.path.getmtime(file_path)}")
+            except OSError:
+                continue  # Deleted between glob and stat
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()[:12]
+
+    def check(self, version: Optional[str] = None) -> bool:
+        """Recompute (or take version); returns True and notifies listeners if it changed"""
+        if version is None:
+            version = self.compute()
+        self.checks += 1
+        if version == self.version:
+            return False
+        previous, self.version = self.version, version
+        self.changed_at = time.time()
+        if previous is None:
+            return False
+        logger.info(f"🔄 Version changed: {previous} -> {version}")
+        for callback in self._listeners:
+            try:
+                callback(version)
+            except Exception as e:
+                logger.error(f"❌ Version listener failed: {e}")
+        return True
+
+    def snapshot(self) -> Dict[str, str]:
+        """What /api/version returns"""
+        if self.version is None:
+            self.check()
+        return {
+            "version": self.version,
+            "timestamp": datetime.fromtimestamp(self.changed_at).isoformat()
+        }
+
+    # -- threads (server.py) -----------------------------------------------
+
+    def start_thread(self) -> threading.Thread:
+        self.check()
+        thread = threading.Thread(target=self._run_thread, name='version-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def _run_thread(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"❌ Version check failed: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # -- asyncio (FastAPI) -------------------------------------------------
+
+    async def run(self) -> None:
+        """Watch loop for the app lifespan; file I/O runs off the event loop,
+        listeners run on it (so they may publish to asyncio queues)"""
+        while True:
+            try:
+                self.check(await asyncio.to_thread(self.compute))
+            except Exception as e:
+                logger.error(f"❌ Version check failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -7,6 +7,35 @@ class SettingsAPI {
   constructor() {
     this.baseUrl = '';
     this.apiUrl = '/api/settings';
+    this.etag = null; // ETag of the last settings response (for conditional polling)
+    this.revision = null; // Settings revision we have (for ?since= change fetches)
+  }
+
+  /**
+   * RFC 7386 merge patch that turns `before` into `after` (null = remove).
+   * Arrays and scalars are replaced whole.
+   */
+  static diff(before, after) {
+    const patch = {};
+    const isObject = (v) => v !== null && typeof v === 'object' && !Array.isArray(v);
+    Object.keys(before || {}).forEach(key => {
+      if (!(key in after)) patch[key] = null;
+    });
+    Object.entries(after || {}).forEach(([key, value]) => {
+      const old = before ? before[key] : undefined;
+      if (isObject(value) && isObject(old)) {
+        const nested = SettingsAPI.diff(old, value);
+        if (Object.keys(nested).length > 0) patch[key] = nested;
+      } else if (JSON.stringify(value) !== JSON.stringify(old)) {
+        patch[key] = value;
+      }
+    });
+    return patch;
+  }
+
+  rememberRevision(response) {
+    const revision = response.headers.get('X-Settings-Revision');
+    if (revision !== null) this.revision = parseInt(revision, 10);
   }
 
   /**
@@ -40,6 +69,7 @@ class SettingsAPI {
         }
         throw new Error(`HTTP ${response.status}`);
       }
+      this.rememberRevision(response);
       const settings = await response.json();
       // Remove metadata fields
       delete settings._lastUpdated;
@@ -59,6 +89,95 @@ class SettingsAPI {
     }
   }
 
+  /**
+   * Fetch settings only if they changed since the last fetch.
+   * Returns null when the server answers 304 Not Modified.
+   */
+  async fetchIfChanged() {
+    try {
+      const headers = {};
+      if (this.etag) headers['If-None-Match'] = this.etag;
+      const response = await fetch(this.apiUrl, {
+        headers,
+        cache: 'no-store', // Let the 304 reach us instead of the browser cache
+        signal: AbortSignal.timeout(10000)
+      });
+      if (response.status === 304) {
+        return null;
+      }
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      this.etag = response.headers.get('ETag');
+      this.rememberRevision(response);
+      const settings = await response.json();
+      delete settings._lastUpdated;
+      return settings;
+    } catch (error) {
+      if (window.DEBUG_MODE === true) {
+        console.error('Failed to poll settings from server:', error);
+      }
+      return null;
+    }
+  }
+
+  /**
+   * Keys changed since the revision we have.
+   * Returns null if nothing changed, else {revision, changes} (changed keys,
+   * null = removed) or {revision, settings} when we are too far behind.
+   */
+  async fetchChanges() {
+    try {
+      const response = await fetch(`${this.apiUrl}?since=${this.revision}`, {
+        cache: 'no-store',
+        signal: AbortSignal.timeout(10000)
+      });
+      if (response.status === 304) {
+        return null;
+      }
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const result = await response.json();
+      this.revision = result.revision;
+      return result;
+    } catch (error) {
+      if (window.DEBUG_MODE === true) {
+        console.error('Failed to fetch settings changes from server:', error);
+      }
+      return null;
+    }
+  }
+
+  /**
+   * Send only what changed (RFC 7386 merge patch).
+   * Returns true/false, or null if the server does not support PATCH.
+   */
+  async patch(patch) {
+    try {
+      const response = await fetch(this.apiUrl, {
+        method: 'PATCH',
+        headers: {
+          'Content-Type': 'application/merge-patch+json'
+        },
+        body: JSON.stringify(patch)
+      });
+      if (response.status === 404 || response.status === 405 || response.status === 501) {
+        return null;
+      }
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const result = await response.json();
+      return result.success === true;
+    } catch (error) {
+      if (window.DEBUG_MODE === true) {
+        console.error('Failed to patch settings on server:', error);
+      }
+      return false;
+    }
+  }
+
   /**
    * Save settings to server
    */
@@ -34,7 +34,10 @@ class DashboardApp {
     
     // Initialize Home Assistant
     if (this.config.homeAssistant?.url && this.config.homeAssistant?.accessToken) {
-      this.haClient = new HomeAssistantClient(this.config.homeAssistant);
+      this.haClient = new HomeAssistantClient({
+        ...this.config.homeAssistant,
+        entities: this.getDashboardEntities()
+      });
       await this.haClient.init();
       window.app = this; // Make available to widgets
     }
@@ -63,7 +66,8 @@ class DashboardApp {
     });
     
     // Poll for server config changes every 30 seconds
-    if (typeof window.settingsAPI !== 'undefined') {
+    // (with a settings revision, polling asks for changes and needs no baseline copy)
+    if (typeof window.settingsAPI !== 'undefined' && window.settingsAPI.revision === null) {
       try {
         const initialConfig = await window.settingsAPI.fetch();
         if (initialConfig && Object.keys(initialConfig).length > 0) {
@@ -76,41 +80,135 @@ class DashboardApp {
     
     this.checkServerVersion();
     
-    // Use stored interval IDs so we can clear them on unload (avoid leaks)
-    this._configPollId = setInterval(async () => {
-      if (typeof window.settingsAPI !== 'undefined') {
-        try {
-          const serverConfig = await window.settingsAPI.fetch();
-          if (serverConfig && Object.keys(serverConfig).length > 0) {
-            const newConfigHash = JSON.stringify(serverConfig);
-            if (this.lastServerConfigHash !== null && this.lastServerConfigHash !== newConfigHash) {
-              location.reload();
-            }
-            this.lastServerConfigHash = newConfigHash;
-          }
-        } catch (e) {}
-      }
-    }, 30000);
+    this.startPolling();
     
-    this._versionPollId = setInterval(() => this.checkServerVersion(), 30000);
+    // Server push replaces polling while the stream is connected (FastAPI backend)
+    this.connectEventStream();
     
     // Clear intervals when page is hidden/unloaded to avoid leaks on long-running tabs
     const clearAppIntervals = () => {
-      if (this._configPollId) { clearInterval(this._configPollId); this._configPollId = null; }
-      if (this._versionPollId) { clearInterval(this._versionPollId); this._versionPollId = null; }
+      this.stopPolling();
+      if (this._eventSource) { this._eventSource.close(); this._eventSource = null; }
     };
     window.addEventListener('beforeunload', clearAppIntervals);
     window.addEventListener('pagehide', clearAppIntervals);
   }
 
+  async checkServerConfig() {
+    if (typeof window.settingsAPI === 'undefined') return;
+    if (window.settingsAPI.revision !== null) {
+      // Server keeps revisions: fetch only the changed keys and apply them in place
+      const result = await window.settingsAPI.fetchChanges();
+      if (result) this.applySettingsChanges(result);
+      return;
+    }
+    try {
+      // Conditional GET: null means unchanged (304), so no parse/stringify work
+      const serverConfig = await window.settingsAPI.fetchIfChanged();
+      if (serverConfig && Object.keys(serverConfig).length > 0) {
+        const newConfigHash = JSON.stringify(serverConfig);
+        if (this.lastServerConfigHash !== null && this.lastServerConfigHash !== newConfigHash) {
+          location.reload();
+        }
+        this.lastServerConfigHash = newConfigHash;
+      }
+    } catch (e) {}
+  }
+
+  /**
+   * Settings keys the dashboard can apply without reloading the page
+   */
+  get liveSettingHandlers() {
+    const updateWidgets = (...types) => this.widgets
+      .filter(w => types.includes(w.type))
+      .forEach(w => w.update());
+    return {
+      // Only used by the control panel
+      countdowns: () => {},
+      dadJoke: () => {},
+      display: () => updateWidgets('todays-events'),
+      googleCalendar: (value) => {
+        if (!this.calendarClient) return false;
+        this.calendarClient.config = new GoogleCalendarClient(value).config;
+        updateWidgets('calendar', 'todays-events');
+      }
+    };
+  }
+
+  applySettingsChanges(result) {
+    const changes = result.changes;
+    const handlers = this.liveSettingHandlers;
+    // Too far behind, removed keys (defaults would need re-merging) or keys read once at startup
+    if (!changes || Object.entries(changes).some(([key, value]) => value === null || !handlers[key])) {
+      location.reload();
+      return;
+    }
+    Object.entries(changes).forEach(([key, value]) => {
+      this.config[key] = value;
+      if (handlers[key](value) === false) {
+        location.reload();
+      }
+    });
+    console.log(`⚙️ Applied settings revision ${result.revision}: ${Object.keys(changes).join(', ')}`);
+  }
+
+  startPolling() {
+    // Use stored interval IDs so we can clear them on unload (avoid leaks)
+    if (!this._configPollId) {
+      this._configPollId = setInterval(() => this.checkServerConfig(), 30000);
+    }
+    if (!this._versionPollId) {
+      this._versionPollId = setInterval(() => this.checkServerVersion(), 30000);
+    }
+  }
+
+  stopPolling() {
+    if (this._configPollId) { clearInterval(this._configPollId); this._configPollId = null; }
+    if (this._versionPollId) { clearInterval(this._versionPollId); this._versionPollId = null; }
+  }
+
+  connectEventStream() {
+    if (typeof EventSource === 'undefined') return;
+    const source = new EventSource('/api/stream');
+    this._eventSource = source;
+    let connectedBefore = false;
+    
+    source.addEventListener('hello', () => {
+      this.stopPolling();
+      if (connectedBefore) {
+        // Catch up on anything pushed while we were disconnected
+        this.checkServerConfig();
+        this.checkServerVersion();
+      }
+      connectedBefore = true;
+    });
+    source.addEventListener('settings-changed', () => this.checkServerConfig());
+    source.addEventListener('version-changed', () => this.checkServerVersion());
+    source.addEventListener('calendar-updated', () => {
+      this.widgets
+        .filter(w => w.type === 'calendar' || w.type === 'todays-events')
+        .forEach(w => w.update());
+    });
+    source.onerror = () => {
+      // Reconnecting (or no stream endpoint, e.g. legacy server.py): fall back to polling
+      this.startPolling();
+      if (source.readyState === EventSource.CLOSED) {
+        this._eventSource = null;
+      }
+    };
+  }
+
   async checkServerVersion() {
     // Check for server version changes and reload if updated
     try {
-      const response = await fetch('/api/version');
-      if (!response.ok) {
-        return; // Silently fail if endpoint doesn't exist or error
+      let data = await window.bootstrapSection?.('version');
+      if (!data) {
+        const response = await fetch('/api/version');
+        if (!response.ok) {
+          return; // Silently fail if endpoint doesn't exist or error
+        }
+        data = await response.json();
       }
-      const data = await response.json();
       const currentVersion = data.version;
       
       if (this.lastServerVersion === null) {
@@ -131,6 +229,17 @@ class DashboardApp {
     }
   }
 
+  /**
+   * Home Assistant entities shown on this dashboard (widget defaults included),
+   * so the hub only streams updates we render
+   */
+  getDashboardEntities() {
+    const entities = (this.config.homeAssistant?.entities || []).map(e => e.entityId || e);
+    entities.push(...(this.config.weather?.weatherEntity ? [this.config.weather.weatherEntity] : ['weather.home', 'weather.kbil']));
+    entities.push(this.config.spotify?.mediaPlayerEntity || 'media_player.spotify');
+    return [...new Set(entities.filter(Boolean))];
+  }
+
   createWidgets(layout) {
     if (!layout || !layout.widgets) {
       console.warn('No layout configuration found');
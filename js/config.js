@@ -127,7 +127,10 @@ async function loadConfigFromServer() {
   // Try server first (server is source of truth)
   if (typeof window !== 'undefined' && window.settingsAPI) {
     try {
-      const serverConfig = await window.settingsAPI.fetch();
+      // The bootstrap request carries settings (and their revision) with the rest of first paint
+      const boot = await window.bootstrapSection?.('settings');
+      if (boot) window.settingsAPI.revision = boot.revision;
+      const serverConfig = boot ? boot.settings : await window.settingsAPI.fetch();
       if (serverConfig && Object.keys(serverConfig).length > 0) {
         // Deep merge server config into CONFIG
         deepMerge(CONFIG, serverConfig);
@@ -37,9 +37,26 @@ class GoogleCalendarClient {
       }
     }
 
-    // 2) Fetch from ICS feeds (embed links, secret iCal, or public ICS)
+    // 2) ICS feeds the backend already parsed for the bootstrap request (first load only)
+    const loaded = new Set();
+    const boot = await window.bootstrapSection?.('calendar');
+    if (boot) {
+      boot.feeds.filter(f => f.ok).forEach(f => loaded.add(f.name));
+      allEvents.push(...boot.events.filter(e => loaded.has(e.feed)).map(e => ({
+        id: e.id,
+        title: e.title,
+        start: new Date(e.start),
+        end: new Date(e.end),
+        isAllDay: e.isAllDay,
+        location: e.location,
+        color: e.color
+      })));
+    }
+
+    // 3) Fetch from ICS feeds (embed links, secret iCal, or public ICS)
     for (const feed of this.config.icsFeeds) {
       if (!feed.url || !feed.url.trim()) continue;
+      if (loaded.has(feed.name || feed.url.trim())) continue;
       try {
         const events = await this.fetchIcsFeed(feed, startRange, endRange);
         allEvents.push(...events);
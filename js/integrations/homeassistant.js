@@ -1,6 +1,8 @@
 /**
  * Home Assistant Integration
- * WebSocket connection to Home Assistant
+ * Prefers the backend hub (/api/homeassistant/stream), which shares one
+ * upstream connection between all displays; falls back to a direct
+ * WebSocket connection to Home Assistant.
  */
 
 class HomeAssistantClient {
@@ -8,9 +10,12 @@ class HomeAssistantClient {
     this.config = {
       url: config.url || '',
       accessToken: config.accessToken || '',
-      refreshInterval: config.refreshInterval || 30000
+      refreshInterval: config.refreshInterval || 30000,
+      entities: config.entities || []
     };
     this.ws = null;
+    this.hubSource = null;
+    this.useHub = typeof EventSource !== 'undefined';
     this.isConnected = false;
     this.entityStates = new Map();
     this.messageId = 1;
@@ -27,13 +32,84 @@ class HomeAssistantClient {
       return;
     }
 
+    // States from the bootstrap request let widgets render before the stream connects
+    const boot = await window.bootstrapSection?.('homeassistant');
+    if (boot) {
+      Object.entries(boot.states).forEach(([entityId, state]) => this.entityStates.set(entityId, state));
+    }
+
     await this.connect();
   }
 
   /**
-   * Connect to Home Assistant WebSocket
+   * Connect through the backend hub, or directly if it is unavailable
    */
   async connect() {
+    if (this.useHub && await this.connectHub()) {
+      return;
+    }
+    this.connectDirect();
+  }
+
+  /**
+   * Subscribe to the backend hub stream (only the entities this display uses)
+   * Resolves false if the backend has no hub (e.g. legacy server.py)
+   */
+  connectHub() {
+    return new Promise((resolve) => {
+      const entities = this.config.entities.map(e => e.entityId || e).filter(Boolean);
+      const query = entities.length ? `?entities=${encodeURIComponent(entities.join(','))}` : '';
+      const source = new EventSource(`/api/homeassistant/stream${query}`);
+      let opened = false;
+
+      source.addEventListener('snapshot', (event) => {
+        const { connected, states } = JSON.parse(event.data);
+        if (!opened) {
+          opened = true;
+          console.log('✓ Home Assistant hub stream connected');
+          resolve(true);
+        }
+        this.isConnected = connected;
+        Object.entries(states).forEach(([entityId, state]) => {
+          this.entityStates.set(entityId, state);
+          this.notifyListeners(entityId, state);
+        });
+      });
+
+      source.addEventListener('state', (event) => {
+        this.isConnected = true;
+        Object.entries(JSON.parse(event.data)).forEach(([entityId, state]) => {
+          if (state) {
+            this.entityStates.set(entityId, state);
+            this.notifyListeners(entityId, state);
+          } else {
+            this.entityStates.delete(entityId);
+          }
+        });
+      });
+
+      source.onerror = () => {
+        if (!opened) {
+          // No hub on this backend: use a direct connection from now on
+          source.close();
+          this.hubSource = null;
+          this.useHub = false;
+          console.warn('Home Assistant hub unavailable, connecting directly');
+          resolve(false);
+        } else {
+          // EventSource reconnects by itself; the next snapshot resyncs
+          this.isConnected = false;
+        }
+      };
+
+      this.hubSource = source;
+    });
+  }
+
+  /**
+   * Connect to Home Assistant WebSocket
+   */
+  connectDirect() {
     try {
       const wsUrl = this.config.url.replace(/^http/, 'ws') + '/api/websocket';
       this.ws = new WebSocket(wsUrl);
@@ -168,7 +244,7 @@ class HomeAssistantClient {
     }
     this.reconnectTimeout = setTimeout(() => {
       console.log('Attempting to reconnect to Home Assistant...');
-      this.connect();
+      this.connectDirect();
     }, 5000);
   }
 
@@ -183,6 +259,10 @@ class HomeAssistantClient {
       this.ws.close();
       this.ws = null;
     }
+    if (this.hubSource) {
+      this.hubSource.close();
+      this.hubSource = null;
+    }
     this.isConnected = false;
   }
 }
@@ -40,16 +40,16 @@ class UnsplashSlideshow {
       `${this.config.transitionDuration}ms`
     );
 
-    // Check for API key
-    if (!this.config.accessKey || this.config.accessKey === 'YOUR_UNSPLASH_ACCESS_KEY') {
-      console.warn('UnsplashSlideshow: No API key provided, using fallback backgrounds');
-      this.useFallbackBackgrounds();
-      return;
-    }
-
     try {
-      // Fetch initial batch of photos
-      await this.fetchPhotos();
+      // Fetch initial batch of photos (the backend may hold the API key)
+      if (!(await this.fetchProxiedPhotos())) {
+        if (!this.config.accessKey || this.config.accessKey === 'YOUR_UNSPLASH_ACCESS_KEY') {
+          console.warn('UnsplashSlideshow: No API key provided, using fallback backgrounds');
+          this.useFallbackBackgrounds();
+          return;
+        }
+        await this.fetchDirectPhotos();
+      }
       
       if (this.photos.length > 0) {
         // Show first photo immediately
@@ -68,9 +68,17 @@ class UnsplashSlideshow {
   }
 
   /**
-   * Fetch photos from Unsplash API
+   * Fetch photos, through the backend when it is available
    */
   async fetchPhotos() {
+    if (await this.fetchProxiedPhotos()) return;
+    await this.fetchDirectPhotos();
+  }
+
+  /**
+   * Fetch photos from Unsplash API
+   */
+  async fetchDirectPhotos() {
     let url;
     
     if (this.config.collectionId) {
@@ -106,6 +114,29 @@ class UnsplashSlideshow {
     console.log(`UnsplashSlideshow: Loaded ${this.photos.length} photos`);
   }
 
+  /**
+   * Fetch photos through the backend image proxy (resized for this screen,
+   * cached on disk). Returns false when the backend can't serve them.
+   */
+  async fetchProxiedPhotos() {
+    const ratio = window.devicePixelRatio || 1;
+    const width = Math.round(window.screen.width * ratio);
+    const height = Math.round(window.screen.height * ratio);
+    try {
+      const response = await fetch(`/api/backgrounds?width=${width}&height=${height}`);
+      if (!response.ok) return false;
+      const data = await response.json();
+      if (!data.photos || data.photos.length === 0) return false;
+      // Already shuffled on the server, in the order it prefetches them
+      this.photos = data.photos;
+      console.log(`UnsplashSlideshow: Loaded ${this.photos.length} photos (${data.width}x${data.height})`);
+      return true;
+    } catch (error) {
+      // Static server without the backend: fall back to the Unsplash API
+      return false;
+    }
+  }
+
   /**
    * Show a specific photo
    */
@@ -173,7 +204,7 @@ class UnsplashSlideshow {
     const nextIndex = (this.currentIndex + 1) % this.photos.length;
     
     // If we're near the end, fetch more photos
-    if (nextIndex === 0 && this.config.accessKey) {
+    if (nextIndex === 0) {
       try {
         await this.fetchPhotos();
       } catch (error) {
@@ -75,3 +75,91 @@ window.lazyLoadImage = (img, src) => {
   }
 };
 
+
+// First-paint data from one /api/bootstrap request, streamed as NDJSON.
+// bootstrapSection(name) resolves as soon as that section's line arrives, and
+// only once per section: later refreshes fetch live. Resolves null for a failed
+// section or when the backend has no bootstrap endpoint (e.g. server.py).
+(() => {
+  const sections = new Map();
+  let started = null;
+  let finished = false;
+
+  const entry = (name) => {
+    if (!sections.has(name)) {
+      const section = { taken: false };
+      section.promise = new Promise(resolve => { section.resolve = resolve; });
+      if (finished) section.resolve(null);
+      sections.set(name, section);
+    }
+    return sections.get(name);
+  };
+
+  const load = async () => {
+    try {
+      const response = await fetch('/api/bootstrap?stream=1', {
+        headers: { 'Accept': 'application/x-ndjson' },
+        signal: AbortSignal.timeout(15000)
+      });
+      if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          if (!line) continue;
+          const result = JSON.parse(line);
+          if (result.error) window.log.debug(`Bootstrap ${result.section}:`, result.error);
+          entry(result.section).resolve(result.error ? null : result.data);
+        }
+      }
+    } catch (e) {
+      // No bootstrap endpoint or the request failed: callers fetch as before
+    }
+    finished = true;
+    sections.forEach(section => section.resolve(null));
+  };
+
+  window.bootstrapSection = (name) => {
+    if (!started) started = load();
+    const section = entry(name);
+    if (section.taken) return Promise.resolve(null);
+    section.taken = true;
+    return section.promise;
+  };
+})();
+
+
+// OpenWeatherMap current + forecast ({ current, forecast }).
+// Uses the shared server-side cache (/api/weather, key kept on the server) and
+// falls back to calling OpenWeatherMap directly when the backend can't serve it.
+window.fetchOpenWeather = async ({ apiKey, lat, lon, units = 'imperial' }) => {
+  const boot = await window.bootstrapSection('weather');
+  if (boot && boot.location.units === units &&
+      boot.location.lat === Math.round(lat * 100) / 100 && boot.location.lon === Math.round(lon * 100) / 100) {
+    return { current: boot.current, forecast: boot.forecast };
+  }
+  const query = `lat=${encodeURIComponent(lat)}&lon=${encodeURIComponent(lon)}&units=${encodeURIComponent(units)}`;
+  try {
+    const res = await fetch(`/api/weather?${query}`);
+    if (res.ok) {
+      const data = await res.json();
+      return { current: data.current, forecast: data.forecast };
+    }
+  } catch (e) {
+    // Static server without the backend: fall through
+  }
+  if (!apiKey) throw new Error('OpenWeatherMap API key not configured');
+  const key = `&appid=${encodeURIComponent(apiKey)}`;
+  const [current, forecast] = await Promise.all([
+    fetch(`https://api.openweathermap.org/data/2.5/weather?${query}${key}`).then(r => r.json()),
+    fetch(`https://api.openweathermap.org/data/2.5/forecast?${query}${key}`).then(r => r.json())
+  ]);
+  return { current, forecast };
+};
@@ -194,13 +194,8 @@ class WeatherWidget {
   async updateFromOWM() {
     const { apiKey, lat, lon, units } = this.config.openWeatherMap;
     
-    const current = await fetch(
-      `https://api.openweathermap.org/data/2.5/weather?lat=${lat}&lon=${lon}&units=${units}&appid=${apiKey}`
-    ).then(r => r.json());
-    
-    const forecast = await fetch(
-      `https://api.openweathermap.org/data/2.5/forecast?lat=${lat}&lon=${lon}&units=${units}&appid=${apiKey}`
-    ).then(r => r.json());
+    // Shared server-side cache when available (one upstream call per location for all displays)
+    const { current, forecast } = await window.fetchOpenWeather({ apiKey, lat, lon, units });
     
     // Extract sunrise/sunset for TimeTheme
     if (current.sys?.sunrise && current.sys?.sunset) {
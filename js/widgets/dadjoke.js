@@ -26,6 +26,12 @@ class DadJokeWidget extends BaseWidget {
 
   async fetchJoke() {
     try {
+      const boot = await window.bootstrapSection?.('joke');
+      if (boot?.joke) {
+        this.currentJoke = boot.joke;
+        this.render();
+        return;
+      }
       const response = await fetch(this.apiUrl, {
         headers: {
           'Accept': 'application/json',
@@ -94,14 +94,10 @@ class ForecastWidget extends BaseWidget {
           owm.apiKey !== 'YOUR_OPENWEATHERMAP_API_KEY' && owm.apiKey !== '') {
         try {
           const units = owm.units || 'imperial';
-          const res = await fetch(
-            `https://api.openweathermap.org/data/2.5/forecast?lat=${owm.lat}&lon=${owm.lon}&units=${units}&appid=${encodeURIComponent(owm.apiKey)}`
-          );
-          if (res.ok) {
-            const data = await res.json();
-            if (data?.list?.length) {
-              forecast = this.processOpenWeatherMapForecast(data.list);
-            }
+          // Shared server-side cache when available (one upstream call per location for all displays)
+          const { forecast: data } = await window.fetchOpenWeather({ apiKey: owm.apiKey, lat: owm.lat, lon: owm.lon, units });
+          if (data?.list?.length) {
+            forecast = this.processOpenWeatherMapForecast(data.list);
           }
         } catch (e) {
           console.warn('🌤️ OpenWeatherMap forecast failed:', e.message);
@@ -4,23 +4,298 @@ Simple HTTP server with settings API
 Serves static files and provides REST API for dashboard settings
 """
 
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs, unquote
+import atexit
 import json
+import logging
 import os
+import signal
 import threading
 import time
 from datetime import datetime
 import urllib.request
 import urllib.error
-import hashlib
-import glob
-import traceback
+import mimetypes
+import shutil
+
+from backend.services.cache import ResponseCache, CachedResponse
+from backend.services.camera_relay import CAMERA_RELAY, NotMultipart, RelayRegistry
+from backend.services.disk_cache import Persistence, persistent_cache
+from backend.services.http_cache import http_date, is_not_modified
+from backend.services.static_assets import AssetTable
+from backend.services.version import VersionWatcher
+from backend.services.settings_store import SettingsStore
+from backend.services.json_patch import PatchError
+from backend.services.log_pipeline import begin_request, configure_logging, end_request, stop_logging
+from backend.services.ics_stream import CHUNK_SIZE, FeedTooLarge, FeedTrimmer, check_length, history_horizon
+from backend.services.ha_states import (
+    ProxyMetrics, UpstreamResponse, cache_key, filter_states, metric_headers, split_param
+)
+from backend.services import metrics
+from backend.services.metrics import CountingWriter, upstream_call
+
+# Logs are queued and written to stdout by a background thread (LOG_LEVEL, LOG_FORMAT,
+# LOG_SAMPLE_ROUTES; see backend/services/log_pipeline.py)
+configure_logging()
+logger = logging.getLogger('server')
+access_logger = logging.getLogger('server.access')
 
 SETTINGS_FILE = 'settings.json'
-SETTINGS_LOCK = threading.Lock()
+
+# Concurrency: a thread per connection; at most SERVER_MAX_WORKERS requests are
+# processed at once (idle keep-alive connections don't hold a slot), and slow
+# upstream routes get their own smaller caps so camera streams cannot starve settings
+SERVER_THREADED = os.environ.get('SERVER_THREADED', '1').lower() not in ('0', 'false', 'no')
+SERVER_MAX_WORKERS = int(os.environ.get('SERVER_MAX_WORKERS', '32'))
+SERVER_MAX_CONNECTIONS = int(os.environ.get('SERVER_MAX_CONNECTIONS', '256'))
+SERVER_WORKER_WAIT = float(os.environ.get('SERVER_WORKER_WAIT', '10'))
+SERVER_KEEPALIVE_TIMEOUT = float(os.environ.get('SERVER_KEEPALIVE_TIMEOUT', '15'))
+ROUTE_LIMITS = {
+    '/api/camera': int(os.environ.get('SERVER_CAMERA_MAX', '4')),
+    '/api/calendar': int(os.environ.get('SERVER_CALENDAR_MAX', '8')),
+    '/api/homeassistant': int(os.environ.get('SERVER_HOMEASSISTANT_MAX', '8')),
+}
+ROUTE_SLOTS = {path: threading.BoundedSemaphore(limit) for path, limit in ROUTE_LIMITS.items()}
+# Answered from memory without waiting for a worker slot
+UNLIMITED_ROUTES = frozenset(['/api/health', '/api/version'])
+
+# Parsed settings kept in memory; saves are written behind, atomically
+SETTINGS = SettingsStore(SETTINGS_FILE)
+atexit.register(SETTINGS.flush)
+
+# Shared upstream cache for calendar feeds (see backend/services/cache.py)
+# Both are also kept on disk (see backend/services/disk_cache.py) so a restart starts warm
+CALENDAR_CACHE = ResponseCache(
+    ttl=float(os.environ.get('CALENDAR_CACHE_TTL', '300')),
+    stale_ttl=float(os.environ.get('CALENDAR_CACHE_STALE_TTL', '3600')),
+    max_entries=int(os.environ.get('CALENDAR_CACHE_MAX_ENTRIES', '64')),
+    persistence=Persistence(persistent_cache, 'calendar', CachedResponse)
+)
+
+# Short-lived cache for Home Assistant REST calls; identical concurrent calls share one request
+HA_CACHE = ResponseCache(
+    ttl=float(os.environ.get('HA_CACHE_TTL', '2')),
+    stale_ttl=0,
+    max_entries=int(os.environ.get('HA_CACHE_MAX_ENTRIES', '32')),
+    persistence=Persistence(persistent_cache, 'homeassistant', UpstreamResponse,
+                            restore_ttl=float(os.environ.get('HA_CACHE_RESTORE_TTL', '300')))
+)
+atexit.register(persistent_cache.close)
+HA_METRICS = ProxyMetrics()
+
+# Camera streams: one upstream connection per camera, frames fanned out to every viewer
+CAMERA_RELAYS = RelayRegistry()
+
+# Static files held in memory with gzip/brotli variants (see backend/services/static_assets.py)
+STATIC_ASSETS = AssetTable('.')
+
+# Dashboard code version, kept current by a background thread (started in run())
+VERSION = VersionWatcher(['index.html', 'server.py', 'js/app.js', 'js/config.js'])
+VERSION.add_listener(lambda version: logger.info("🔄 Dashboard files changed, version %s", version))
+
+# Prometheus metrics (/api/metrics); routes outside this set are labelled /api/other or static
+API_ROUTES = frozenset([
+    '/api/settings', '/api/settings/store', '/api/static/stats', '/api/calendar', '/api/calendar/cache',
+    '/api/cache/persistent', '/api/homeassistant', '/api/homeassistant/metrics', '/api/camera',
+    '/api/camera/relays', '/api/version', '/api/health', '/api/metrics',
+])
+metrics.registry.add_cache('calendar', CALENDAR_CACHE)
+metrics.registry.add_cache('homeassistant', HA_CACHE)
+
+
+def camera_relay_metrics():
+    stats = CAMERA_RELAYS.stats()
+    return [
+        ('dashboard_camera_relays', 'gauge', 'Cameras with a shared upstream connection',
+         [('dashboard_camera_relays', {}, stats['cameras'])]),
+        ('dashboard_camera_viewers', 'gauge', 'Viewers of shared camera relays',
+         [('dashboard_camera_viewers', {}, stats['viewers'])]),
+    ]
+
+
+metrics.registry.add_collector(camera_relay_metrics)
+
+
+def route_label(path):
+    if not path.startswith('/api/'):
+        return 'static'
+    return path if path in API_ROUTES else '/api/other'
+
+class UpstreamHTTPError(Exception):
+    """An upstream error status with its body already read, so every coalesced waiter can send it"""
+    
+    def __init__(self, code, reason, body):
+        super().__init__(f"HTTP {code}: {reason}")
+        self.code = code
+        self.reason = reason
+        self.body = body
+
+def fetch_homeassistant(api_url, token):
+    """Fetch and parse one Home Assistant API response (uncached)"""
+    req = urllib.request.Request(api_url)
+    req.add_header('Authorization', f'Bearer {token}')
+    req.add_header('Content-Type', 'application/json')
+    started = time.monotonic()
+    try:
+        with upstream_call('homeassistant') as call:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                data = response.read()
+                content_type = response.headers.get('Content-Type', 'application/json')
+            call.received = len(data)
+    except urllib.error.HTTPError as e:
+        # The response stream can only be read once, but the error is shared
+        with e:
+            try:
+                body = e.read()
+            except OSError:
+                body = b''
+        raise UpstreamHTTPError(e.code, e.reason, body) from None
+    latency_ms = (time.monotonic() - started) * 1000
+    size = len(data)
+    HA_METRICS.record_upstream(size, latency_ms)
+    if 'json' in content_type:
+        data = json.loads(data) if data else None
+    return UpstreamResponse(data=data, size=size, latency_ms=latency_ms, content_type=content_type)
+
+def fetch_calendar_feed(url, previous=None):
+    """
+    Fetch an ICS feed from upstream (uncached).
+    With a previous response, revalidate conditionally and reuse it on 304.
+    """
+    headers = {'User-Agent': 'Mozilla/5.0 (Family Calendar Server)'}
+    if previous is not None:
+        headers.update(previous.conditional_headers())
+    req = urllib.request.Request(url, headers=headers)
+    trimmer = FeedTrimmer(history_horizon())
+    chunks = []
+    try:
+        with upstream_call('calendar') as call, urllib.request.urlopen(req, timeout=30) as response:
+            # Read and trimmed in chunks; oversized feeds are abandoned mid-download
+            check_length(response.headers.get('Content-Length'))
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                call.received += len(chunk)
+                chunks.append(trimmer.feed(chunk))
+            chunks.append(trimmer.close())
+            body = b''.join(chunks)
+            content_type = response.headers.get('Content-Type', 'text/calendar')
+            upstream_etag = response.headers.get('ETag')
+            upstream_last_modified = response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and previous is not None:
+            return previous
+        raise
+    if trimmer.dropped:
+        logger.info("✓ Calendar feed trimmed: %d past events dropped (%d -> %d bytes)",
+                    trimmer.dropped, trimmer.received, len(body))
+    if previous is not None:
+        return previous.revalidated(body, content_type, upstream_etag, upstream_last_modified)
+    return CachedResponse(
+        body=body,
+        content_type=content_type,
+        upstream_etag=upstream_etag,
+        upstream_last_modified=upstream_last_modified
+    )
+
+def open_camera(opener, req):
+    """Open a camera stream, timing the upstream until its response headers"""
+    with upstream_call('camera'):
+        return opener.open(req, timeout=60)
+
 
 class DashboardHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keep-alive; idle connections are closed after SERVER_KEEPALIVE_TIMEOUT
+    protocol_version = 'HTTP/1.1'
+    timeout = SERVER_KEEPALIVE_TIMEOUT
+    _framed = True
+    _route = None
+    _status = 200
+    _worker = None
+    
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+    
+    def parse_request(self):
+        if not super().parse_request():
+            return False
+        path = urlparse(self.path).path
+        self._route = route_label(path)
+        self._log_context = begin_request(path, self.command)
+        self._status = 200
+        self._sent_before = self.wfile.written
+        self._started = metrics.request_started(self._route)
+        return self.acquire_worker(path)
+    
+    def acquire_worker(self, path):
+        """Take a worker slot for this request; False (503 already sent) if none frees up"""
+        workers = getattr(self.server, 'workers', None)
+        if workers is None or path in UNLIMITED_ROUTES:
+            return True
+        if not workers.acquire(timeout=SERVER_WORKER_WAIT):
+            logger.warning("⚠ All %d workers busy for %.0fs, rejecting %s", self.server.max_workers,
+                           SERVER_WORKER_WAIT, path)
+            self.close_connection = True  # Any request body is left unread
+            self.send_json({"error": "Server busy, try again shortly"}, 503)
+            return False
+        self._worker = workers
+        return True
+    
+    def handle_one_request(self):
+        self._route = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self._worker is not None:
+                self._worker.release()
+                self._worker = None
+            if self._route is not None:
+                sent = self.wfile.written - self._sent_before
+                metrics.request_finished(self._route, self.command, self._status, self._started, sent)
+                self.log_access(sent)
+                end_request(self._log_context)
+    
+    def send_response(self, code, message=None):
+        # Bodiless statuses need no Content-Length to stay on a kept-alive connection
+        self._framed = code < 200 or code in (204, 304)
+        self._status = code
+        super().send_response(code, message)
+    
+    def send_header(self, keyword, value):
+        if keyword.lower() in ('content-length', 'transfer-encoding'):
+            self._framed = True
+        super().send_header(keyword, value)
+    
+    def end_headers(self):
+        # Without a Content-Length the body can only be delimited by closing the connection
+        if not self._framed:
+            super().send_header('Connection', 'close')
+        super().end_headers()
+    
+    def acquire_route(self, path):
+        """Take a slot for a capped route; False (503 already sent) if it is full"""
+        slot = ROUTE_SLOTS.get(path)
+        if slot is None or slot.acquire(blocking=False):
+            return True
+        logger.warning("⚠ %s at its concurrency limit (%d), rejecting request", path, ROUTE_LIMITS[path])
+        body = json.dumps({"error": f"Too many concurrent {path} requests, try again shortly"}).encode()
+        self.send_response(503)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Retry-After', '5')
+        self.end_headers()
+        self.wfile.write(body)
+        return False
+    
+    def release_route(self, path):
+        slot = ROUTE_SLOTS.get(path)
+        if slot is not None:
+            slot.release()
+    
     def do_GET(self):
         """Handle GET requests"""
         parsed_path = urlparse(self.path)
@@ -32,17 +307,69 @@ class DashboardHandler(BaseHTTPRequestHandler):
         
         # API endpoint for proxying calendar ICS feeds
         if parsed_path.path == '/api/calendar':
-            self.proxy_calendar()
+            if self.acquire_route('/api/calendar'):
+                try:
+                    self.proxy_calendar()
+                finally:
+                    self.release_route('/api/calendar')
+            return
+        
+        # Settings saves vs. disk writes
+        if parsed_path.path == '/api/settings/store':
+            self.send_json(SETTINGS.stats())
+            return
+        
+        # In-memory static asset table
+        if parsed_path.path == '/api/static/stats':
+            self.send_json(STATIC_ASSETS.stats())
+            return
+        
+        # Calendar cache hit/miss counters
+        if parsed_path.path == '/api/calendar/cache':
+            self.send_json(CALENDAR_CACHE.stats())
+            return
+        
+        # On-disk response cache (calendar feeds and Home Assistant snapshots)
+        if parsed_path.path == '/api/cache/persistent':
+            self.send_json(persistent_cache.stats())
             return
         
         # API endpoint for proxying Home Assistant API requests
         if parsed_path.path == '/api/homeassistant':
-            self.proxy_homeassistant()
+            if self.acquire_route('/api/homeassistant'):
+                try:
+                    self.proxy_homeassistant()
+                finally:
+                    self.release_route('/api/homeassistant')
+            return
+        
+        # Home Assistant proxy cache and byte/latency counters
+        if parsed_path.path == '/api/homeassistant/metrics':
+            self.send_json({"cache": HA_CACHE.stats(), "proxy": HA_METRICS.stats()})
+            return
+        
+        # Prometheus metrics
+        if parsed_path.path == '/api/metrics':
+            body = metrics.registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', metrics.CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        
+        # Shared camera relays and their viewers
+        if parsed_path.path == '/api/camera/relays':
+            self.send_json(CAMERA_RELAYS.stats())
             return
         
         # API endpoint for camera stream proxy
         if parsed_path.path == '/api/camera':
-            self.proxy_camera()
+            if self.acquire_route('/api/camera'):
+                try:
+                    self.proxy_camera()
+                finally:
+                    self.release_route('/api/camera')
             return
         
         # API endpoint for getting server version
@@ -68,58 +395,149 @@ class DashboardHandler(BaseHTTPRequestHandler):
             return
         
         # 404 for unknown POST endpoints
+        self.discard_body()
         self.send_response(404)
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
+    def do_PATCH(self):
+        """Handle PATCH requests"""
+        parsed_path = urlparse(self.path)
+        
+        # Partial settings update (merge patch / JSON Patch)
+        if parsed_path.path == '/api/settings':
+            self.patch_settings()
+            return
+        
+        self.discard_body()
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def discard_body(self):
+        """Read an unused request body so it isn't parsed as the next request on this connection"""
+        try:
+            remaining = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            remaining = -1
+        if remaining < 0 or self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+            return
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 65536))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+    
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
         self.send_cors_headers()
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def send_cors_headers(self):
         """Send CORS headers"""
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.send_header('Access-Control-Max-Age', '3600')
     
+    def send_json(self, data, status=200):
+        """Send a JSON response"""
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_cors_headers()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_conditional(self, cached, extra_headers=None):
+        """Send a CachedResponse, or 304 if the client's validators match"""
+        not_modified = is_not_modified(
+            self.headers.get('If-None-Match'),
+            self.headers.get('If-Modified-Since'),
+            cached.etag,
+            cached.last_modified
+        )
+        self.send_response(304 if not_modified else 200)
+        self.send_cors_headers()
+        self.send_header('ETag', cached.etag)
+        self.send_header('Last-Modified', http_date(cached.last_modified))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header('Content-Type', cached.content_type)
+        self.send_header('Content-Length', str(len(cached.body)))
+        self.end_headers()
+        self.wfile.write(cached.body)
+    
     def send_settings(self):
-        """Send current settings"""
-        print(f"\n📋 GET /api/settings request from {self.address_string()}")
+        """Send current settings (from memory), or only the keys changed since ?since=<rev>"""
+        logger.info("📋 GET /api/settings request from %s", self.address_string())
         try:
-            with SETTINGS_LOCK:
-                if os.path.exists(SETTINGS_FILE):
-                    with open(SETTINGS_FILE, 'r') as f:
-                        settings = json.load(f)
-                    print(f"✓ Settings loaded from {SETTINGS_FILE} ({len(settings)} keys)")
-                else:
-                    settings = {}
-                    print(f"⚠ Settings file {SETTINGS_FILE} not found, returning empty settings")
+            since = parse_qs(urlparse(self.path).query).get('since', [None])[0]
+            revision_header = {'X-Settings-Revision': str(SETTINGS.revision)}
+            if since is None:
+                self.send_conditional(SETTINGS.response(), {'Cache-Control': 'no-cache', **revision_header})
+                logger.debug("✓ Settings sent")
+                return
             
-            self.send_response(200)
-            self.send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(settings).encode())
-            print(f"✓ Settings sent successfully\n")
+            try:
+                changes = SETTINGS.changes_since(int(since))
+            except ValueError:
+                self.send_json({"error": "'since' must be an integer revision"}, status=400)
+                return
+            if changes == {}:
+                self.send_response(304)
+                self.send_cors_headers()
+                self.send_header('X-Settings-Revision', str(SETTINGS.revision))
+                self.end_headers()
+            elif changes is None:
+                settings = {k: v for k, v in SETTINGS.get().items() if not k.startswith('_')}
+                self.send_json({"revision": SETTINGS.revision, "settings": settings})
+            else:
+                self.send_json({"revision": SETTINGS.revision, "changes": changes})
+            logger.debug("✓ Settings changes since %s sent (revision %d)", since, SETTINGS.revision)
         except Exception as e:
-            error_traceback = traceback.format_exc()
-            print(f"❌ ERROR reading settings: {e}")
-            print(f"Traceback:\n{error_traceback}")
+            logger.exception("❌ ERROR reading settings: %s", e)
             self.send_response(500)
             self.send_cors_headers()
             self.end_headers()
             self.wfile.write(json.dumps({"error": str(e)}).encode())
     
+    def patch_settings(self):
+        """Apply a JSON Merge Patch (RFC 7386) or JSON Patch (RFC 6902) to the settings"""
+        logger.info("🩹 PATCH /api/settings request from %s", self.address_string())
+        content_length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(content_length) if content_length else b''
+        try:
+            patch = json.loads(body.decode() or 'null')
+        except json.JSONDecodeError as e:
+            self.send_json({"error": f"Invalid JSON: {str(e)}"}, status=400)
+            return
+        try:
+            revision = SETTINGS.patch(
+                patch, self.headers.get('Content-Type'), {'_lastUpdated': datetime.now().isoformat()}
+            )
+        except PatchError as e:
+            logger.warning("❌ Invalid patch: %s", e)
+            self.send_json({"error": str(e)}, status=422)
+            return
+        logger.info("✓ Settings patched (revision %d)", revision)
+        self.send_json({"success": True, "revision": revision})
+    
     def save_settings(self):
         """Save settings from request body"""
-        print(f"\n💾 POST /api/settings request from {self.address_string()}")
+        logger.info("💾 POST /api/settings request from %s", self.address_string())
         try:
             # Read request body
             content_length = int(self.headers.get('Content-Length', 0))
             if content_length == 0:
-                print("❌ ERROR: Empty request body")
+                logger.warning("❌ Empty settings request body")
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -127,12 +545,12 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 return
                 
             body = self.rfile.read(content_length)
-            print(f"Received {content_length} bytes")
+            logger.debug("Received %d bytes", content_length)
             
             try:
                 settings = json.loads(body.decode())
             except json.JSONDecodeError as e:
-                print(f"❌ ERROR: Invalid JSON in request body: {e}")
+                logger.warning("❌ Invalid JSON in settings request body: %s", e)
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -142,141 +560,80 @@ class DashboardHandler(BaseHTTPRequestHandler):
             # Add timestamp
             settings['_lastUpdated'] = datetime.now().isoformat()
             
-            # Save to file
-            with SETTINGS_LOCK:
-                with open(SETTINGS_FILE, 'w') as f:
-                    json.dump(settings, f, indent=2)
+            # Visible immediately; written to disk after SETTINGS_WRITE_DELAY
+            revision = SETTINGS.set(settings)
             
-            print(f"✓ Settings saved to {SETTINGS_FILE} at {settings.get('_lastUpdated')}")
-            print(f"  Settings keys: {list(settings.keys())}")
+            logger.info("✓ Settings saved at %s (%d keys, revision %d)",
+                        settings.get('_lastUpdated'), len(settings), revision)
             
-            self.send_response(200)
-            self.send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"success": True}).encode())
-            print(f"✓ Response sent successfully\n")
+            self.send_json({"success": True, "revision": revision})
         except Exception as e:
-            error_traceback = traceback.format_exc()
-            print(f"❌ ERROR saving settings: {e}")
-            print(f"Traceback:\n{error_traceback}")
+            logger.exception("❌ ERROR saving settings: %s", e)
             self.send_response(500)
             self.send_cors_headers()
             self.end_headers()
             self.wfile.write(json.dumps({"error": str(e)}).encode())
     
     def serve_static_file(self):
-        """Serve static files"""
-        path = self.path
-        if path == '/':
-            path = '/index.html'
-        
+        """Serve static files from the in-memory asset table"""
         # Security: prevent directory traversal
-        if '..' in path:
+        if '..' in self.path:
             self.send_response(403)
+            self.send_header('Content-Length', '0')
             self.end_headers()
             return
         
-        # Remove leading slash
-        file_path = path.lstrip('/')
-        
-        # Default to index.html if path ends with /
-        if not file_path or os.path.isdir(file_path):
-            file_path = 'index.html'
-        
-        # Check if file exists
-        if not os.path.exists(file_path):
+        resolved = STATIC_ASSETS.resolve(self.path)
+        if resolved is None:
             self.send_response(404)
+            self.send_header('Content-Length', '0')
             self.end_headers()
             return
+        file_path, immutable = resolved
         
-        # Determine content type
-        content_type = 'text/html'
-        if file_path.endswith('.css'):
-            content_type = 'text/css'
-        elif file_path.endswith('.js'):
-            content_type = 'application/javascript'
-        elif file_path.endswith('.json'):
-            content_type = 'application/json'
-        elif file_path.endswith('.png'):
-            content_type = 'image/png'
-        elif file_path.endswith('.jpg') or file_path.endswith('.jpeg'):
-            content_type = 'image/jpeg'
-        elif file_path.endswith('.svg'):
-            content_type = 'image/svg+xml'
-        elif file_path.endswith('.ico'):
-            content_type = 'image/x-icon'
-        
-        # Send file
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            asset = STATIC_ASSETS.get(file_path)
+            if asset is None:
+                # Too large to keep in memory: stream it from disk
+                self.send_large_file(STATIC_ASSETS.file_path(file_path))
+                return
             
-            self.send_response(200)
-            self.send_header('Content-Type', content_type)
-            self.send_header('Content-Length', str(len(content)))
+            status, headers, body = asset.response(
+                self.headers.get('Accept-Encoding'),
+                self.headers.get('If-None-Match'),
+                immutable
+            )
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
             self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(body)
         except Exception as e:
-            print(f"Error serving file {file_path}: {e}")
+            logger.exception("Error serving file %s: %s", file_path, e)
             self.send_response(500)
             self.end_headers()
     
-    def send_health(self):
-        """Health check endpoint - responds immediately without file I/O"""
+    def send_large_file(self, full_path):
+        """Send a file without loading it into memory"""
+        size = os.path.getsize(full_path)
         self.send_response(200)
-        self.send_cors_headers()
-        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Type', mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
         self.end_headers()
-        self.wfile.write(json.dumps({
+        with open(full_path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile)
+    
+    def send_health(self):
+        """Health check endpoint - responds immediately without file I/O"""
+        self.send_json({
             "status": "ok",
             "service": "family-calendar",
             "timestamp": datetime.now().isoformat()
-        }).encode())
+        })
     
     def send_version(self):
-        """Send server version based on file modification times"""
-        try:
-            # Get modification times of key files to create a version hash
-            key_files = [
-                'index.html',
-                'server.py',
-                'js/app.js',
-                'js/config.js'
-            ]
-            
-            # Also check for any JS/CSS files that might have changed
-            js_files = glob.glob('js/**/*.js', recursive=True)
-            css_files = glob.glob('css/**/*.css', recursive=True)
-            key_files.extend(js_files[:10])  # Limit to avoid too many files
-            key_files.extend(css_files[:10])
-            
-            version_parts = []
-            for file_path in key_files:
-                if os.path.exists(file_path):
-                    mtime = os.path.getmtime(file_path)
-                    version_parts.append(f"{file_path}:{mtime}")
-            
-            # Create a hash of all modification times
-            version_string = '|'.join(sorted(version_parts))
-            version_hash = hashlib.md5(version_string.encode()).hexdigest()[:12]
-            
-            response = {
-                "version": version_hash,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.send_response(200)
-            self.send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
-        except Exception as e:
-            print(f"Error getting version: {e}")
-            self.send_response(500)
-            self.send_cors_headers()
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode())
+        """Send server version (kept current by the version watcher thread)"""
+        self.send_json(VERSION.snapshot())
     
     def proxy_homeassistant(self):
         """Proxy Home Assistant API requests (avoid CORS issues)"""
@@ -305,25 +662,33 @@ class DashboardHandler(BaseHTTPRequestHandler):
             base_url = url.rstrip('/')
             api_url = base_url + endpoint
             
-            # Create request with authorization header
-            req = urllib.request.Request(api_url)
-            req.add_header('Authorization', f'Bearer {token}')
-            req.add_header('Content-Type', 'application/json')
+            # Optional trimming: ?entities=light.a,sensor.b&fields=state,attributes
+            entities = split_param(query_params.get('entities', [None])[0])
+            fields = split_param(query_params.get('fields', [None])[0])
             
-            # Fetch with timeout
             try:
-                with urllib.request.urlopen(req, timeout=30) as response:
-                    data = response.read()
-                    status_code = response.getcode()
-                    
-                    self.send_response(status_code)
-                    self.send_cors_headers()
-                    self.send_header('Content-Type', response.headers.get('Content-Type', 'application/json'))
-                    self.end_headers()
-                    self.wfile.write(data)
-            except urllib.error.HTTPError as e:
-                # Handle HTTP errors (like 401, 404, etc.)
-                error_body = e.read()
+                started = time.monotonic()
+                upstream, cache_status = HA_CACHE.get_or_fetch_sync(
+                    cache_key(api_url, token), lambda: fetch_homeassistant(api_url, token)
+                )
+                if isinstance(upstream.data, bytes):
+                    body = upstream.data  # Non-JSON endpoint: pass through
+                else:
+                    body = json.dumps(filter_states(upstream.data, entities, fields)).encode()
+                elapsed_ms = (time.monotonic() - started) * 1000
+                HA_METRICS.record_response(upstream, len(body), elapsed_ms)
+                
+                self.send_response(200)
+                self.send_cors_headers()
+                self.send_header('Content-Type', upstream.content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in metric_headers(upstream, len(body), elapsed_ms, cache_status).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+            except UpstreamHTTPError as e:
+                # Handle HTTP errors (like 401, 404, etc.); coalesced waiters share e
+                error_body = e.body or json.dumps({"error": f"HTTP {e.code}: {e.reason}"}).encode()
                 self.send_response(e.code)
                 self.send_cors_headers()
                 self.send_header('Content-Type', 'application/json')
@@ -336,7 +701,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 self.end_headers()
                 self.wfile.write(json.dumps({"error": f"Failed to connect to Home Assistant: {str(e)}"}).encode())
         except Exception as e:
-            print(f"Error proxying Home Assistant request: {e}")
+            logger.exception("Error proxying Home Assistant request: %s", e)
             self.send_response(500)
             self.send_cors_headers()
             self.send_header('Content-Type', 'application/json')
@@ -369,68 +734,141 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps({"error": "Only Google Calendar URLs are allowed"}).encode())
                 return
             
-            # Fetch the ICS feed
-            req = urllib.request.Request(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Family Calendar Server)'
-            })
-            
             try:
-                with urllib.request.urlopen(req, timeout=30) as response:
-                    ics_content = response.read()
-                    content_type = response.headers.get('Content-Type', 'text/calendar')
-                    
-                    # Send response
-                    self.send_response(200)
-                    self.send_cors_headers()
-                    self.send_header('Content-Type', content_type)
-                    self.send_header('Content-Length', str(len(ics_content)))
-                    self.send_header('Cache-Control', 'public, max-age=300')  # Cache for 5 minutes
-                    self.end_headers()
-                    self.wfile.write(ics_content)
+                # Served from the shared cache; concurrent misses share one fetch
+                previous = CALENDAR_CACHE.get_entry(url)
+                cached, cache_status = CALENDAR_CACHE.get_or_fetch_sync(
+                    url, lambda: fetch_calendar_feed(url, previous.value if previous else None)
+                )
+                
+                # Send response (304 if the client already has this version)
+                self.send_conditional(cached, {
+                    'Cache-Control': 'public, max-age=300',  # Cache for 5 minutes
+                    'X-Cache': cache_status.upper()
+                })
             except urllib.error.HTTPError as e:
-                print(f"Calendar proxy HTTP error: {e.code} {e.reason}")
+                logger.warning("Calendar proxy HTTP error: %s %s", e.code, e.reason)
                 self.send_response(e.code)
                 self.send_cors_headers()
                 self.end_headers()
                 self.wfile.write(json.dumps({"error": f"HTTP {e.code}: {e.reason}"}).encode())
+            except FeedTooLarge as e:
+                logger.warning("Calendar proxy: %s", e)
+                self.send_json({"error": str(e)}, 502)
             except urllib.error.URLError as e:
-                print(f"Calendar proxy URL error: {e.reason}")
+                logger.warning("Calendar proxy URL error: %s", e.reason)
                 self.send_response(500)
                 self.send_cors_headers()
                 self.end_headers()
                 self.wfile.write(json.dumps({"error": f"Failed to fetch calendar: {e.reason}"}).encode())
             except Exception as e:
-                print(f"Calendar proxy error: {e}")
+                logger.exception("Calendar proxy error: %s", e)
                 self.send_response(500)
                 self.send_cors_headers()
                 self.end_headers()
                 self.wfile.write(json.dumps({"error": str(e)}).encode())
                 
         except Exception as e:
-            print(f"Calendar proxy unexpected error: {e}")
+            logger.exception("Calendar proxy unexpected error: %s", e)
             self.send_response(500)
             self.send_cors_headers()
             self.end_headers()
             self.wfile.write(json.dumps({"error": str(e)}).encode())
     
+    def stream_camera_response(self, response, url, is_mjpeg, start_time):
+        """Copy one upstream camera response to this client"""
+        logger.info("✓ Camera responded %s in %.2f seconds (%s)", response.getcode(),
+                    time.time() - start_time, response.headers.get('Content-Type', 'unknown'))
+        # Get content type
+        content_type = response.headers.get('Content-Type', 'video/mp4')
+        
+        # For HLS streams, set appropriate headers
+        if '.m3u8' in url or content_type == 'application/vnd.apple.mpegurl':
+            content_type = 'application/vnd.apple.mpegurl'
+        elif is_mjpeg or 'mjpeg' in content_type.lower() or 'multipart/x-mixed-replace' in content_type.lower():
+            content_type = 'multipart/x-mixed-replace'
+        
+        # Send headers for video streaming
+        self.send_response(200)
+        self.send_cors_headers()
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+        self.send_header('Pragma', 'no-cache')
+        self.send_header('Expires', '0')
+        
+        # For video/MJPEG streams, don't send Content-Length (it's a stream)
+        if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'multipart' in content_type:
+            # End headers before streaming
+            self.end_headers()
+            # Stream the data in chunks
+            chunk_size = 8192
+            bytes_sent = 0
+            try:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    bytes_sent += len(chunk)
+                    # Flush periodically to avoid timeout
+                    if bytes_sent % (chunk_size * 10) == 0:
+                        self.wfile.flush()
+            except (ConnectionResetError, BrokenPipeError):
+                # Client disconnected, that's fine
+                logger.debug("Camera client disconnected (normal)")
+            metrics.UPSTREAM_BYTES.inc('camera', amount=bytes_sent)
+            logger.info("✓ Streamed %d camera bytes to client", bytes_sent)
+        else:
+            # For other content, read all at once
+            data = response.read()
+            metrics.UPSTREAM_BYTES.inc('camera', amount=len(data))
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            logger.info("✓ Sent %d camera bytes to client", len(data))
+    
+    def relay_camera(self, relay, start_time):
+        """Send frames from a shared camera relay until the viewer or the camera goes away"""
+        logger.info("✓ Joined camera relay in %.2f seconds (%d viewers)", time.time() - start_time, relay.viewers)
+        frames_sent = 0
+        try:
+            self.send_response(200)
+            self.send_cors_headers()
+            self.send_header('Content-Type', relay.content_type)
+            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+            self.send_header('Pragma', 'no-cache')
+            self.send_header('Expires', '0')
+            self.end_headers()
+            seq = 0
+            while True:
+                # Slow clients skip ahead to the newest frame instead of queueing
+                frame = relay.next_frame(seq)
+                if frame is None:
+                    break
+                seq, data = frame
+                self.wfile.write(data)
+                self.wfile.flush()
+                frames_sent += 1
+        except (ConnectionResetError, BrokenPipeError):
+            logger.debug("Camera client disconnected (normal)")
+        finally:
+            CAMERA_RELAYS.unsubscribe(relay)
+        logger.info("✓ Relayed %d frames to client (%d viewers left)", frames_sent, relay.viewers)
+    
     def proxy_camera(self):
         """Proxy camera stream requests (RTSP, HLS, MJPEG, or HTTP streams)"""
-        print(f"\n{'='*60}")
-        print(f"📹 Camera Proxy Request")
-        print(f"{'='*60}")
-        print(f"Path: {self.path}")
-        print(f"Client: {self.address_string()}")
+        logger.info("📹 Camera proxy request from %s", self.address_string())
         
         try:
             parsed_path = urlparse(self.path)
             query_params = parse_qs(parsed_path.query, keep_blank_values=True)
             
-            print(f"Query params keys: {list(query_params.keys())}")
+            logger.debug("Query params keys: %s", list(query_params.keys()))
             
             # Get URL from query parameter
             url_list = query_params.get('url', [])
             if not url_list or not url_list[0]:
-                print("❌ ERROR: Missing 'url' parameter")
+                logger.warning("❌ Camera proxy: missing 'url' parameter")
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -438,7 +876,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 return
             
             url = url_list[0]
-            print(f"Raw URL param: {url[:100]}...")
+            logger.debug("Raw URL param: %s...", url[:100])
             
             # Get username and password from query parameters (if provided separately)
             username_list = query_params.get('username', [])
@@ -449,10 +887,9 @@ class DashboardHandler(BaseHTTPRequestHandler):
             # Decode URL and credentials
             try:
                 url = unquote(url)
-                print(f"Decoded URL: {url}")
+                logger.debug("Decoded URL: %s", url)
             except Exception as e:
-                print(f"❌ ERROR: Error decoding URL: {e}")
-                print(f"   URL: {url[:100]}")
+                logger.warning("❌ Camera proxy: error decoding URL %s: %s", url[:100], e)
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -464,31 +901,31 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 try:
                     username = unquote(username_param).strip()
                     username = username if username else None
-                    print(f"Username: {'***' if username else 'None'}")
+                    logger.debug("Username: %s", '***' if username else 'None')
                 except Exception as e:
-                    print(f"⚠ Warning: Error decoding username: {e}")
+                    logger.warning("⚠ Camera proxy: error decoding username: %s", e)
                     username = None
             else:
                 username = None
-                print("Username: None (not provided)")
+                logger.debug("Username: None (not provided)")
                 
             if password_param:
                 try:
                     password = unquote(password_param).strip()
                     password = password if password else None
-                    print(f"Password: {'***' if password else 'None'}")
+                    logger.debug("Password: %s", '***' if password else 'None')
                 except Exception as e:
-                    print(f"⚠ Warning: Error decoding password: {e}")
+                    logger.warning("⚠ Camera proxy: error decoding password: %s", e)
                     password = None
             else:
                 password = None
-                print("Password: None (not provided)")
+                logger.debug("Password: None (not provided)")
             
             # Check if it's an RTSP URL - note: browsers can't play RTSP directly
             # For RTSP, you would need ffmpeg to convert to HLS or WebRTC
             # For now, we'll just proxy HTTP/HLS/MJPEG streams
             if url.startswith('rtsp://'):
-                print("❌ ERROR: RTSP streams not supported (need ffmpeg conversion)")
+                logger.warning("❌ Camera proxy: RTSP streams not supported (need ffmpeg conversion)")
                 self.send_response(501)
                 self.send_cors_headers()
                 self.send_header('Content-Type', 'application/json')
@@ -504,8 +941,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
             # For HTTP/HLS/MJPEG streams, proxy the request
             # Validate URL is HTTP/HTTPS
             if not (url.startswith('http://') or url.startswith('https://')):
-                print(f"❌ ERROR: Invalid URL scheme (must be http:// or https://)")
-                print(f"   URL: {url}")
+                logger.warning("❌ Camera proxy: invalid URL scheme (must be http:// or https://): %s", url)
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -514,17 +950,15 @@ class DashboardHandler(BaseHTTPRequestHandler):
             
             # Check if it's an MJPEG stream (for better handling)
             is_mjpeg = '/mjpg/' in url or '/mjpeg/' in url or 'video.cgi' in url or url.endswith('.mjpg') or url.endswith('.mjpeg')
-            print(f"Stream type: {'MJPEG' if is_mjpeg else 'Other'}")
+            logger.debug("Stream type: %s", 'MJPEG' if is_mjpeg else 'Other')
             
             # Parse URL to handle embedded credentials (if not provided separately)
             try:
                 parsed_url = urlparse(url)
-                print(f"Parsed URL - Scheme: {parsed_url.scheme}, Netloc: {parsed_url.netloc}, Path: {parsed_url.path}")
-                if parsed_url.query:
-                    print(f"  Query: {parsed_url.query[:100]}...")
+                logger.debug("Parsed URL - Scheme: %s, Netloc: %s, Path: %s, Query: %s",
+                             parsed_url.scheme, parsed_url.netloc, parsed_url.path, parsed_url.query[:100])
             except Exception as e:
-                print(f"❌ ERROR: Error parsing URL: {e}")
-                print(f"   URL: {url}")
+                logger.warning("❌ Camera proxy: error parsing URL %s: %s", url, e)
                 self.send_response(400)
                 self.send_cors_headers()
                 self.end_headers()
@@ -547,7 +981,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                     if ':' in auth_part:
                         username, password = auth_part.split(':', 1)
                 except Exception as e:
-                    print(f"Error extracting credentials from URL: {e}")
+                    logger.warning("Error extracting credentials from URL: %s", e)
                     # Continue without credentials
             
             # Build clean URL
@@ -557,7 +991,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
             if parsed_url.fragment:
                 clean_url += '#' + parsed_url.fragment
             
-            print(f"Clean URL: {clean_url}")
+            logger.debug("Clean URL: %s", clean_url)
             
             # Create request
             req = urllib.request.Request(clean_url, headers=headers)
@@ -565,7 +999,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
             # Set up authentication if credentials were found (from URL or parameters)
             if username and password:
                 try:
-                    print(f"Setting up HTTP authentication (Basic + Digest) for {clean_netloc}")
+                    logger.debug("Setting up HTTP authentication (Basic + Digest) for %s", clean_netloc)
                     password_mgr = urllib.request.HTTPPasswordMgrWithDefaultRealm()
                     password_mgr.add_password(None, f"{parsed_url.scheme}://{clean_netloc}", username, password)
                     
@@ -575,75 +1009,32 @@ class DashboardHandler(BaseHTTPRequestHandler):
                     
                     # Create opener with both handlers
                     opener = urllib.request.build_opener(basic_auth_handler, digest_auth_handler)
-                    print("✓ Authentication handlers created (Basic + Digest)")
                 except Exception as e:
-                    print(f"❌ ERROR: Error setting up authentication: {e}")
-                    traceback.print_exc()
+                    logger.exception("❌ Camera proxy: error setting up authentication: %s", e)
                     # Fall back to no authentication
                     opener = urllib.request.build_opener()
             else:
-                print("No authentication (no credentials provided)")
+                logger.debug("No authentication (no credentials provided)")
                 opener = urllib.request.build_opener()
             
-            print(f"Making request to camera: {clean_url}")
-            print(f"Timeout: 60 seconds")
+            logger.debug("Making request to camera: %s (timeout 60 seconds)", clean_url)
             start_time = time.time()
             try:
-                # Use longer timeout for camera streams (they can be slow to start)
-                with opener.open(req, timeout=60) as response:
-                    elapsed = time.time() - start_time
-                    print(f"✓ Connection established in {elapsed:.2f} seconds")
-                    print(f"✓ Response received: {response.getcode()}")
-                    print(f"  Content-Type: {response.headers.get('Content-Type', 'unknown')}")
-                    # Get content type
-                    content_type = response.headers.get('Content-Type', 'video/mp4')
-                    
-                    # For HLS streams, set appropriate headers
-                    if '.m3u8' in url or content_type == 'application/vnd.apple.mpegurl':
-                        content_type = 'application/vnd.apple.mpegurl'
-                    elif is_mjpeg or 'mjpeg' in content_type.lower() or 'multipart/x-mixed-replace' in content_type.lower():
-                        content_type = 'multipart/x-mixed-replace'
-                    
-                    # Send headers for video streaming
-                    self.send_response(200)
-                    self.send_cors_headers()
-                    self.send_header('Content-Type', content_type)
-                    self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-                    self.send_header('Pragma', 'no-cache')
-                    self.send_header('Expires', '0')
-                    
-                    # For video/MJPEG streams, don't send Content-Length (it's a stream)
-                    if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'multipart' in content_type:
-                        # End headers before streaming
-                        self.end_headers()
-                        # Stream the data in chunks
-                        chunk_size = 8192
-                        bytes_sent = 0
-                        try:
-                            while True:
-                                chunk = response.read(chunk_size)
-                                if not chunk:
-                                    break
-                                self.wfile.write(chunk)
-                                bytes_sent += len(chunk)
-                                # Flush periodically to avoid timeout
-                                if bytes_sent % (chunk_size * 10) == 0:
-                                    self.wfile.flush()
-                        except (ConnectionResetError, BrokenPipeError):
-                            # Client disconnected, that's fine
-                            print("Client disconnected (normal)")
-                            pass
-                        print(f"✓ Streamed {bytes_sent} bytes to client")
+                if CAMERA_RELAY:
+                    # One upstream connection per camera, shared by every viewer
+                    relay_key = cache_key(clean_url, f"{username}:{password}")
+                    try:
+                        relay = CAMERA_RELAYS.subscribe(relay_key, lambda: open_camera(opener, req))
+                    except NotMultipart as e:
+                        logger.debug("Not a multipart stream, proxying directly")
+                        with e.response or open_camera(opener, req) as response:
+                            self.stream_camera_response(response, url, is_mjpeg, start_time)
                     else:
-                        # For other content, read all at once
-                        data = response.read()
-                        self.send_header('Content-Length', str(len(data)))
-                        self.end_headers()
-                        self.wfile.write(data)
-                        print(f"✓ Sent {len(data)} bytes to client")
-                    
-                    print(f"✓ Camera proxy request completed successfully")
-                    print(f"{'='*60}\n")
+                        self.relay_camera(relay, start_time)
+                else:
+                    # Use longer timeout for camera streams (they can be slow to start)
+                    with open_camera(opener, req) as response:
+                        self.stream_camera_response(response, url, is_mjpeg, start_time)
                         
             except urllib.error.HTTPError as e:
                 # Try to read error body, but don't fail if we can't
@@ -654,16 +1045,13 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 except Exception:
                     pass
                 
-                print(f"❌ HTTP Error: {e.code} {e.reason}")
-                print(f"   URL: {clean_url}")
-                if error_text:
-                    print(f"   Response body: {error_text}")
-                if e.code == 401:
-                    print("   → This is an authentication error. Check username/password.")
-                elif e.code == 404:
-                    print("   → Camera endpoint not found. Check the URL path.")
-                elif e.code == 403:
-                    print("   → Access forbidden. Check camera permissions.")
+                hint = {
+                    401: "This is an authentication error. Check username/password.",
+                    404: "Camera endpoint not found. Check the URL path.",
+                    403: "Access forbidden. Check camera permissions.",
+                }.get(e.code, '')
+                logger.warning("❌ Camera HTTP error %s %s from %s %s%s", e.code, e.reason, clean_url,
+                               f"(response: {error_text}) " if error_text else '', hint)
                 
                 try:
                     self.send_response(e.code)
@@ -679,19 +1067,19 @@ class DashboardHandler(BaseHTTPRequestHandler):
                         error_msg["hint"] = "Authentication failed. Verify username and password are correct."
                     self.wfile.write(json.dumps(error_msg).encode())
                 except Exception as send_err:
-                    print(f"❌ Failed to send error response: {send_err}")
+                    logger.warning("❌ Failed to send error response: %s", send_err)
             except urllib.error.URLError as e:
                 elapsed = time.time() - start_time
-                print(f"❌ URL Error after {elapsed:.2f} seconds: {e.reason}")
-                print(f"   URL: {clean_url}")
-                print(f"   Error type: {type(e).__name__}")
+                hint = ''
                 if "Name or service not known" in str(e.reason) or "nodename nor servname provided" in str(e.reason):
-                    print("   → DNS resolution failed. Check if camera IP/hostname is correct.")
+                    hint = "DNS resolution failed. Check if camera IP/hostname is correct."
                 elif "Connection refused" in str(e.reason):
-                    print("   → Connection refused. Camera may be offline or port is wrong.")
+                    hint = "Connection refused. Camera may be offline or port is wrong."
                 elif "timed out" in str(e.reason).lower():
-                    print(f"   → Connection timeout after {elapsed:.2f}s (60s limit). Camera may be unreachable, slow, or firewall blocking.")
-                    print("   → If nginx is timing out (504), increase nginx proxy_read_timeout to > 60s")
+                    hint = ("Connection timeout (60s limit). Camera may be unreachable, slow, or firewall blocking. "
+                            "If nginx is timing out (504), increase nginx proxy_read_timeout to > 60s")
+                logger.warning("❌ Camera URL error after %.2f seconds: %s (%s) from %s %s",
+                               elapsed, e.reason, type(e).__name__, clean_url, hint)
                 
                 # Return 504 for timeout, 500 for other errors
                 status_code = 504 if "timed out" in str(e.reason).lower() else 500
@@ -710,9 +1098,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                     error_msg["hint"] = "Check if camera is online and URL is correct"
                 self.wfile.write(json.dumps(error_msg).encode())
             except Exception as e:
-                print(f"❌ Unexpected Error: {e}")
-                print(f"   URL: {clean_url}")
-                traceback.print_exc()
+                logger.exception("❌ Camera proxy unexpected error from %s: %s", clean_url, e)
                 self.send_response(500)
                 self.send_cors_headers()
                 self.send_header('Content-Type', 'application/json')
@@ -724,12 +1110,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 }).encode())
                 
         except Exception as e:
-            error_traceback = traceback.format_exc()
-            print(f"\n❌❌❌ CRITICAL ERROR in camera proxy ❌❌❌")
-            print(f"Error: {e}")
-            print(f"Path: {self.path}")
-            print(f"Traceback:\n{error_traceback}")
-            print(f"{'='*60}\n")
+            logger.critical("❌❌❌ CRITICAL ERROR in camera proxy: %s", e, exc_info=True)
             try:
                 self.send_response(500)
                 self.send_cors_headers()
@@ -747,7 +1128,7 @@ class DashboardHandler(BaseHTTPRequestHandler):
                 }).encode())
             except Exception as send_error:
                 # If we can't send error response, just log it
-                print(f"❌ Failed to send error response: {send_error}")
+                logger.warning("❌ Failed to send error response: %s", send_error)
     
     def _stream_camera_response(self, response, is_mjpeg, original_url):
         """Helper method to stream camera response"""
@@ -788,24 +1169,101 @@ class DashboardHandler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(data)
     
+    def log_request(self, code='-', size='-'):
+        """Logged by log_access once the response has been sent"""
+    
+    def log_access(self, sent):
+        """One access line per request (sampled for polling endpoints; 5xx always kept)"""
+        access_logger.log(
+            logging.WARNING if self._status >= 500 else logging.INFO,
+            '%s - "%s" %s %d', self.address_string(), self.requestline, self._status, sent,
+            extra={
+                'client': self.client_address[0],
+                'status': self._status,
+                'bytes': sent,
+                'duration_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            }
+        )
+    
     def log_message(self, format, *args):
-        """Override to use print instead of stderr"""
-        print(f"{self.address_string()} - {format % args}")
+        """Log to the queue instead of writing to stderr"""
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """
+    Thread per connection, with at most max_workers requests processed at once
+    (taken per request by DashboardHandler, so idle keep-alive connections
+    don't count). The accept loop never waits: past max_connections open
+    connections, new ones are closed straight away.
+    """
+    
+    def __init__(self, server_address, handler_class, max_workers=SERVER_MAX_WORKERS,
+                 max_connections=SERVER_MAX_CONNECTIONS):
+        super().__init__(server_address, handler_class)
+        self.max_workers = max_workers
+        self.workers = threading.BoundedSemaphore(max_workers)
+        self.max_connections = max_connections
+        self.connections = threading.BoundedSemaphore(max_connections)
+    
+    def process_request(self, request, client_address):
+        if not self.connections.acquire(blocking=False):
+            logger.warning("⚠ %d connections open, closing new connection from %s",
+                           self.max_connections, client_address[0])
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.connections.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.connections.release()
 
 
-def run(server_class=HTTPServer, handler_class=DashboardHandler, port=8000):
+def run(server_class=None, handler_class=DashboardHandler, port=8000):
     """Run the server"""
+    if server_class is None:
+        server_class = DashboardServer if SERVER_THREADED else HTTPServer
     server_address = ('', port)
     httpd = server_class(server_address, handler_class)
-    print(f"🚀 Dashboard server running on http://localhost:{port}")
-    print(f"📁 Serving files from: {os.getcwd()}")
-    print(f"💾 Settings stored in: {SETTINGS_FILE}")
-    print("\nPress Ctrl+C to stop the server\n")
+    logger.info("🚀 Dashboard server running on http://localhost:%d", port)
+    if isinstance(httpd, DashboardServer):
+        caps = ', '.join(f"{path} {limit}" for path, limit in ROUTE_LIMITS.items())
+        logger.info("🧵 Threaded: up to %d requests at once on %d connections (route caps: %s)",
+                    httpd.max_workers, httpd.max_connections, caps)
+    else:
+        logger.info("🧵 Single-threaded (SERVER_THREADED=0)")
+    logger.info("📁 Serving files from: %s", os.getcwd())
+    logger.info("💾 Settings stored in: %s", SETTINGS_FILE)
+    logger.info("📦 Static assets preloaded: %s", STATIC_ASSETS.prewarm())
+    logger.info("💾 Restored %d cached responses from %s",
+                CALENDAR_CACHE.restore() + HA_CACHE.restore(), persistent_cache.path)
+    VERSION.start_thread()
+    logger.info("🏷  Version %s (checked every %gs)", VERSION.version, VERSION.interval)
+    logger.info("Press Ctrl+C to stop the server")
+    
+    def terminate(signum, frame):
+        # systemd stops us with SIGTERM, which skips atexit hooks unless handled.
+        # shutdown() waits for serve_forever() to return, so not from this (its) thread
+        threading.Thread(target=httpd.shutdown, name='shutdown', daemon=True).start()
+    
+    signal.signal(signal.SIGTERM, terminate)
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n\n👋 Server stopped")
-        httpd.server_close()
+        pass
+    httpd.server_close()
+    VERSION.stop()
+    # Pending settings, cached responses and log records
+    SETTINGS.flush()
+    persistent_cache.close()
+    logger.info("👋 Server stopped")
+    stop_logging()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,10 @@
+"""
+Unit tests for the standard-library services in backend/services.
+Run from the repository root: python -m pytest tests
+(test-backend.py is the manual smoke test against a running backend.)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,104 @@
+"""Bootstrap endpoint: sections gathered concurrently, failures isolated"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.routers import bootstrap
+
+
+async def fast(settings):
+    return {"theme": settings['theme']}
+
+
+async def slow(settings):
+    await asyncio.sleep(0.2)
+    return {"slow": True}
+
+
+async def hangs(settings):
+    await asyncio.sleep(10)
+
+
+async def broken(settings):
+    raise RuntimeError('boom')
+
+
+async def unavailable(settings):
+    raise HTTPException(status_code=503, detail="Home Assistant hub is not running")
+
+
+async def unreachable(settings):
+    raise httpx.ConnectError('refused')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    sections = {"fast": fast, "slow": slow, "hangs": hangs, "broken": broken,
+                "unavailable": unavailable, "unreachable": unreachable}
+    monkeypatch.setattr(bootstrap, 'SECTIONS', sections)
+    monkeypatch.setattr(bootstrap, 'BOOTSTRAP_SECTION_TIMEOUT', 0.5)
+
+    async def read_settings():
+        return {"theme": "dark"}
+
+    monkeypatch.setattr(bootstrap, 'read_settings', read_settings)
+    app = FastAPI()
+    app.include_router(bootstrap.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_failed_sections_are_reported_next_to_the_others(client):
+    response = client.get('/api/bootstrap')
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['fast'] == {"theme": "dark"} and body['slow'] == {"slow": True}
+    assert body['hangs'] is None and body['broken'] is None
+    assert body['errors'] == {
+        "hangs": "Timed out",
+        "broken": "Unexpected error: boom",
+        "unavailable": "Home Assistant hub is not running",
+        "unreachable": "Upstream request failed: refused",
+    }
+
+
+def test_selected_sections_only(client):
+    assert client.get('/api/bootstrap', params={"sections": "fast, slow"}).json() == {
+        "fast": {"theme": "dark"}, "slow": {"slow": True}, "errors": {},
+    }
+    response = client.get('/api/bootstrap', params={"sections": "fast,nope"})
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Unknown sections: nope"
+
+
+def test_stream_sends_each_section_as_it_finishes(client):
+    response = client.get('/api/bootstrap', params={"stream": "1"})
+
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    order = [line['section'] for line in lines]
+    assert sorted(order) == sorted(bootstrap.SECTIONS)
+    assert order.index('fast') < order.index('slow') < order.index('hangs')
+    by_name = {line['section']: line for line in lines}
+    assert by_name['fast']['data'] == {"theme": "dark"}
+    assert by_name['broken'] == {"section": "broken", "error": "Unexpected error: boom",
+                                 "elapsed_ms": by_name['broken']['elapsed_ms']}
+    assert by_name['hangs']['error'] == "Timed out"
+
+
+def test_dashboard_entities():
+    settings = {
+        "homeAssistant": {"entities": [{"entityId": "light.kitchen"}, "sensor.temp", {"name": "no id"}]},
+        "weather": {"weatherEntity": "weather.cabin"},
+        "spotify": {},
+    }
+
+    assert bootstrap.dashboard_entities(settings) == ['light.kitchen', 'sensor.temp', 'weather.cabin',
+                                                      'media_player.spotify']
+    assert bootstrap.dashboard_entities({}) == ['weather.home', 'weather.kbil', 'media_player.spotify']
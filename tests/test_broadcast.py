@@ -0,0 +1,41 @@
+"""Server-sent event fan-out"""
+
+import asyncio
+
+from backend.services.broadcast import Broadcaster, ServerEvent
+
+
+def test_encode():
+    assert ServerEvent(3, 'settings', {"theme": "dark"}).encode() == \
+        'id: 3\nevent: settings\ndata: {"theme": "dark"}\n\n'
+
+
+def test_every_subscriber_gets_every_event():
+    async def main():
+        broadcaster = Broadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish('calendar', {"feeds": 2})
+        broadcaster.unsubscribe(second)
+        broadcaster.publish('settings')
+        return [await first.get(1), await first.get(1)], await second.get(1), await second.get(0.01)
+
+    (one, two), other, timed_out = asyncio.run(main())
+
+    assert (one.id, one.name, one.data) == (1, 'calendar', {"feeds": 2})
+    assert (two.id, two.name, two.data) == (2, 'settings', {})
+    assert other.id == 1
+    assert timed_out is None
+
+
+def test_slow_subscriber_loses_its_oldest_events():
+    async def main():
+        broadcaster = Broadcaster(max_queue=2)
+        subscription = broadcaster.subscribe()
+        for i in range(5):
+            broadcaster.publish('tick', i)
+        return [(await subscription.get(1)).data for _ in range(2)], broadcaster.stats()
+
+    data, stats = asyncio.run(main())
+
+    assert data == [3, 4]
+    assert stats == {"clients": 1, "published": 5, "dropped": 3}
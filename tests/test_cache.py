@@ -0,0 +1,180 @@
+"""ResponseCache: freshness, stale-while-revalidate, single-flight fetches and LRU eviction"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.services.cache import CachedResponse, ResponseCache
+
+
+class Upstream:
+    """Counts fetches; each returns the next value"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def next(self):
+        value = self.values[min(self.calls, len(self.values) - 1)]
+        self.calls += 1
+        return value
+
+    async def fetch(self):
+        await asyncio.sleep(0.01)
+        return self.next()
+
+
+def test_fresh_entry_is_a_hit():
+    cache = ResponseCache(ttl=60)
+    cache.set('k', 'v')
+    upstream = Upstream('new')
+
+    assert asyncio.run(cache.get_or_fetch('k', upstream.fetch)) == ('v', 'hit')
+    assert upstream.calls == 0
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResponseCache(ttl=0, stale_ttl=0)
+    cache.set('k', 'old')
+    upstream = Upstream('new')
+
+    assert asyncio.run(cache.get_or_fetch('k', upstream.fetch)) == ('new', 'miss')
+    assert cache.get_entry('k').value == 'new'
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = ResponseCache(ttl=0, stale_ttl=60)
+    cache.set('k', 'old')
+    upstream = Upstream('new')
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_fetch('k', upstream.fetch) for _ in range(5)))
+        await asyncio.sleep(0.05)  # Let the background refresh finish
+        return results
+
+    assert asyncio.run(scenario()) == [('old', 'stale')] * 5
+    assert upstream.calls == 1
+    assert cache.get_entry('k').value == 'new'
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache()
+    upstream = Upstream('v')
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch('k', upstream.fetch) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == [('v', 'miss')] * 10
+    assert upstream.calls == 1
+
+
+def test_failed_fetch_is_not_cached():
+    cache = ResponseCache()
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_fetch('k', failing))
+    assert cache.get_entry('k') is None
+    assert cache.stats()['errors'] == 1
+    assert asyncio.run(cache.get_or_fetch('k', Upstream('v').fetch)) == ('v', 'miss')
+
+
+def test_get_or_start_returns_the_shared_task_on_a_miss():
+    cache = ResponseCache()
+    upstream = Upstream('v')
+
+    async def scenario():
+        first = cache.get_or_start('k', upstream.fetch)
+        second = cache.get_or_start('k', upstream.fetch)
+        assert first[2] is True and second[2] is False
+        assert first[1] is second[1]
+        return await first[1]
+
+    assert asyncio.run(scenario()) == 'v'
+    assert cache.get_or_start('k', upstream.fetch) == ('hit', 'v', False)
+    assert upstream.calls == 1
+
+
+def test_sync_concurrent_misses_share_one_fetch():
+    cache = ResponseCache()
+    upstream = Upstream('v')
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        return upstream.next()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch_sync('k', fetch)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [('v', 'miss')] * 8
+    assert upstream.calls == 1
+
+
+def test_sync_waiters_share_the_error():
+    cache = ResponseCache()
+
+    def fetch():
+        raise ValueError("bad feed")
+
+    with pytest.raises(ValueError):
+        cache.get_or_fetch_sync('k', fetch)
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_lru_evicts_least_recently_used():
+    evicted = []
+    cache = ResponseCache(max_entries=2, on_evict=evicted.append)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get_entry('a')  # a is now more recent than b
+    cache.set('c', 3)
+
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert evicted == ['b']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_and_clear_report_evictions():
+    evicted = []
+    cache = ResponseCache(on_evict=evicted.append)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.invalidate('a')
+    cache.invalidate('missing')
+    cache.clear()
+
+    assert evicted == ['a', 'b']
+
+
+def test_cached_response_keeps_last_modified_when_body_is_unchanged():
+    original = CachedResponse(body=b'BEGIN:VCALENDAR', content_type='text/calendar',
+                              upstream_etag='"u1"', last_modified=1000.0)
+    same = original.revalidated(b'BEGIN:VCALENDAR', 'text/calendar', None, None)
+    changed = original.revalidated(b'BEGIN:VCALENDAR\r\n', 'text/calendar', '"u2"', None)
+
+    assert same.etag == original.etag and same.last_modified == 1000.0
+    assert same.upstream_etag == '"u1"'
+    assert changed.etag != original.etag and changed.last_modified > 1000.0
+
+
+def test_cached_response_round_trips_through_bytes():
+    response = CachedResponse(body=b'a\nb', content_type='text/calendar', upstream_last_modified='x')
+
+    assert CachedResponse.from_bytes(response.to_bytes()) == response
@@ -0,0 +1,125 @@
+"""MJPEG multipart parsing and the shared camera relay"""
+
+import queue
+
+import pytest
+
+from backend.services.camera_relay import (
+    FrameTooLarge, MultipartParser, NotMultipart, RelayRegistry, boundary_of, encode_frame,
+)
+
+STREAM = (
+    b'preamble\r\n'
+    b'--myboundary\r\nContent-Type: image/jpeg\r\nContent-Length: 5\r\n\r\nJPEG1\r\n'
+    b'--myboundary\r\nContent-Type: image/png\r\n\r\nPNG2\r\n'
+    b'--myboundary\r\n\r\nJPEG3\r\n'
+    b'--myboundary\r\n'
+)
+
+
+class FakeUpstream:
+    """Streaming response whose chunks arrive when the test puts them"""
+
+    def __init__(self, content_type='multipart/x-mixed-replace; boundary=myboundary'):
+        self.headers = {'Content-Type': content_type}
+        self.chunks: 'queue.Queue[bytes]' = queue.Queue()
+        self.closed = False
+
+    def read(self, size):
+        return self.chunks.get(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closed = True
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 17, len(STREAM)])
+def test_parser_splits_frames_across_chunks(chunk_size):
+    parser = MultipartParser('myboundary')
+    frames = []
+    for i in range(0, len(STREAM), chunk_size):
+        frames += parser.feed(STREAM[i:i + chunk_size])
+
+    assert frames == [('image/jpeg', b'JPEG1'), ('image/png', b'PNG2'), ('image/jpeg', b'JPEG3')]
+
+
+def test_parser_accepts_a_boundary_declared_with_dashes():
+    parser = MultipartParser('--myboundary')
+
+    assert parser.feed(STREAM)[0] == ('image/jpeg', b'JPEG1')
+
+
+def test_parser_gives_up_without_a_boundary():
+    parser = MultipartParser('myboundary', max_frame=100)
+    parser.feed(b'--myboundary\r\n\r\n' + b'x' * 50)
+    with pytest.raises(FrameTooLarge):
+        parser.feed(b'x' * 100)
+
+
+def test_boundary_of():
+    assert boundary_of('multipart/x-mixed-replace; boundary=frame') == 'frame'
+    assert boundary_of('multipart/x-mixed-replace;boundary="--my frame"') == '--my frame'
+    assert boundary_of('multipart/x-mixed-replace') is None
+    assert boundary_of('image/jpeg; boundary=frame') is None
+
+
+def test_encoded_frames_parse_back():
+    data = encode_frame('image/jpeg', b'JPEG\r\n--x') + encode_frame('image/jpeg', b'two') + b'--frame\r\n'
+
+    assert MultipartParser('frame').feed(data) == [('image/jpeg', b'JPEG\r\n--x'), ('image/jpeg', b'two')]
+
+
+def test_viewers_share_one_upstream():
+    upstream = FakeUpstream()
+    opened = []
+
+    def open_stream():
+        opened.append(upstream)
+        return upstream
+
+    relays = RelayRegistry()
+    first = relays.subscribe('cam', open_stream)
+    second = relays.subscribe('cam', open_stream)
+    assert first is second and len(opened) == 1
+
+    upstream.chunks.put(STREAM)
+    seq, frame = first.next_frame(0, timeout=5)
+    while seq < 3:
+        seq, frame = first.next_frame(seq, timeout=5)
+    assert frame == encode_frame('image/jpeg', b'JPEG3')
+    assert second.next_frame(1, timeout=5)[1] == encode_frame('image/png', b'PNG2')
+
+    relays.unsubscribe(first)
+    assert not first.closed
+    relays.unsubscribe(second)
+    upstream.chunks.put(b'')
+    assert first.next_frame(seq, timeout=5) is None
+    assert relays.stats()['cameras'] == 0
+
+
+def test_slow_viewer_skips_to_the_newest_frame():
+    upstream = FakeUpstream()
+    relays = RelayRegistry()
+    relay = relays.subscribe('cam', lambda: upstream)
+    relay._ring = type(relay._ring)(maxlen=2)
+    upstream.chunks.put(STREAM)
+    relay._cond.acquire()
+    relay._cond.wait_for(lambda: relay.frames_in == 3, 5)
+    relay._cond.release()
+
+    assert relay.next_frame(0, timeout=5)[0] == 3
+    assert relay.next_frame(1, timeout=5)[0] == 2
+    relays.unsubscribe(relay)
+    upstream.chunks.put(b'')
+
+
+def test_non_multipart_upstream_is_handed_to_the_first_viewer():
+    upstream = FakeUpstream('image/jpeg')
+    relays = RelayRegistry()
+    with pytest.raises(NotMultipart) as excinfo:
+        relays.subscribe('cam', lambda: upstream)
+
+    assert excinfo.value.response is upstream
+    assert relays.stats()['cameras'] == 0
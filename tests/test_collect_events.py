@@ -0,0 +1,117 @@
+"""Aggregating events across feeds: window, duplicates and per-feed errors"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from backend.routers import calendar
+from backend.services import http_client
+from backend.services.cache import ResponseCache
+from backend.services.event_index import EventIndex
+from backend.services.event_store import EventStore
+
+UTC = timezone.utc
+DAY = (datetime.now(UTC) + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+WINDOW = (DAY, DAY + timedelta(days=1))
+
+
+def stamp(dt):
+    return dt.strftime('%Y%m%dT%H%M%SZ')
+
+
+def vevent(uid, hour, title=None, recurrence_id=None, day=DAY):
+    start = day + timedelta(hours=hour)
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'SUMMARY:{title or uid}',
+             f'DTSTART:{stamp(start)}', f'DTEND:{stamp(start + timedelta(hours=1))}']
+    if recurrence_id is not None:
+        lines.append(f'RECURRENCE-ID:{stamp(recurrence_id)}')
+    return lines + ['END:VEVENT']
+
+
+def feed(*events):
+    return '\r\n'.join(['BEGIN:VCALENDAR', 'VERSION:2.0', *sum(events, []), 'END:VCALENDAR', '']).encode()
+
+
+FEEDS = {
+    'https://example.com/family.ics': feed(
+        vevent('standup', 9),
+        vevent('standup', 9),  # Listed twice by the feed
+        vevent('weekly', 12, recurrence_id=DAY + timedelta(hours=11)),
+        vevent('later', 9, day=DAY + timedelta(days=10)),
+    ),
+    'https://example.com/work.ics': feed(vevent('standup', 9, title='Standup (work)'), vevent('early', 7)),
+    'https://example.com/broken.ics': None,
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    def handler(request):
+        url = str(request.url)
+        if url == 'https://example.com/offline.ics':
+            raise httpx.ConnectError('refused')
+        body = FEEDS.get(url)
+        if body is None:
+            return httpx.Response(500)
+        return httpx.Response(200, headers={'Content-Type': 'text/calendar'}, stream=httpx.ByteStream(body))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, 'get_client', lambda: client)
+    index = EventIndex()
+    monkeypatch.setattr(calendar, 'event_index', index)
+    monkeypatch.setattr(calendar, 'calendar_cache', ResponseCache(ttl=300, on_evict=index.remove))
+    monkeypatch.setattr(calendar, 'event_store', EventStore(str(tmp_path / 'events.sqlite3')))
+
+
+def feeds(*names):
+    return [{"name": name, "url": f'https://example.com/{name}.ics', "color": f'#{name[:3]}'} for name in names]
+
+
+def collect(*names, window=WINDOW):
+    return asyncio.run(calendar.collect_events(feeds(*names), *window))
+
+
+def test_merges_feeds_in_order_within_the_window(upstream):
+    events, status = collect('family', 'work')
+
+    assert [(e['id'], e['feed']) for e in events] == [
+        ('early', 'work'), ('standup', 'family'), ('standup', 'work'), ('weekly', 'family'),
+    ]
+    assert events[0] == {"id": "early", "title": "early", "start": (DAY + timedelta(hours=7)).isoformat(),
+                         "end": (DAY + timedelta(hours=8)).isoformat(), "isAllDay": False,
+                         "feed": "work", "color": "#wor"}
+    assert [(s['name'], s['ok'], s['cache']) for s in status] == [('family', True, 'miss'), ('work', True, 'miss')]
+
+
+def test_duplicates_are_dropped_within_a_feed_only(upstream):
+    events, status = collect('family', 'work')
+
+    standups = [e for e in events if e['id'] == 'standup']
+    assert [e['title'] for e in standups] == ['standup', 'Standup (work)']
+    assert [s['events'] for s in status] == [2, 2]
+
+
+def test_window_bounds_the_events(upstream):
+    later = DAY + timedelta(days=10)
+    events, _ = collect('family', window=(later, later + timedelta(days=1)))
+
+    assert [e['id'] for e in events] == ['later']
+
+
+def test_failed_feeds_are_reported_without_failing_the_rest(upstream):
+    events, status = collect('family', 'broken', 'offline')
+
+    assert {e['feed'] for e in events} == {'family'}
+    assert status[1] == {"name": "broken", "color": "#bro", "ok": False,
+                         "error": "Calendar feed returned 500", "elapsed_ms": status[1]['elapsed_ms']}
+    assert status[2]['ok'] is False
+    assert status[2]['error'] == 'Failed to fetch calendar feed: refused'
+
+
+def test_second_request_is_served_from_the_cache(upstream):
+    collect('family')
+    _, status = collect('family')
+
+    assert status[0]['cache'] == 'hit'
@@ -0,0 +1,160 @@
+"""Persistent response cache on SQLite and restoring it into ResponseCache"""
+
+import threading
+import time
+
+import pytest
+
+from backend.services.cache import CachedResponse, ResponseCache
+from backend.services.disk_cache import DiskCache, Persistence
+
+
+@pytest.fixture
+def disk(tmp_path):
+    disk = DiskCache(str(tmp_path / 'responses.sqlite3'))
+    yield disk
+    disk.close()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_put_and_get(disk):
+    disk.put('a', b'one', stored_at=100.0, ttl=30.0)
+    assert disk.get('a') == (b'one', 100.0, 30.0)  # Served from the queue before it is written
+
+    disk.flush()
+    assert disk.get('a') == (b'one', 100.0, 30.0)
+    assert disk.stats()['entries'] == 1
+    assert disk.get('missing') is None
+
+
+def test_values_are_written_in_the_background(disk):
+    disk.put('a', lambda: b'lazy', stored_at=100.0, ttl=30.0)
+
+    wait_for(lambda: disk.writes == 1)
+    assert disk.get('a') == (b'lazy', 100.0, 30.0)
+
+
+def test_min_interval_defers_writes_and_keeps_the_latest_value(disk):
+    disk.put('a', b'1', 100.0, 30.0, min_interval=0.3)
+    wait_for(lambda: disk.writes == 1)
+    disk.put('a', b'2', 101.0, 30.0, min_interval=0.3)
+    disk.put('a', b'3', 102.0, 30.0, min_interval=0.3)
+    time.sleep(0.1)
+
+    assert disk.writes == 1 and disk.stats()['pending'] == 1
+    wait_for(lambda: disk.writes == 2)
+    assert disk.get('a') == (b'3', 102.0, 30.0)
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path):
+    disk = DiskCache(str(tmp_path / 'responses.sqlite3'), max_bytes=10)
+    for key in 'abc':
+        disk.put(key, b'12345', 100.0, 30.0)
+        disk.flush()
+        time.sleep(0.01)
+
+    assert disk.get('a') is None
+    assert disk.get('c') is not None
+    assert disk.evictions == 1
+    disk.close()
+
+
+def test_delete(disk):
+    disk.put('a', b'one', 100.0, 30.0)
+    disk.flush()
+    disk.delete('a')
+
+    assert disk.get('a') is None  # Before the delete is written
+    disk.flush()
+    assert disk.get('a') is None
+    assert disk.stats()['entries'] == 0
+
+    disk.delete('b')
+    disk.put('b', b'two', 100.0, 30.0)
+    disk.flush()
+    assert disk.get('b') == (b'two', 100.0, 30.0)
+
+
+def test_queueing_does_not_wait_for_a_write_in_progress(disk):
+    writing = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        writing.set()
+        release.wait(5)
+        return b'slow'
+
+    disk.put('a', slow, 100.0, 30.0)
+    assert writing.wait(5)
+    started = time.monotonic()
+    disk.put('b', b'two', 100.0, 30.0)
+    disk.delete('c')
+    assert time.monotonic() - started < 1
+    release.set()
+
+    wait_for(lambda: disk.writes == 2)
+    assert disk.get('a') == (b'slow', 100.0, 30.0)
+
+
+def test_closed_cache_drops_writes(disk):
+    disk.close()
+    disk.put('a', b'one', 100.0, 30.0)
+
+    assert disk.get('a') is None
+
+
+def test_unusable_path_disables_the_cache(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    disk = DiskCache(str(blocker / 'responses.sqlite3'))
+
+    assert disk.get('a') is None
+    assert not disk.enabled
+
+
+def test_persistence_is_namespaced(disk):
+    calendar = Persistence(disk, 'calendar', CachedResponse, write_interval=0)
+    weather = Persistence(disk, 'weather', CachedResponse, write_interval=0)
+    calendar.save('feed', CachedResponse(b'BEGIN:VCALENDAR', 'text/calendar', upstream_etag='"v1"'), ttl=300)
+    weather.save('oslo', CachedResponse(b'{}', 'application/json'), ttl=60)
+    disk.flush()
+
+    [(key, value, age, ttl)] = calendar.load_all(10)
+    assert key == 'feed' and ttl == 300 and age < 5
+    assert value.body == b'BEGIN:VCALENDAR' and value.upstream_etag == '"v1"'
+    assert disk.get('calendar:feed') is not None
+
+
+def test_entries_older_than_the_restore_ttl_are_skipped(disk):
+    persistence = Persistence(disk, 'calendar', CachedResponse, restore_ttl=60)
+    disk.put('calendar:old', CachedResponse(b'x', 'text/plain').to_bytes(), time.time() - 120, 30.0)
+    disk.put('calendar:bad', b'not json\nbody', time.time(), 30.0)
+    disk.flush()
+
+    assert persistence.load_all(10) == []
+
+
+def test_restore_keeps_the_most_recently_used_entries(disk):
+    persistence = Persistence(disk, 'calendar', CachedResponse, write_interval=0)
+    writer = ResponseCache(ttl=300, max_entries=3, persistence=persistence)
+    for key in ('a', 'b', 'c'):
+        writer.set(key, CachedResponse(key.encode(), 'text/plain'))
+        disk.flush()
+        time.sleep(0.01)  # Entries written together share their used_at
+    disk.get('calendar:a')  # Now the most recently used
+
+    cache = ResponseCache(ttl=300, max_entries=2, persistence=persistence)
+    assert cache.restore() == 2
+    assert 'b' not in cache
+    assert cache.get_entry('a').value.body == b'a'
+    assert cache.get_entry('c').value.body == b'c'
+    assert cache.get_entry('a').is_fresh(time.monotonic())
+
+    cache.set('d', CachedResponse(b'd', 'text/plain'))  # 'c' was restored before 'a', so it goes first
+    assert 'c' not in cache and 'a' in cache
@@ -0,0 +1,88 @@
+"""Interval index over normalized calendar events"""
+
+from datetime import datetime, timedelta, timezone
+
+from backend.services.event_index import EventIndex, FeedIndex
+from backend.services.ics import Event
+
+UTC = timezone.utc
+WINDOW = (datetime(2025, 3, 10, tzinfo=UTC), datetime(2025, 3, 17, tzinfo=UTC))
+
+
+def event(uid, start, duration=timedelta(hours=1), rrule=None, recurrence_id=None):
+    return Event(uid=uid, title=uid, start=start, end=start + duration, all_day=False, location=None,
+                 description=None, rrule=rrule, rdates=(), exdates=frozenset(), recurrence_id=recurrence_id)
+
+
+def uids(events):
+    return sorted({e.uid.split('_')[0] for e in events})
+
+
+def test_single_events_inside_and_overlapping_the_window():
+    index = FeedIndex('v', [
+        event('before', datetime(2025, 3, 1, tzinfo=UTC)),
+        event('inside', datetime(2025, 3, 12, tzinfo=UTC)),
+        event('spans-start', datetime(2025, 3, 9, 23, tzinfo=UTC), timedelta(hours=2)),
+        event('at-end', WINDOW[1]),
+        event('after', datetime(2025, 3, 20, tzinfo=UTC)),
+    ])
+
+    assert uids(index.query(*WINDOW)) == ['inside', 'spans-start']
+
+
+def test_long_events_are_found_from_far_before_the_window():
+    index = FeedIndex('v', [
+        event('vacation', datetime(2025, 2, 1, tzinfo=UTC), timedelta(days=60)),
+        event('ended', datetime(2025, 1, 1, tzinfo=UTC), timedelta(days=30)),
+    ])
+
+    assert uids(index.query(*WINDOW)) == ['vacation']
+    assert len(index.long_events) == 2
+
+
+def test_only_series_running_during_the_window_are_expanded():
+    index = FeedIndex('v', [
+        event('finished', datetime(2024, 1, 1, 9, tzinfo=UTC), rrule='FREQ=DAILY;UNTIL=20240201T000000Z'),
+        event('running', datetime(2025, 1, 6, 9, tzinfo=UTC), rrule='FREQ=WEEKLY'),
+        event('future', datetime(2026, 1, 1, 9, tzinfo=UTC), rrule='FREQ=DAILY'),
+    ])
+
+    assert uids(index.query(*WINDOW)) == ['running']
+    assert index.master_starts == sorted(index.master_starts)
+    assert index.master_ends == sorted(index.master_ends)
+
+
+def test_overridden_occurrences_are_not_expanded_from_the_master():
+    moved_from = datetime(2025, 3, 11, 9, tzinfo=UTC)
+    index = FeedIndex('v', [
+        event('daily', datetime(2025, 3, 1, 9, tzinfo=UTC), rrule='FREQ=DAILY'),
+        event('daily', datetime(2025, 3, 11, 15, tzinfo=UTC), recurrence_id=moved_from),
+    ])
+
+    starts = [e.start for e in index.query(*WINDOW)]
+
+    assert len(starts) == 7
+    assert moved_from not in starts
+    assert datetime(2025, 3, 11, 15, tzinfo=UTC) in starts
+
+
+def test_feeds_are_rebuilt_only_when_their_version_changes():
+    index = EventIndex()
+    events = [event('a', datetime(2025, 3, 12, tzinfo=UTC))]
+
+    assert index.update('feed', 'v1', events)
+    assert not index.update('feed', 'v1', events)
+    assert index.update('feed', 'v2', events + [event('b', datetime(2025, 3, 13, tzinfo=UTC))])
+    assert index.stats()['rebuilds'] == 2
+    assert index.version('feed') == 'v2'
+
+
+def test_query_selected_feeds_and_remove():
+    index = EventIndex()
+    index.update('one', 'v', [event('a', datetime(2025, 3, 12, tzinfo=UTC))])
+    index.update('two', 'v', [event('b', datetime(2025, 3, 13, tzinfo=UTC))])
+
+    assert [(key, e.uid) for key, e in index.query(*WINDOW, keys=['two', 'missing'])] == [('two', 'b')]
+    index.remove('two')
+    assert [key for key, _ in index.query(*WINDOW)] == ['one']
+    assert index.stats()['feeds'] == 1
@@ -0,0 +1,81 @@
+"""Compacted calendar feeds stored on disk by feed URL and content hash"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from backend.services.event_store import EventStore, dump_datetime, load_datetime
+from backend.services.ics import Event
+
+DENVER = ZoneInfo('America/Denver')
+
+
+def event(uid, start, **kwargs):
+    fields = dict(uid=uid, title=uid.title(), start=start, end=start + timedelta(hours=1), all_day=False,
+                  location='', description='', rrule=None, rdates=(), exdates=frozenset(), recurrence_id=None)
+    fields.update(kwargs)
+    return Event(**fields)
+
+
+def test_datetimes_keep_their_zone():
+    for dt in (datetime(2026, 3, 8, 9, tzinfo=DENVER),
+               datetime(2026, 3, 8, 9, tzinfo=timezone.utc),
+               datetime(2026, 3, 8, 9, tzinfo=timezone(timedelta(hours=-5, minutes=-30)))):
+        loaded = load_datetime(dump_datetime(dt))
+        assert loaded == dt and loaded.utcoffset() == dt.utcoffset()
+
+    assert load_datetime(dump_datetime(datetime(2026, 3, 8, 9, tzinfo=DENVER))).tzinfo is DENVER
+
+
+def test_round_trip(tmp_path):
+    start = datetime(2026, 3, 1, 9, tzinfo=DENVER)
+    events = [
+        event('weekly', start, rrule='FREQ=WEEKLY', rdates=(start + timedelta(days=2),),
+              exdates=frozenset({start + timedelta(weeks=1)}), location='Room 1', description='Notes ☕'),
+        event('weekly', start + timedelta(weeks=2, hours=1), recurrence_id=start + timedelta(weeks=2)),
+        event('holiday', datetime(2026, 7, 4, tzinfo=DENVER), all_day=True),
+    ]
+    store = EventStore(str(tmp_path / 'events.sqlite3'))
+    store.save('https://example.com/a.ics', 'v1', events)
+
+    assert store.load('https://example.com/a.ics', 'v1') == events
+    store.close()
+    assert EventStore(str(tmp_path / 'events.sqlite3')).load('https://example.com/a.ics', 'v1') == events
+
+
+def test_only_the_exact_version_is_loaded(tmp_path):
+    store = EventStore(str(tmp_path / 'events.sqlite3'))
+    store.save('feed', 'v1', [event('a', datetime(2026, 3, 1, tzinfo=DENVER))])
+    store.save('feed', 'v2', [])
+
+    assert store.load('feed', 'v1') is None
+    assert store.load('feed', 'v2') == []
+    assert store.load('other', 'v2') is None
+    assert store.stats()['feeds'] == 1
+    assert (store.hits, store.misses, store.saves) == (1, 2, 2)
+
+
+def test_unusable_store_is_disabled(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    store = EventStore(str(blocker / 'events.sqlite3'))
+    store.save('feed', 'v1', [])
+
+    assert store.load('feed', 'v1') is None
+    assert store.stats()['enabled'] is False
+    assert EventStore('').load('feed', 'v1') is None
+
+
+def test_least_recently_used_feeds_are_dropped_over_the_cap(tmp_path):
+    store = EventStore(str(tmp_path / 'events.sqlite3'), max_feeds=2)
+    for feed in ('configured', 'adhoc-1'):
+        store.save(feed, 'v1', [])
+        time.sleep(0.01)
+    store.load('configured', 'v1')  # Still in use
+    time.sleep(0.01)
+    store.save('adhoc-2', 'v1', [])
+
+    assert store.load('adhoc-1', 'v1') is None
+    assert store.load('configured', 'v1') == []
+    assert store.load('adhoc-2', 'v1') == []
+    assert store.stats()['feeds'] == 2 and store.evictions == 1
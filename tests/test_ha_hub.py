@@ -0,0 +1,60 @@
+"""Home Assistant state fan-out to dashboards"""
+
+import asyncio
+
+from backend.services.ha_hub import HomeAssistantHub, compact_state
+
+
+def state(entity_id, value, **extra):
+    return {"entity_id": entity_id, "state": value, "context": {"id": "x"}, "last_reported": "now", **extra}
+
+
+def test_compact_state():
+    assert compact_state(state('light.kitchen', 'on')) == {"entity_id": "light.kitchen", "state": "on"}
+
+
+def test_updates_go_only_to_dashboards_showing_the_entity():
+    async def main():
+        hub = HomeAssistantHub()
+        kitchen = hub.subscribe(['light.kitchen'])
+        everything = hub.subscribe()
+        hub._load_states([state('light.kitchen', 'off'), state('sensor.temp', '20')])
+        first = await kitchen.next_batch(1)
+        hub._apply_change('sensor.temp', state('sensor.temp', '21'))
+        hub._apply_change('light.kitchen', None)
+        return hub, first, await kitchen.next_batch(1), await everything.next_batch(1), \
+            await kitchen.next_batch(0.01)
+
+    hub, first, second, everything, idle = asyncio.run(main())
+
+    assert first == {"light.kitchen": {"entity_id": "light.kitchen", "state": "off"}}
+    assert second == {"light.kitchen": None}
+    # Coalesced: only the latest state of each entity is pending
+    assert everything == {"light.kitchen": None, "sensor.temp": {"entity_id": "sensor.temp", "state": "21"}}
+    assert idle == {}
+    assert hub.states == {"sensor.temp": {"entity_id": "sensor.temp", "state": "21"}}
+
+
+def test_reloading_states_reports_removed_entities():
+    async def main():
+        hub = HomeAssistantHub()
+        hub._load_states([state('light.a', 'on'), state('light.b', 'on')])
+        subscription = hub.subscribe()
+        hub._load_states([state('light.a', 'off')])
+        return hub, await subscription.next_batch(1)
+
+    hub, batch = asyncio.run(main())
+
+    assert batch == {"light.a": {"entity_id": "light.a", "state": "off"}, "light.b": None}
+    assert hub.snapshot(hub.subscribe(['light.b'])) == {}
+
+
+def test_no_connection_without_url_and_token():
+    async def main():
+        hub = HomeAssistantHub()
+        hub.configure('http://ha.local:8123/', None)
+        return hub
+
+    hub = asyncio.run(main())
+
+    assert hub.url == 'http://ha.local:8123' and not hub.enabled
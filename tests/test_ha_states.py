@@ -0,0 +1,55 @@
+"""Home Assistant proxy: cache keys, state filtering and stored responses"""
+
+from backend.services.ha_states import UpstreamResponse, cache_key, filter_states, split_param
+
+STATES = [
+    {"entity_id": "light.kitchen", "state": "on", "attributes": {"brightness": 200},
+     "last_changed": "t1", "context": {"id": "c1"}},
+    {"entity_id": "sensor.outside", "state": "21.5", "attributes": {"unit_of_measurement": "°C"},
+     "last_changed": "t2", "context": {"id": "c2"}},
+]
+
+
+def test_cache_key_separates_tokens_without_storing_them():
+    key = cache_key('http://ha:8123/api/states', 'secret-token')
+
+    assert 'secret-token' not in key
+    assert key != cache_key('http://ha:8123/api/states', 'other-token')
+    assert key == cache_key('http://ha:8123/api/states', 'secret-token')
+
+
+def test_split_param():
+    assert split_param(' light.a, ,sensor.b ') == ['light.a', 'sensor.b']
+    assert split_param('') is None
+    assert split_param(None) is None
+
+
+def test_unfiltered_states_are_returned_as_is():
+    assert filter_states(STATES) is STATES
+
+
+def test_filter_by_entity_and_field():
+    assert filter_states(STATES, ['sensor.outside'], ['state']) == [
+        {"entity_id": "sensor.outside", "state": "21.5"}
+    ]
+
+
+def test_entity_filter_keeps_the_default_fields():
+    trimmed = filter_states(STATES, ['light.kitchen'])
+
+    assert [s['entity_id'] for s in trimmed] == ['light.kitchen']
+    assert 'context' not in trimmed[0]
+    assert trimmed[0]['attributes'] == {"brightness": 200}
+
+
+def test_single_state_and_other_payloads():
+    assert filter_states(STATES[0], fields=['state']) == {"entity_id": "light.kitchen", "state": "on"}
+    assert filter_states({"message": "API running."}, fields=['state']) == {"message": "API running."}
+
+
+def test_upstream_response_round_trips_through_bytes():
+    parsed = UpstreamResponse(data=STATES, size=512, latency_ms=12.5)
+    raw = UpstreamResponse(data=b'<html>', size=6, latency_ms=1.0, content_type='text/html')
+
+    assert UpstreamResponse.from_bytes(parsed.to_bytes()) == parsed
+    assert UpstreamResponse.from_bytes(raw.to_bytes()) == raw
@@ -0,0 +1,44 @@
+"""Conditional GET validators (RFC 7232)"""
+
+from backend.services.http_cache import etag_matches, http_date, is_not_modified, make_etag, parse_http_date
+
+
+def test_etag_is_strong_and_depends_on_the_body():
+    etag = make_etag(b'one')
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(b'one')
+    assert etag != make_etag(b'two')
+
+
+def test_etag_matches_lists_wildcards_and_weak_tags():
+    etag = make_etag(b'body')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(f'W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_http_dates_round_trip_to_the_second():
+    assert http_date(784111777) == 'Sun, 06 Nov 1994 08:49:37 GMT'
+    assert parse_http_date('Sun, 06 Nov 1994 08:49:37 GMT') == 784111777
+    assert parse_http_date('not a date') is None
+    assert parse_http_date(None) is None
+
+
+def test_if_modified_since_ignores_sub_second_differences():
+    since = http_date(1000)
+
+    assert is_not_modified(None, since, '"x"', last_modified=1000.7)
+    assert not is_not_modified(None, since, '"x"', last_modified=1001.0)
+    assert not is_not_modified(None, since, '"x"')
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    etag = make_etag(b'body')
+
+    assert not is_not_modified('"stale"', http_date(2000), etag, last_modified=1000)
+    assert is_not_modified(etag, http_date(0), etag, last_modified=1000)
@@ -0,0 +1,114 @@
+"""Shared upstream client: metered transport and connection stats"""
+
+import asyncio
+import sys
+
+import httpx
+import pytest
+
+from backend.services import http_client, metrics
+from backend.services.http_client import ConnectionStats, MeteredTransport
+
+
+def sample(family, **labels):
+    for _, sample_labels, value in family.samples():
+        if sample_labels == labels:
+            return value
+    return 0
+
+
+def calls(upstream, outcome):
+    return sample(metrics.UPSTREAM_REQUESTS, upstream=upstream, outcome=outcome)
+
+
+def request(handler, url='https://api.example.com/data', upstream='weather', stream=False):
+    async def main():
+        async with httpx.AsyncClient(transport=MeteredTransport(httpx.MockTransport(handler))) as client:
+            if not stream:
+                return await client.get(url, extensions={'upstream': upstream})
+            async with client.stream('GET', url, extensions={'upstream': upstream}) as response:
+                return [chunk async for chunk in response.aiter_raw()]
+    return asyncio.run(main())
+
+
+def test_records_outcome_and_body_bytes():
+    before, received = calls('weather', '2xx'), sample(metrics.UPSTREAM_BYTES, upstream='weather')
+    # Unread body, as a real transport returns it (content= would be read already)
+    response = request(lambda req: httpx.Response(200, stream=httpx.ByteStream(b'x' * 100)))
+
+    assert response.content == b'x' * 100
+    assert calls('weather', '2xx') == before + 1
+    assert sample(metrics.UPSTREAM_BYTES, upstream='weather') == received + 100
+
+
+def test_counts_bytes_of_streamed_bodies_once_closed():
+    received = sample(metrics.UPSTREAM_BYTES, upstream='calendar')
+
+    def handler(req):
+        return httpx.Response(200, stream=httpx.ByteStream(b'BEGIN:VCALENDAR'))
+
+    assert b''.join(request(handler, upstream='calendar', stream=True)) == b'BEGIN:VCALENDAR'
+    assert sample(metrics.UPSTREAM_BYTES, upstream='calendar') == received + 15
+
+
+def test_status_classes_and_unknown_upstreams():
+    before = calls('other', '5xx')
+    request(lambda req: httpx.Response(503), upstream='feeds.example.com')
+
+    assert calls('other', '5xx') == before + 1
+
+
+@pytest.mark.parametrize('error, outcome', [
+    (httpx.ConnectTimeout('slow'), 'timeout'),
+    (httpx.ConnectError('refused'), 'error'),
+])
+def test_failures_are_recorded_and_raised(error, outcome):
+    before = calls('homeassistant', outcome)
+
+    def handler(req):
+        raise error
+
+    with pytest.raises(type(error)):
+        request(handler, upstream='homeassistant')
+    assert calls('homeassistant', outcome) == before + 1
+
+
+def test_connection_stats_reuse():
+    stats = ConnectionStats()
+    trace = stats.tracer('api.example.com')
+
+    async def main():
+        await trace('connection.connect_tcp.complete', {})
+        await trace('connection.start_tls.complete', {})
+        for _ in range(4):
+            await trace('http11.send_request_headers.started', {})
+
+    asyncio.run(main())
+
+    assert stats.snapshot() == {'api.example.com': {
+        "requests": 4, "connections": 1, "tls_handshakes": 1, "reused": 3, "reuse_ratio": 0.75,
+    }}
+
+
+def test_http2_only_when_h2_is_installed_and_enabled(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'h2', None)  # Import fails as if not installed
+    assert not http_client._http2_available()
+
+    monkeypatch.setenv('HTTP2', '0')
+    assert not http_client._http2_available()
+
+
+def test_client_falls_back_to_http1_without_h2(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'h2', None)
+
+    async def main():
+        await http_client.start()
+        client = http_client.get_client()
+        try:
+            assert not client.is_closed
+            assert isinstance(client._transport, MeteredTransport)
+        finally:
+            await http_client.close()
+        return client
+
+    assert asyncio.run(main()).is_closed
@@ -0,0 +1,115 @@
+"""ICS parsing into normalized events"""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from backend.services.ics import normalize_feed_url, parse_duration, parse_events, parse_property
+
+UTC = timezone.utc
+DENVER = ZoneInfo('America/Denver')
+
+FEED = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:meeting@example.com
+SUMMARY:Planning\\, budget
+ and roadmap
+DTSTART;TZID=America/New_York:20250310T090000
+DTEND;TZID=America/New_York:20250310T100000
+LOCATION:Room 1\\nSecond floor
+BEGIN:VALARM
+SUMMARY:Reminder
+TRIGGER:-PT15M
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+UID:holiday@example.com
+SUMMARY:Holiday
+DTSTART;VALUE=DATE:20250704
+END:VEVENT
+BEGIN:VEVENT
+UID:standup@example.com
+SUMMARY:Standup
+DTSTART:20250303T160000Z
+DURATION:PT15M
+RRULE:FREQ=DAILY;COUNT=5
+EXDATE:20250304T160000Z,20250305T160000Z
+END:VEVENT
+BEGIN:VEVENT
+UID:standup@example.com
+SUMMARY:Standup (moved)
+RECURRENCE-ID:20250306T160000Z
+DTSTART:20250306T170000Z
+DTEND:20250306T171500Z
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:No start
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def parse():
+    return {(e.uid, e.recurrence_id): e for e in parse_events(FEED.splitlines(), DENVER)}
+
+
+def test_folded_escaped_and_zoned_properties():
+    event = parse()[('meeting@example.com', None)]
+
+    assert event.title == 'Planning, budgetand roadmap'
+    assert event.location == 'Room 1\nSecond floor'
+    assert event.start == datetime(2025, 3, 10, 13, 0, tzinfo=UTC)
+    assert event.end - event.start == timedelta(hours=1)
+    assert not event.is_recurring
+
+
+def test_all_day_event_lasts_a_day_in_the_default_zone():
+    event = parse()[('holiday@example.com', None)]
+
+    assert event.all_day
+    assert event.start == datetime(2025, 7, 4, tzinfo=DENVER)
+    assert event.end == datetime(2025, 7, 5, tzinfo=DENVER)
+    assert event.to_dict()['start'] == '2025-07-04T00:00:00'
+
+
+def test_recurring_master_keeps_rule_exdates_and_duration():
+    master = parse()[('standup@example.com', None)]
+
+    assert master.is_recurring
+    assert master.rrule == 'FREQ=DAILY;COUNT=5'
+    assert master.exdates == {datetime(2025, 3, 4, 16, tzinfo=UTC), datetime(2025, 3, 5, 16, tzinfo=UTC)}
+    assert master.end - master.start == timedelta(minutes=15)
+
+
+def test_override_carries_its_recurrence_id():
+    override = parse()[('standup@example.com', datetime(2025, 3, 6, 16, tzinfo=UTC))]
+
+    assert override.title == 'Standup (moved)'
+    assert override.start == datetime(2025, 3, 6, 17, tzinfo=UTC)
+
+
+def test_events_without_a_start_are_skipped():
+    assert len(parse()) == 4
+
+
+def test_property_names_stop_at_the_first_unquoted_colon():
+    assert parse_property('ATTENDEE;CN="Doe: Jane":mailto:jane@example.com') == (
+        'ATTENDEE', {'CN': 'Doe: Jane'}, 'mailto:jane@example.com'
+    )
+    assert parse_property('no colon') is None
+
+
+def test_durations():
+    assert parse_duration('PT1H30M') == timedelta(hours=1, minutes=30)
+    assert parse_duration('P1W2D') == timedelta(days=9)
+    assert parse_duration('-PT15M') == -timedelta(minutes=15)
+    assert parse_duration('soon') is None
+
+
+def test_google_calendar_links_become_ics_urls():
+    embed = 'https://calendar.google.com/calendar/embed?src=family%40group.calendar.google.com&ctz=America%2FDenver'
+
+    assert normalize_feed_url(embed) == (
+        'https://calendar.google.com/calendar/ical/family%40group.calendar.google.com/public/basic.ics'
+    )
+    assert normalize_feed_url('https://example.com/cal.ics') == 'https://example.com/cal.ics'
@@ -0,0 +1,106 @@
+"""Streaming ICS history trimming and compaction"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.services.ics import Event, parse_events
+from backend.services.ics_stream import FeedTooLarge, FeedTrimmer, check_length, compact_events, is_current
+
+UTC = timezone.utc
+NOT_BEFORE = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def vevent(uid, start, end, *extra):
+    return [
+        'BEGIN:VEVENT', f'UID:{uid}', f'DTSTART:{start}', f'DTEND:{end}', *extra,
+        'BEGIN:VALARM', 'TRIGGER:-PT15M', 'END:VALARM', 'END:VEVENT',
+    ]
+
+
+FEED = '\r\n'.join([
+    'BEGIN:VCALENDAR', 'VERSION:2.0',
+    'BEGIN:VTIMEZONE', 'TZID:Europe/Oslo', 'END:VTIMEZONE',
+    *vevent('old', '20200105T100000Z', '20200105T110000Z'),
+    *vevent('new', '20250305T100000Z', '20250305T110000Z'),
+    *vevent('weekly', '20200105T100000Z', '20200105T110000Z', 'RRULE:FREQ=WEEKLY'),
+    *vevent('ended', '20200105T100000Z', '20200105T110000Z', 'RRULE:FREQ=DAILY;UNTIL=20200110T100000Z'),
+    *vevent('byweekno', '20200105T100000Z', '20200105T110000Z', 'RRULE:FREQ=YEARLY;BYWEEKNO=1;UNTIL=20201231T000000Z'),
+    'BEGIN:VEVENT', 'UID:broken', 'DTSTART:garbage', 'END:VEVENT',
+    'END:VCALENDAR', '',
+]).encode()
+
+
+def trim(chunk_size, not_before=NOT_BEFORE, **kwargs):
+    trimmer = FeedTrimmer(not_before, **kwargs)
+    out = b''.join(trimmer.feed(FEED[i:i + chunk_size]) for i in range(0, len(FEED), chunk_size))
+    return trimmer, out + trimmer.close()
+
+
+def uids(data):
+    return sorted(event.uid for event in parse_events(data.decode().splitlines()))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, len(FEED)])
+def test_drops_finished_events_across_chunk_boundaries(chunk_size):
+    trimmer, out = trim(chunk_size)
+
+    assert uids(out) == ['byweekno', 'new', 'weekly']
+    assert b'BEGIN:VTIMEZONE\r\nTZID:Europe/Oslo\r\nEND:VTIMEZONE\r\n' in out
+    assert b'UID:broken' in out  # Left for the parser to skip
+    assert out.endswith(b'END:VCALENDAR\r\n')
+    assert (trimmer.kept, trimmer.dropped, trimmer.received) == (4, 2, len(FEED))
+
+
+def test_keeps_everything_without_a_horizon():
+    trimmer, out = trim(100, not_before=None)
+
+    assert out == FEED
+    assert trimmer.dropped == 0
+
+
+def test_multibyte_characters_split_across_chunks():
+    trimmer = FeedTrimmer(NOT_BEFORE)
+    data = '\r\n'.join(vevent('new', '20250305T100000Z', '20250305T110000Z', 'SUMMARY:Møte ☕')).encode()
+    out = b''.join(trimmer.feed(data[i:i + 1]) for i in range(len(data))) + trimmer.close()
+
+    assert out == data + b'\n'
+
+
+def test_truncated_feed_passes_the_unfinished_event_through():
+    trimmer = FeedTrimmer(NOT_BEFORE)
+    out = trimmer.feed(b'BEGIN:VEVENT\nUID:cut\nDTSTART:2025') + trimmer.close()
+
+    assert out == b'BEGIN:VEVENT\nUID:cut\nDTSTART:2025\n'
+
+
+def test_feed_over_the_limit_is_aborted():
+    trimmer = FeedTrimmer(NOT_BEFORE, max_bytes=100)
+    trimmer.feed(FEED[:100])
+    with pytest.raises(FeedTooLarge):
+        trimmer.feed(FEED[100:101])
+
+
+def test_check_length():
+    check_length(None, 100)
+    check_length('100', 100)
+    check_length('nonsense', 100)
+    check_length('10000', 0)  # No limit
+    with pytest.raises(FeedTooLarge):
+        check_length('101', 100)
+
+
+def test_compact_events():
+    events = parse_events(FEED.decode().splitlines())
+    kept = compact_events(events, NOT_BEFORE)
+
+    assert sorted(event.uid for event in kept) == ['byweekno', 'new', 'weekly']
+    assert compact_events(events, None) == events
+
+
+def test_overridden_occurrence_is_judged_by_its_own_end():
+    start = datetime(2020, 1, 5, 10, tzinfo=UTC)
+    moved = Event(uid='weekly', title='Moved', start=start, end=start, all_day=False, location='', description='',
+                  rrule='FREQ=WEEKLY', rdates=[], exdates=[], recurrence_id=start)
+
+    assert not is_current(moved, NOT_BEFORE)
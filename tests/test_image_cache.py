@@ -0,0 +1,84 @@
+"""Disk cache of resized background images"""
+
+import os
+
+import pytest
+
+from backend.services.image_cache import ImageCache, size_bucket, valid_photo_id
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ImageCache(str(tmp_path / 'backgrounds'), max_bytes=25)
+
+
+def age(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize('width, height, expected', [
+    (1920, 1080, (1920, 1080)),
+    (1366, 768, (1920, 1079)),  # Keeps the display's own aspect ratio
+    (1080, 1920, (1080, 1920)),
+    (800, 600, (1280, 960)),
+    (7680, 4320, (3840, 2160)),
+    (None, None, (1920, 1080)),
+    (0, 1080, (1920, 1080)),
+])
+def test_size_bucket(width, height, expected):
+    assert size_bucket(width, height) == expected
+
+
+def test_valid_photo_id():
+    assert valid_photo_id('abc-DEF_123')
+    assert not valid_photo_id('../etc/passwd')
+    assert not valid_photo_id('')
+    assert not valid_photo_id('x' * 65)
+
+
+def test_store_and_get(cache):
+    path = cache.store('photo', (1920, 1080), b'jpeg')
+
+    assert path.endswith('photo-1920x1080.jpg')
+    assert cache.get('photo', (1920, 1080)) == path
+    assert cache.get('photo', (1280, 720)) is None
+    assert cache.stats()['hits'] == 1
+    assert os.listdir(cache.directory) == ['photo-1920x1080.jpg']
+
+
+def test_least_recently_served_files_are_evicted(cache):
+    a = cache.store('a', (1920, 1080), b'x' * 10)
+    b = cache.store('b', (1920, 1080), b'x' * 10)
+    age(a, 1000)
+    age(b, 2000)
+    cache.release(cache.get('a', (1920, 1080)))  # Served: now the most recent
+    cache.store('c', (1920, 1080), b'x' * 10)
+
+    assert sorted(os.listdir(cache.directory)) == ['a-1920x1080.jpg', 'c-1920x1080.jpg']
+    assert cache.evictions == 1
+
+
+def test_files_being_served_are_not_evicted(cache):
+    a = cache.store('a', (1920, 1080), b'x' * 10)
+    age(a, 1000)
+    assert cache.acquire('a', (1920, 1080)) == a
+    age(a, 1000)
+    b = cache.store('b', (1920, 1080), b'x' * 10)
+    age(b, 2000)
+    c = cache.store('c', (1920, 1080), b'x' * 10)
+
+    # 'a' is the oldest but still being sent, and 'c' was just stored
+    assert os.path.exists(a) and not os.path.exists(b) and os.path.exists(c)
+    assert cache.stats()['serving'] == 1
+
+    cache.release(a)
+    age(c, 3000)
+    cache.store('d', (1920, 1080), b'x' * 10)
+    assert not os.path.exists(a)
+    assert cache.stats()['serving'] == 0
+
+
+def test_new_file_is_kept_even_when_alone_over_the_cap(cache):
+    path = cache.store('big', (3840, 2160), b'x' * 100)
+
+    assert os.path.exists(path)
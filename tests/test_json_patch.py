@@ -0,0 +1,79 @@
+"""JSON Merge Patch (RFC 7386) and JSON Patch (RFC 6902)"""
+
+import pytest
+
+from backend.services.json_patch import PatchError, apply_json_patch, changed_keys, merge_patch
+
+
+def test_merge_patch_merges_objects_and_null_removes():
+    target = {"theme": "dark", "clock": {"format": "24h", "seconds": True}, "city": "Oslo"}
+    patch = {"clock": {"seconds": None}, "city": None, "units": "metric"}
+
+    assert merge_patch(target, patch) == {"theme": "dark", "clock": {"format": "24h"}, "units": "metric"}
+    assert target['city'] == 'Oslo'  # Target is not modified
+
+
+def test_merge_patch_replaces_non_objects():
+    assert merge_patch({"a": [1, 2]}, {"a": [3]}) == {"a": [3]}
+    assert merge_patch({"a": 1}, ["x"]) == ["x"]
+
+
+def test_operations():
+    doc = {"theme": "dark", "feeds": ["a", "b"], "clock": {"format": "24h"}}
+    result = apply_json_patch(doc, [
+        {"op": "test", "path": "/theme", "value": "dark"},
+        {"op": "replace", "path": "/theme", "value": "light"},
+        {"op": "add", "path": "/feeds/-", "value": "c"},
+        {"op": "add", "path": "/feeds/0", "value": "z"},
+        {"op": "remove", "path": "/feeds/1"},
+        {"op": "copy", "from": "/clock/format", "path": "/format"},
+        {"op": "move", "from": "/clock", "path": "/time"},
+    ])
+
+    assert result == {"theme": "light", "feeds": ["z", "b", "c"], "format": "24h", "time": {"format": "24h"}}
+
+
+def test_pointer_escapes():
+    assert apply_json_patch({"a/b": 1, "c~d": 2}, [
+        {"op": "remove", "path": "/a~1b"},
+        {"op": "replace", "path": "/c~0d", "value": 3},
+    ]) == {"c~d": 3}
+
+
+def test_all_or_nothing():
+    doc = {"theme": "dark", "feeds": ["a"]}
+    with pytest.raises(PatchError, match="Test failed"):
+        apply_json_patch(doc, [
+            {"op": "add", "path": "/feeds/-", "value": "b"},
+            {"op": "test", "path": "/theme", "value": "light"},
+        ])
+
+    assert doc == {"theme": "dark", "feeds": ["a"]}
+
+
+@pytest.mark.parametrize('operations, message', [
+    ({"op": "add", "path": "/a", "value": 1}, "must be an array"),
+    ([{"op": "add", "path": "/a"}], "needs a value"),
+    ([{"op": "move", "path": "/a"}], "needs a 'from' pointer"),
+    ([{"op": "copy", "path": "/a", "from": 5}], "Invalid JSON pointer"),
+    ([{"op": "add", "path": 5, "value": 1}], "Invalid JSON pointer"),
+    ([{"op": "add", "path": "a", "value": 1}], "Invalid JSON pointer"),
+    ([{"op": "move", "from": "/clock", "path": "/clock/old"}], "into itself"),
+    ([{"op": "remove", "path": "/missing"}], "Path not found"),
+    ([{"op": "replace", "path": "/missing", "value": 1}], "Path not found"),
+    ([{"op": "add", "path": "/feeds/5", "value": 1}], "out of range"),
+    ([{"op": "add", "path": "/feeds/01", "value": 1}], "Invalid array index"),
+    ([{"op": "remove", "path": ""}], "whole document"),
+    ([{"op": "frobnicate", "path": "/a"}], "Unknown operation"),
+    (["add"], "Invalid operation"),
+])
+def test_invalid_patches(operations, message):
+    with pytest.raises(PatchError, match=message):
+        apply_json_patch({"clock": {"format": "24h"}, "feeds": ["a"]}, operations)
+
+
+def test_changed_keys():
+    old = {"a": 1, "b": {"c": 2}, "d": 3}
+    new = {"a": 1, "b": {"c": 3}, "e": None}
+
+    assert changed_keys(old, new) == {"b", "d", "e"}
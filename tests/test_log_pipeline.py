@@ -0,0 +1,106 @@
+"""Queued logging with per-route sampling"""
+
+import json
+import logging
+import queue
+import sys
+
+from backend.services import log_pipeline
+from backend.services.log_pipeline import (
+    DroppingQueueHandler, JsonFormatter, RequestFilter, RouteSampler, begin_request, end_request, parse_rates,
+)
+
+
+def record(level=logging.INFO, msg='hello %s', args=('world',), **extra):
+    rec = logging.LogRecord('backend.test', level, __file__, 1, msg, args, None)
+    rec.__dict__.update(extra)
+    return rec
+
+
+def test_parse_rates():
+    assert parse_rates(' /api/health=0.01, /api/settings=2,/x=-1,bad,=0.5,') == {
+        '/api/health': 0.01, '/api/settings': 1.0, '/x': 0.0,
+    }
+
+
+def test_sampler_keeps_every_nth_get_starting_with_the_first():
+    sampler = RouteSampler({'/api/health': 0.25, '/api/off': 0})
+
+    assert [sampler.sample('/api/health', 'GET') for _ in range(8)] == [True, False, False, False] * 2
+    assert sampler.sample('/api/health', 'POST')
+    assert sampler.sample('/api/other', 'GET')
+    assert not sampler.sample('/api/off', 'GET')
+
+
+def test_filter_drops_info_from_unsampled_requests_but_keeps_warnings(monkeypatch):
+    monkeypatch.setattr('backend.services.log_pipeline.sampler', RouteSampler({'/api/health': 0}))
+    log_filter = RequestFilter()
+    tokens = begin_request('/api/health', 'GET')
+    try:
+        assert not log_filter.filter(record())
+        warning = record(logging.WARNING)
+        assert log_filter.filter(warning)
+        assert (warning.method, warning.path) == ('GET', '/api/health')
+    finally:
+        end_request(tokens)
+
+    assert log_filter.filter(record())  # Outside a request
+
+
+def test_filter_keeps_an_explicit_path():
+    tokens = begin_request('/api/a', 'GET')
+    try:
+        access = record(path='/api/b')
+        RequestFilter().filter(access)
+    finally:
+        end_request(tokens)
+
+    assert access.path == '/api/b'
+
+
+def test_json_formatter():
+    line = JsonFormatter().format(record(status=200, duration_ms=1.5, bytes=None))
+    entry = json.loads(line)
+
+    assert entry['message'] == 'hello world'
+    assert entry['level'] == 'INFO' and entry['logger'] == 'backend.test'
+    assert entry['status'] == 200 and entry['duration_ms'] == 1.5
+    assert 'bytes' not in entry
+    assert entry['time'].endswith('+00:00')
+
+
+def test_json_formatter_includes_exceptions():
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        rec = logging.LogRecord('backend.test', logging.ERROR, __file__, 1, 'failed', (), sys.exc_info())
+
+    assert 'ValueError: boom' in json.loads(JsonFormatter().format(rec))['exception']
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(record())
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.queue.get().args == ('world',)  # Formatted by the listener, not here
+
+
+def test_logging_can_be_configured_again_after_stopping():
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    try:
+        first = log_pipeline.configure_logging('INFO', 'text')
+        assert log_pipeline.configure_logging('INFO', 'text') is first
+        log_pipeline.stop_logging()
+        assert first not in root.handlers
+
+        second = log_pipeline.configure_logging('INFO', 'text')
+        assert second is not first and second in root.handlers
+        assert log_pipeline._listener is not None
+    finally:
+        log_pipeline.stop_logging()
+        root.handlers[:] = saved[0]
+        root.setLevel(saved[1])
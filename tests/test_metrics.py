@@ -0,0 +1,136 @@
+"""Prometheus text exposition and upstream metrics"""
+
+import asyncio
+import re
+import urllib.error
+
+import pytest
+
+from backend.services import metrics
+from backend.services.metrics import MetricsMiddleware, Registry, error_outcome, upstream_call, upstream_label
+
+
+def sample(family, name=None, **labels):
+    for sample_name, sample_labels, value in family.samples():
+        if sample_labels == labels and (name is None or sample_name == name):
+            return value
+    return 0
+
+
+def test_counters_and_gauges():
+    registry = Registry()
+    requests = registry.counter('app_requests_total', 'Requests served', ('route', 'status'))
+    in_flight = registry.gauge('app_in_flight', 'Requests being served')
+    requests.inc('/api/a', '200')
+    requests.inc('/api/a', '200', amount=2)
+    in_flight.inc()
+    in_flight.set(value=0.5)
+
+    assert registry.render().splitlines()[:6] == [
+        '# HELP app_requests_total Requests served',
+        '# TYPE app_requests_total counter',
+        'app_requests_total{route="/api/a",status="200"} 3',
+        '# HELP app_in_flight Requests being served',
+        '# TYPE app_in_flight gauge',
+        'app_in_flight 0.5',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter('app_total', 'Help', ('path',)).inc('a"b\\c\nd')
+
+    assert 'app_total{path="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram('app_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, '/api/a')
+
+    lines = registry.render().splitlines()
+    assert lines[:7] == [
+        '# HELP app_seconds Latency',
+        '# TYPE app_seconds histogram',
+        'app_seconds_bucket{route="/api/a",le="0.1"} 2',
+        'app_seconds_bucket{route="/api/a",le="1"} 3',
+        'app_seconds_bucket{route="/api/a",le="+Inf"} 4',
+        'app_seconds_sum{route="/api/a"} 3.65',
+        'app_seconds_count{route="/api/a"} 4',
+    ]
+
+
+def test_collectors_and_caches_are_read_when_rendered():
+    class Cache:
+        def stats(self):
+            return {"hits": 3, "stale_hits": 1, "misses": 4, "hit_ratio": 0.5, "entries": 2}
+
+    registry = Registry()
+    registry.add_cache('calendar', Cache())
+    value = [1]
+    registry.add_collector(lambda: [('app_dropped_total', 'counter', 'Dropped', [('app_dropped_total', {}, value[0])])])
+    value[0] = 7
+    text = registry.render()
+
+    assert 'dashboard_cache_requests_total{cache="calendar",result="stale"} 1' in text
+    assert 'dashboard_cache_hit_ratio{cache="calendar"} 0.5' in text
+    assert 'app_dropped_total 7' in text
+    assert text.endswith('\n')
+
+
+def test_upstream_label_never_uses_user_supplied_hosts():
+    assert upstream_label('weather') == 'weather'
+    assert upstream_label('calendar.example.com') == 'other'
+    assert upstream_label(None) == 'other'
+
+
+def test_upstream_call_records_outcomes():
+    ok = sample(metrics.UPSTREAM_REQUESTS, upstream='weather', outcome='2xx')
+    failed = sample(metrics.UPSTREAM_REQUESTS, upstream='weather', outcome='5xx')
+    received = sample(metrics.UPSTREAM_BYTES, upstream='weather')
+
+    with upstream_call('weather') as call:
+        call.received = 10
+    with pytest.raises(urllib.error.HTTPError):
+        with upstream_call('weather'):
+            raise urllib.error.HTTPError('http://x', 503, 'Unavailable', {}, None)
+
+    assert sample(metrics.UPSTREAM_REQUESTS, upstream='weather', outcome='2xx') == ok + 1
+    assert sample(metrics.UPSTREAM_REQUESTS, upstream='weather', outcome='5xx') == failed + 1
+    assert sample(metrics.UPSTREAM_BYTES, upstream='weather') == received + 10
+
+
+def test_error_outcome():
+    assert error_outcome(urllib.error.URLError(TimeoutError())) == 'timeout'
+    assert error_outcome(urllib.error.URLError('timed out')) == 'timeout'
+    assert error_outcome(ConnectionRefusedError()) == 'error'
+
+
+def test_middleware_records_requests_by_route_template():
+    class Route:
+        def __init__(self, path, regex):
+            self.path, self.path_regex = path, re.compile(regex)
+
+    class App:
+        routes = [Route('/api/backgrounds/{photo_id}', r'^/api/backgrounds/(?P<photo_id>[^/]+)$')]
+
+        async def __call__(self, scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'missing'})
+
+    async def send(message):
+        pass
+
+    route = '/api/backgrounds/{photo_id}'
+    before = sample(metrics.REQUESTS, route=route, method='GET', status='404')
+    sent = sample(metrics.RESPONSE_BYTES, route=route)
+    middleware = MetricsMiddleware(App())
+    scope = {'type': 'http', 'path': '/api/backgrounds/abc', 'method': 'GET', 'app': App()}
+    asyncio.run(middleware(scope, None, send))
+
+    assert sample(metrics.REQUESTS, route=route, method='GET', status='404') == before + 1
+    assert sample(metrics.RESPONSE_BYTES, route=route) == sent + 7
+    assert sample(metrics.IN_FLIGHT, route=route) == 0
+    assert middleware.route_label({'path': '/api/nope', 'app': App()}) == '/api/other'
+    assert middleware.route_label({'path': '/index.html'}) == 'static'
@@ -0,0 +1,139 @@
+"""RRULE / RDATE / EXDATE / RECURRENCE-ID expansion"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+from backend.services.ics import Event
+from backend.services.recurrence import (
+    ExpansionCache, RecurrenceRule, expand_events, iter_occurrences, iter_rule, recurrence_end
+)
+
+UTC = timezone.utc
+DENVER = ZoneInfo('America/Denver')
+
+
+def event(start, rrule=None, duration=timedelta(hours=1), uid='e', rdates=(), exdates=(), recurrence_id=None):
+    return Event(uid=uid, title=uid, start=start, end=start + duration, all_day=False, location=None,
+                 description=None, rrule=rrule, rdates=tuple(rdates), exdates=frozenset(exdates),
+                 recurrence_id=recurrence_id)
+
+
+def starts(rrule, dtstart, n=10):
+    return list(islice(iter_rule(RecurrenceRule.parse(rrule, dtstart.tzinfo), dtstart), n))
+
+
+def test_weekly_by_day_with_count():
+    dtstart = datetime(2025, 3, 3, 9, tzinfo=UTC)  # Monday
+
+    assert starts('FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4', dtstart) == [
+        datetime(2025, 3, 3, 9, tzinfo=UTC), datetime(2025, 3, 5, 9, tzinfo=UTC),
+        datetime(2025, 3, 10, 9, tzinfo=UTC), datetime(2025, 3, 12, 9, tzinfo=UTC),
+    ]
+
+
+def test_monthly_nth_weekday():
+    dtstart = datetime(2025, 1, 14, 18, tzinfo=UTC)  # Second Tuesday
+
+    assert [d.date().isoformat() for d in starts('FREQ=MONTHLY;BYDAY=2TU;COUNT=3', dtstart)] == [
+        '2025-01-14', '2025-02-11', '2025-03-11'
+    ]
+
+
+def test_month_day_31_skips_short_months():
+    dtstart = datetime(2025, 1, 31, 12, tzinfo=UTC)
+
+    assert [d.month for d in starts('FREQ=MONTHLY;BYMONTHDAY=31', dtstart, 4)] == [1, 3, 5, 7]
+
+
+def test_date_until_includes_the_whole_day():
+    dtstart = datetime(2025, 3, 1, 20, tzinfo=UTC)
+
+    assert len(starts('FREQ=DAILY;UNTIL=20250303', dtstart)) == 3
+
+
+def test_wall_clock_time_is_kept_across_dst():
+    dtstart = datetime(2025, 3, 7, 9, tzinfo=DENVER)
+    occurrences = starts('FREQ=DAILY;COUNT=4', dtstart)
+
+    instants = [d.astimezone(UTC) for d in occurrences]
+
+    assert [d.hour for d in occurrences] == [9, 9, 9, 9]
+    assert instants[2] - instants[1] == timedelta(hours=23)  # Spring forward on 9 March
+    assert instants[3] - instants[2] == timedelta(hours=24)
+
+
+def test_unbounded_rule_expands_only_the_window():
+    master = event(datetime(2000, 1, 3, 9, tzinfo=UTC), 'FREQ=WEEKLY')
+    window_start = datetime(2040, 6, 1, tzinfo=UTC)
+
+    occurrences = list(iter_occurrences(master, window_start, window_start + timedelta(days=14)))
+
+    assert len(occurrences) == 2
+    assert all(o.start.weekday() == 0 and o.rrule is None for o in occurrences)
+
+
+def test_exdates_and_overlap_from_before_the_window():
+    master = event(datetime(2025, 3, 1, 23, tzinfo=UTC), 'FREQ=DAILY;COUNT=5', duration=timedelta(hours=3),
+                   exdates=[datetime(2025, 3, 3, 23, tzinfo=UTC)])
+    window_start = datetime(2025, 3, 3, tzinfo=UTC)
+
+    occurrences = list(iter_occurrences(master, window_start, window_start + timedelta(days=2)))
+
+    # The 2 March occurrence runs past midnight into the window; 3 March is excluded
+    assert [o.start.day for o in occurrences] == [2, 4]
+
+
+def test_rdates_merge_with_the_rule():
+    master = event(datetime(2025, 3, 3, 9, tzinfo=UTC), 'FREQ=WEEKLY;COUNT=2',
+                   rdates=[datetime(2025, 3, 5, 9, tzinfo=UTC)])
+
+    occurrences = list(iter_occurrences(master, datetime(2025, 3, 1, tzinfo=UTC), datetime(2025, 4, 1, tzinfo=UTC)))
+
+    assert [o.start.day for o in occurrences] == [3, 5, 10]
+    assert len({o.uid for o in occurrences}) == 3
+
+
+def test_override_replaces_the_occurrence_it_points_at():
+    moved_from = datetime(2025, 3, 4, 9, tzinfo=UTC)
+    master = event(datetime(2025, 3, 3, 9, tzinfo=UTC), 'FREQ=DAILY;COUNT=3', uid='s')
+    override = event(datetime(2025, 3, 4, 15, tzinfo=UTC), uid='s', recurrence_id=moved_from)
+
+    occurrences = list(expand_events([master, override], datetime(2025, 3, 1, tzinfo=UTC),
+                                     datetime(2025, 3, 10, tzinfo=UTC)))
+
+    assert sorted(o.start for o in occurrences) == [
+        datetime(2025, 3, 3, 9, tzinfo=UTC), datetime(2025, 3, 4, 15, tzinfo=UTC), datetime(2025, 3, 5, 9, tzinfo=UTC)
+    ]
+
+
+def test_unsupported_rule_still_yields_dtstart():
+    master = event(datetime(2025, 3, 3, 9, tzinfo=UTC), 'FREQ=YEARLY;BYWEEKNO=20')
+
+    assert RecurrenceRule.parse(master.rrule) is None
+    assert [o.start for o in iter_occurrences(master, datetime(2025, 3, 1, tzinfo=UTC),
+                                              datetime(2025, 4, 1, tzinfo=UTC))] == [master.start]
+
+
+def test_recurrence_end():
+    start = datetime(2025, 3, 3, 9, tzinfo=UTC)
+
+    assert recurrence_end(event(start, 'FREQ=DAILY')) == math.inf
+    assert recurrence_end(event(start, 'FREQ=YEARLY;BYWEEKNO=20;UNTIL=20250101T000000Z')) == math.inf
+    assert recurrence_end(event(start, 'FREQ=DAILY;UNTIL=20250310T090000Z')) == \
+        datetime(2025, 3, 10, 10, tzinfo=UTC).timestamp()
+
+
+def test_expansion_cache_memoizes_per_version_and_window():
+    memo = ExpansionCache(max_entries=1)
+    master = event(datetime(2025, 3, 3, 9, tzinfo=UTC), 'FREQ=DAILY')
+    window = (datetime(2025, 3, 10, tzinfo=UTC), datetime(2025, 3, 17, tzinfo=UTC))
+
+    first = memo.expand('v1', master, *window)
+    assert memo.expand('v1', master, *window) is first
+    memo.expand('v2', master, *window)  # Evicts v1
+    memo.expand('v1', master, *window)
+
+    assert memo.stats() == {"entries": 1, "hits": 1, "misses": 3}
+    assert len(first) == 7
@@ -0,0 +1,50 @@
+"""Background feed refresh scheduler"""
+
+import asyncio
+
+from backend.services.scheduler import FeedScheduler
+
+
+def test_refreshes_each_feed_periodically_and_backs_off_on_failure():
+    calls = []
+
+    async def refresh(key):
+        calls.append(key)
+        if key == 'broken':
+            raise ConnectionError('down')
+
+    async def main():
+        scheduler = FeedScheduler(refresh, interval=0.05, jitter=0, retry_base=0.2, max_backoff=0.2)
+        scheduler.configure(['good', 'broken'])
+        await asyncio.sleep(0.28)
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return stats
+
+    stats = asyncio.run(main())
+
+    assert stats['feeds'] == 2
+    assert calls.count('good') >= 4
+    assert calls.count('broken') == 2  # Once at start, once after the retry delay
+    assert stats['status']['good']['failures'] == 0 and stats['status']['good']['last_success']
+    assert stats['status']['broken']['last_error'] == 'ConnectionError: down'
+
+
+def test_configure_cancels_removed_feeds():
+    async def refresh(key):
+        pass
+
+    async def main():
+        scheduler = FeedScheduler(refresh, interval=60)
+        scheduler.configure(['a', 'b'])
+        task = scheduler._tasks['a']
+        scheduler.configure(['b', 'c'])
+        await asyncio.sleep(0)
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return task, stats
+
+    task, stats = asyncio.run(main())
+
+    assert task.cancelled()
+    assert sorted(stats['status']) == ['b', 'c']
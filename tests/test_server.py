@@ -0,0 +1,127 @@
+"""Legacy server.py: keep-alive framing, worker pool and per-route caps"""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+import server
+from server import DashboardHandler, DashboardServer
+
+
+class Handler(DashboardHandler):
+    """Adds responses with and without a Content-Length"""
+
+    def do_GET(self):
+        if self.path == '/test/unframed':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.end_headers()
+            self.wfile.write(b'until close')
+        elif self.path == '/test/empty':
+            self.send_response(204)
+            self.end_headers()
+        else:
+            super().do_GET()
+
+    def log_access(self, sent):
+        pass
+
+
+@pytest.fixture
+def httpd():
+    httpd = DashboardServer(('127.0.0.1', 0), Handler, max_workers=1, max_connections=2)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join(5)
+
+
+@pytest.fixture
+def connect(httpd):
+    connections = []
+
+    def connect():
+        connection = http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+        connections.append(connection)
+        return connection
+
+    yield connect
+    for connection in connections:
+        connection.close()
+
+
+def get(connection, path):
+    connection.request('GET', path)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_keep_alive_reuses_the_connection(connect):
+    connection = connect()
+    response, _ = get(connection, '/api/health')
+    sock = connection.sock
+
+    assert response.status == 200 and response.getheader('Connection') is None
+    response, _ = get(connection, '/test/empty')
+    assert response.status == 204 and response.getheader('Connection') is None
+    response, _ = get(connection, '/api/health')
+    assert response.status == 200
+    assert connection.sock is sock
+
+
+def test_body_without_length_closes_the_connection(connect):
+    connection = connect()
+    response, body = get(connection, '/test/unframed')
+
+    assert response.getheader('Connection') == 'close'
+    assert body == b'until close'
+    assert response.will_close
+
+
+def test_busy_workers_reject_with_503(httpd, connect, monkeypatch):
+    monkeypatch.setattr(server, 'SERVER_WORKER_WAIT', 0.1)
+    assert httpd.workers.acquire(blocking=False)  # The only worker is busy
+    try:
+        response, body = get(connect(), '/api/settings/store')
+        assert response.status == 503
+        assert json.loads(body) == {"error": "Server busy, try again shortly"}
+
+        response, _ = get(connect(), '/api/health')  # Answered without a worker
+        assert response.status == 200
+    finally:
+        httpd.workers.release()
+
+    response, _ = get(connect(), '/api/settings/store')
+    assert response.status == 200
+
+
+def test_saturated_route_rejects_with_503_and_keeps_the_connection(httpd, connect, monkeypatch):
+    slot = threading.BoundedSemaphore(1)
+    monkeypatch.setitem(server.ROUTE_SLOTS, '/api/calendar', slot)
+    monkeypatch.setitem(server.ROUTE_LIMITS, '/api/calendar', 1)
+    assert slot.acquire(blocking=False)  # One feed download in progress
+    connection = connect()
+
+    response, body = get(connection, '/api/calendar?url=https://example.com/a.ics')
+    assert response.status == 503
+    assert response.getheader('Retry-After') == '5'
+    assert 'Too many concurrent /api/calendar requests' in json.loads(body)['error']
+
+    response, _ = get(connection, '/api/health')  # Same kept-alive connection
+    assert response.status == 200
+    assert httpd.workers.acquire(blocking=False)  # The rejected request gave its worker back
+    httpd.workers.release()
+    slot.release()
+
+
+def test_connections_over_the_cap_are_closed(connect):
+    first, second = connect(), connect()
+    get(first, '/api/health')
+    get(second, '/api/health')  # Both stay open (keep-alive)
+
+    with pytest.raises((http.client.RemoteDisconnected, ConnectionResetError)):
+        get(connect(), '/api/health')
@@ -0,0 +1,164 @@
+"""Settings document in memory with write-behind persistence and revisions"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from backend.services import settings_store
+from backend.services.settings_store import SettingsStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({"theme": "dark", "_revision": 4}))
+    return path
+
+
+def read(path):
+    return json.loads(path.read_text())
+
+
+def touch_later(path, data):
+    """Rewrite the file by hand with a different mtime than our last write"""
+    path.write_text(json.dumps(data))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_loads_the_file_and_its_revision(path):
+    store = SettingsStore(str(path))
+
+    assert store.get() == {"theme": "dark", "_revision": 4}
+    assert store.revision == 4
+    assert json.loads(store.response().body) == {"theme": "dark"}
+
+
+def test_saves_in_one_window_are_written_once(path):
+    store = SettingsStore(str(path), write_delay=0.1)
+    for i in range(5):
+        store.set({"theme": "light", "count": i})
+
+    assert read(path)['theme'] == 'dark'  # Not written yet, but already served
+    assert json.loads(store.response().body) == {"theme": "light", "count": 4}
+    time.sleep(0.3)
+
+    assert read(path) == {"theme": "light", "count": 4, "_revision": 9}
+    assert store.stats()['saves'] == 5 and store.stats()['writes'] == 1
+
+
+def test_flush_writes_pending_changes_now(path):
+    store = SettingsStore(str(path), write_delay=60)
+    store.set({"theme": "light"})
+    store.flush()
+
+    assert read(path)['theme'] == 'light'
+    assert not store.stats()['pending']
+    assert [p.name for p in path.parent.iterdir()] == ['settings.json']  # No temp files left
+
+
+def test_changes_since_a_revision(path):
+    store = SettingsStore(str(path), write_delay=60)
+    store.set({"theme": "dark", "clock": {"format": "24h"}})
+    store.patch({"theme": "light"})
+
+    assert store.revision == 6
+    assert store.changes_since(6) == {}
+    assert store.changes_since(5) == {"theme": "light"}
+    assert store.changes_since(4) == {"theme": "light", "clock": {"format": "24h"}}
+    assert store.changes_since(99) is None
+
+
+def test_removed_keys_are_reported_as_none(path):
+    store = SettingsStore(str(path), write_delay=60)
+    store.patch({"theme": None})
+
+    assert store.changes_since(4) == {"theme": None}
+
+
+def test_history_that_is_too_old_needs_the_full_document(path):
+    store = SettingsStore(str(path), write_delay=60)
+    store._history = type(store._history)(maxlen=2)
+    for i in range(3):
+        store.patch({"count": i})
+
+    assert store.changes_since(4) is None  # Revision 5 fell out of the history
+    assert store.changes_since(5) == {"count": 2}
+
+
+def test_hand_edits_are_reloaded_and_reported(path):
+    store = SettingsStore(str(path), check_interval=0)
+    seen = []
+    store.add_listener(seen.append)
+    touch_later(path, {"theme": "blue"})
+
+    assert store.check() is True
+    assert store.get()['theme'] == 'blue'
+    assert store.revision == 5
+    assert seen == [store.get()]
+    assert store.changes_since(4) == {"theme": "blue"}
+    assert store.check() is False
+
+
+def test_invalid_hand_edit_keeps_the_last_good_document(path):
+    store = SettingsStore(str(path), check_interval=0)
+    seen = []
+    store.add_listener(seen.append)
+    path.write_text('{"theme": ')
+    os.utime(path, (1, 1))
+
+    assert store.check() is False
+    assert store.get()['theme'] == 'dark'
+    assert seen == []
+
+
+def test_pending_save_wins_over_a_hand_edit(path):
+    store = SettingsStore(str(path), write_delay=60, check_interval=0)
+    store.set({"theme": "light"})
+    touch_later(path, {"theme": "blue"})
+
+    assert store.check() is False
+    store.flush()
+    assert read(path)['theme'] == 'light'
+
+
+def test_reads_and_saves_do_not_wait_for_a_write_in_progress(path, monkeypatch):
+    writing = threading.Event()
+    release = threading.Event()
+    real_write = settings_store.atomic_write
+
+    def slow_write(target, data):
+        writing.set()
+        release.wait(5)
+        real_write(target, data)
+
+    monkeypatch.setattr(settings_store, 'atomic_write', slow_write)
+    store = SettingsStore(str(path), write_delay=60)
+    store.set({"theme": "light"})
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert writing.wait(5)
+
+    started = time.monotonic()
+    assert store.get()['theme'] == 'light'
+    store.patch({"theme": "blue"})
+    assert time.monotonic() - started < 1
+    release.set()
+    flusher.join(5)
+
+    assert read(path)['theme'] == 'light'
+    assert store.stats()['pending']  # The save made during the write is still to be written
+    store.flush()
+    assert read(path)['theme'] == 'blue'
+
+
+def test_without_check_on_read_only_check_looks_at_the_file(path):
+    store = SettingsStore(str(path), check_interval=0, check_on_read=False)
+    touch_later(path, {"theme": "blue"})
+
+    assert store.get()['theme'] == 'dark'
+    assert store.check() is True
+    assert store.get()['theme'] == 'blue'
@@ -0,0 +1,107 @@
+"""In-memory static assets: hashed URLs, compressed variants and private paths"""
+
+import gzip
+import os
+
+import pytest
+
+from backend.services import static_assets
+from backend.services.static_assets import AssetTable, hashed_name
+
+SCRIPT = b'console.log("dashboard");\n' * 100
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / 'site'
+    (root / 'js').mkdir(parents=True)
+    (root / 'js' / 'app.js').write_bytes(SCRIPT)
+    (root / 'css').mkdir()
+    (root / 'css' / 'style.css').write_bytes(b'body{margin:0}')
+    (root / 'index.html').write_bytes(
+        b'<link href="css/style.css"><script src="js/app.js"></script>'
+        b'<script src="https://cdn.example.com/lib.js"></script>'
+    )
+    return root
+
+
+def test_hashed_name():
+    assert hashed_name('js/app.js', '0123456789abcdef') == 'js/app.0123456789.js'
+
+
+def test_html_references_hashed_urls(root):
+    table = AssetTable(str(root))
+    page = table.get('index.html').variants['identity']
+    script = table.get('js/app.js')
+
+    assert f'src="{script.url}"'.encode() in page
+    assert b'href="css/style.' in page
+    assert b'src="https://cdn.example.com/lib.js"' in page
+
+
+def test_hashed_url_is_immutable_only_for_the_current_version(root):
+    table = AssetTable(str(root))
+    url = table.get('js/app.js').url
+
+    assert table.resolve('/' + url) == ('js/app.js', True)
+    assert table.resolve('/js/app.0000000000.js') == ('js/app.js', False)
+    assert table.resolve('/js/app.js') == ('js/app.js', False)
+    assert table.resolve('/') == ('index.html', False)
+    assert table.resolve('/missing.js') is None
+
+
+def test_compressed_variants_and_negotiation(root):
+    asset = AssetTable(str(root)).get('js/app.js')
+
+    assert gzip.decompress(asset.variants['gzip']) == SCRIPT
+    assert asset.select('gzip, deflate') == 'gzip'
+    assert asset.select('gzip;q=0, identity') == 'identity'
+    assert asset.select(None) == 'identity'
+    assert 'gzip' not in AssetTable(str(root)).get('css/style.css').variants  # Too small to bother
+
+
+def test_response_headers_and_304(root):
+    asset = AssetTable(str(root)).get('js/app.js')
+
+    status, headers, body = asset.response('gzip', None, immutable=True)
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    assert headers['Cache-Control'] == static_assets.IMMUTABLE_CACHE_CONTROL
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert int(headers['Content-Length']) == len(body)
+
+    status, _, body = asset.response('gzip', headers['ETag'], immutable=True)
+    assert status == 304 and body == b''
+    assert asset.response(None, headers['ETag'], immutable=False)[0] == 200  # Other encoding, other ETag
+
+
+def test_page_is_rebuilt_when_a_referenced_file_changes(root, monkeypatch):
+    monkeypatch.setattr(static_assets, 'STATIC_CHECK_INTERVAL', 0)
+    table = AssetTable(str(root))
+    old_url = table.get('js/app.js').url
+    table.get('index.html')
+
+    script = root / 'js' / 'app.js'
+    script.write_bytes(SCRIPT + b'// v2\n')
+    os.utime(script, (1, 1))
+
+    new_url = table.get('js/app.js').url
+    assert new_url != old_url
+    assert new_url.encode() in table.get('index.html').variants['identity']
+
+
+@pytest.mark.parametrize('path', [
+    '/../outside.txt', '/.git/config', '/.env', '/data/responses.sqlite3', '/data/responses.sqlite3-wal',
+])
+def test_private_and_outside_paths_are_refused(root, path):
+    (root / '.git').mkdir()
+    (root / '.git' / 'config').write_text('[core]')
+    (root / '.env').write_text('TOKEN=x')
+    (root / 'data').mkdir()
+    (root / 'data' / 'responses.sqlite3').write_bytes(b'SQLite')
+    (root / 'data' / 'responses.sqlite3-wal').write_bytes(b'WAL')
+    (root.parent / 'outside.txt').write_text('secret')
+
+    table = AssetTable(str(root))
+
+    assert table.resolve(path) is None
+    assert table.get(path.lstrip('/')) is None
@@ -0,0 +1,34 @@
+"""Dashboard code version kept current by a watcher"""
+
+import os
+
+from backend.services.version import VersionWatcher
+
+
+def test_version_changes_only_when_a_watched_file_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text('1')
+    (tmp_path / 'index.html').write_text('<html>')
+    (tmp_path / 'notes.txt').write_text('not watched')
+    changes = []
+    watcher = VersionWatcher(['index.html'], patterns=('js/**/*.js',))
+    watcher.add_listener(changes.append)
+
+    assert watcher.check() is False  # First computation is not a change
+    first = watcher.snapshot()['version']
+
+    os.utime('notes.txt', (1, 1))
+    assert watcher.check() is False
+
+    os.utime('js/app.js', (1, 1))
+    assert watcher.check() is True
+    assert changes == [watcher.version] and watcher.version != first
+    assert watcher.checks == 3
+
+
+def test_missing_key_files_are_ignored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    watcher = VersionWatcher(['missing.html'], patterns=())
+
+    assert watcher.snapshot()['version'] == watcher.compute()
@@ -0,0 +1,127 @@
+"""Weather proxy: trimming, cache keys, validation and the API key fallback"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.routers import weather
+from backend.services import http_client
+from backend.services.cache import ResponseCache
+
+CURRENT = {
+    "coord": {"lon": -104.99, "lat": 39.74}, "dt": 1700000000, "base": "stations", "visibility": 10000,
+    "main": {"temp": 41.2, "feels_like": 37.0, "humidity": 60, "pressure": 1020},
+    "wind": {"speed": 5.1, "deg": 200},
+    "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"},
+                {"id": 701, "main": "Mist", "description": "mist", "icon": "50d"}],
+    "sys": {"sunrise": 1699968000, "sunset": 1700004000, "country": "US"},
+}
+FORECAST = {
+    "cod": "200", "city": {"name": "Denver"},
+    "list": [{"dt": 1700010800, "main": {"temp": 40, "temp_min": 38, "temp_max": 42, "humidity": 50},
+              "weather": [{"main": "Clouds", "icon": "03d"}], "pop": 0}],
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """OpenWeatherMap answered locally; records the query of every call"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=CURRENT if request.url.path.endswith('/weather') else FORECAST)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, 'get_client', lambda: client)
+    monkeypatch.setattr(weather, 'weather_cache', ResponseCache(ttl=600, stale_ttl=0))
+    monkeypatch.setattr(weather, 'OPENWEATHERMAP_API_KEY', '')
+    return requests
+
+
+def with_settings(monkeypatch, owm):
+    async def read_settings():
+        return {"weather": {"openWeatherMap": owm}}
+    monkeypatch.setattr(weather, 'read_settings', read_settings)
+
+
+def test_trim_current():
+    assert weather.trim_current(CURRENT) == {
+        "dt": 1700000000,
+        "main": {"temp": 41.2, "feels_like": 37.0, "humidity": 60},
+        "wind": {"speed": 5.1},
+        "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
+        "sys": {"sunrise": 1699968000, "sunset": 1700004000},
+    }
+    assert weather.trim_current({})['weather'] == []
+
+
+def test_trim_forecast():
+    assert weather.trim_forecast(FORECAST) == {"list": [
+        {"dt": 1700010800, "main": {"temp": 40, "temp_min": 38, "temp_max": 42}, "weather": [{"main": "Clouds"}]},
+    ]}
+    assert weather.trim_forecast({"list": None}) == {"list": []}
+
+
+def test_nearby_displays_share_one_fetch(upstream, monkeypatch):
+    with_settings(monkeypatch, {"apiKey": "settings-key", "lat": 39.7392, "lon": -104.9903, "units": "metric"})
+
+    async def main():
+        first = await weather.load_weather()
+        second = await weather.load_weather(39.741, -104.989)
+        return first, second
+
+    (cached, status), (_, second_status) = asyncio.run(main())
+
+    assert (status, second_status) == ('miss', 'hit')
+    assert len(upstream) == 2  # /weather and /forecast, once
+    assert dict(upstream[0].url.params) == {"lat": "39.74", "lon": "-104.99", "units": "metric",
+                                            "appid": "settings-key"}
+    body = json.loads(cached.body)
+    assert body['location'] == {"lat": 39.74, "lon": -104.99, "units": "metric"}
+    assert body['current']['main']['temp'] == 41.2
+    assert len(body['forecast']['list']) == 1
+
+
+def test_environment_key_wins_over_settings(upstream, monkeypatch):
+    monkeypatch.setattr(weather, 'OPENWEATHERMAP_API_KEY', 'env-key')
+    with_settings(monkeypatch, {"apiKey": "settings-key"})
+    asyncio.run(weather.load_weather(1, 2, 'imperial'))
+
+    assert upstream[0].url.params['appid'] == 'env-key'
+
+
+@pytest.mark.parametrize('owm, args, status', [
+    ({}, (1, 2, None), 503),
+    ({"apiKey": "YOUR_OPENWEATHERMAP_API_KEY"}, (1, 2, None), 503),
+    ({"apiKey": "k"}, (None, None, None), 400),
+    ({"apiKey": "k", "lat": "north", "lon": 2}, (None, None, None), 400),
+    ({"apiKey": "k"}, (1, 2, 'kelvin'), 400),
+])
+def test_invalid_requests(upstream, monkeypatch, owm, args, status):
+    with_settings(monkeypatch, owm)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(weather.load_weather(*args))
+
+    assert excinfo.value.status_code == status
+    assert upstream == []
+
+
+def test_upstream_errors(monkeypatch, upstream):
+    with_settings(monkeypatch, {"apiKey": "k"})
+
+    def unauthorized(request):
+        return httpx.Response(401)
+
+    def timeout(request):
+        raise httpx.ReadTimeout('slow')
+
+    for handler, status in ((unauthorized, 401), (timeout, 504)):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(http_client, 'get_client', lambda: client)
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(weather.load_weather(1, 2, 'metric'))
+        assert excinfo.value.status_code == status